@@ -4,13 +4,105 @@
 import streamlit as st
 import pandas as pd
 import io
-import time
-
-from processar_solicitacoes import processar_solicitacoes
+import hashlib
+import os
+import threading
+
+from leitura_excel import ler_solicitacoes_esquema
+from exportacao import FORMATOS_EXPORTACAO, exportar_em_arquivo, nome_arquivo
+from indice_filtros import IndiceFiltros
+from ingestao_incremental import ingerir_conteudo
+from rollup_mensal import filtrar_rollup, gerar_rollup_mensal
+from contexto_render import ContextoRender
+from primeira_ocorrencia import IndicePrimeiraOcorrencia
 import kpi_calculos as kpi_mod
 import dashboard_view as dv
+import instrumentacao
+
+# configuração de página + CSS global (primeiro comando Streamlit do script)
+dv.configurar_pagina()
+
+# registros de performance (KPI_SM_PERF) deste rerun, separados dos das outras sessões
+registros_perf = instrumentacao.coletar()
+
+
+# ---------------------------
+# Leitura + tratamento: base incremental por sessão, DataFrame tratado no cache colunar em disco
+# ---------------------------
+def ingestao_da_sessao() -> dict:
+    """
+    Base da ingestão incremental desta sessão: último arquivo tratado (chave + ResultadoIncremental)
+    e o lock que serializa sua atualização. Cada sessão compara o upload com o que ela mesma
+    processou antes, nunca com o arquivo de outra sessão.
+    """
+    if "ingestao" not in st.session_state:
+        st.session_state["ingestao"] = {"chave": None, "resultado": None, "trava": threading.Lock()}
+    return st.session_state["ingestao"]
+
+
+def _ler_solicitacoes(conteudo: bytes) -> pd.DataFrame:
+    # lê só as colunas canônicas, já tipadas (category/datetime/numérico)
+    return ler_solicitacoes_esquema(io.BytesIO(conteudo), engine="auto")
+
+
+def carregar_solicitacoes_tratadas(chave_arquivo: str, conteudo: bytes):
+    """
+    Lê a aba SOLICITAÇÕES e aplica processar_solicitacoes. Devolve (DataFrame tratado, diff ou None).
+    - mesmo arquivo da sessão (ex.: troca de filtro): reaproveita o resultado já tratado
+    - arquivo novo: tratado de forma incremental contra o anterior da sessão (só as linhas
+      inseridas/alteradas passam pelo pipeline); o cache colunar em disco (DataFrame + assinaturas)
+      evita reler o Excel em outra sessão ou após reinício, e o diff é refeito pelas assinaturas
+    O diff só é devolvido no rerun em que o arquivo foi ingerido.
+    """
+    ingestao = ingestao_da_sessao()
+    with ingestao["trava"]:
+        if ingestao["chave"] == chave_arquivo:
+            return ingestao["resultado"].df_tratada, None
+        resultado = ingerir_conteudo(conteudo, _ler_solicitacoes, ingestao["resultado"])
+        ingestao["chave"], ingestao["resultado"] = chave_arquivo, resultado
+        return resultado.df_tratada, resultado.resumo()
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def obter_indice_filtros(chave_arquivo: str, _df_tratada: pd.DataFrame) -> IndiceFiltros:
+    """Índice de filtros (bitmaps por valor + opções ordenadas), construído uma vez por arquivo."""
+    return IndiceFiltros(_df_tratada)
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def obter_rollup_mensal(chave_arquivo: str, _df_tratada: pd.DataFrame) -> pd.DataFrame:
+    """Rollup mensal (mês x BU x TIPO x STATUS x RESP_SM x POSSUI_JIRA), construído uma vez por arquivo."""
+    return gerar_rollup_mensal(_df_tratada)
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def obter_primeira_ocorrencia(chave_arquivo: str, _df_tratada: pd.DataFrame) -> IndicePrimeiraOcorrencia:
+    """1ª DATA_SOLICITACAO por CLIENTE/CATEGORIA (e dimensões de filtro), construída uma vez por arquivo."""
+    return IndicePrimeiraOcorrencia(_df_tratada)
+
+
+def _remover_exportacao(caminho: str):
+    try:
+        os.remove(caminho)
+    except OSError:
+        pass
+
+
+@st.cache_resource(max_entries=4, show_spinner=False, validate=os.path.exists, on_release=_remover_exportacao)
+def exportar_arquivo(chave_arquivo: str, formato: str, _df_tratada: pd.DataFrame) -> str:
+    """
+    Caminho do arquivo exportado (xlsx/parquet/feather/csv), gerado em disco só quando o download é
+    pedido; uma vez por arquivo e formato. O cache guarda só o caminho (o arquivo é apagado quando sai
+    do cache); o Streamlit lê o arquivo inteiro para servir cada download.
+    """
+    rollup = obter_rollup_mensal(chave_arquivo, _df_tratada) if formato == "xlsx" else None
+    return exportar_em_arquivo(_df_tratada, formato, rollup=rollup)
+
+
+def _ler_exportacao(chave_arquivo: str, formato: str, df_tratada: pd.DataFrame) -> bytes:
+    with open(exportar_arquivo(chave_arquivo, formato, df_tratada), "rb") as f:
+        return f.read()
 
-st.set_page_config(page_title="Acompanhamento KPI ScannMarket", layout="wide")
 
 # containers / placeholders
 upload_slot = st.empty()            # placeholder que vamos esvaziar após upload
@@ -31,9 +123,22 @@ if uploaded_file is None:
     st.info("Envie o arquivo Excel para iniciar o processamento.")
     st.stop()
 
-# Se chegou aqui, já há um arquivo: mostrar pequeno spinner e limpar upload
+# Se chegou aqui, já há um arquivo: ler/tratar (ou reaproveitar do cache) e limpar upload
+conteudo = uploaded_file.getvalue()
+chave_arquivo = hashlib.sha256(conteudo).hexdigest()
 with st.spinner("Processando dados..."):
-    time.sleep(0.5)  # só para dar tempo do spinner aparecer
+    try:
+        df_tratada, diff_ingestao = carregar_solicitacoes_tratadas(chave_arquivo, conteudo)
+    except Exception as e:
+        st.error(f"Erro ao ler a aba SOLICITAÇÕES: {e}")
+        st.stop()
+
+# resumo do diff incremental (só no rerun em que o arquivo foi ingerido, não a cada troca de filtro)
+if diff_ingestao and diff_ingestao["reaproveitadas"]:
+    st.toast(
+        f"Atualização incremental: {diff_ingestao['inseridas']} novas, "
+        f"{diff_ingestao['atualizadas']} alteradas, {diff_ingestao['removidas']} removidas."
+    )
 
 upload_slot.empty()
 st.markdown("<script>window.scrollTo(0, 0);</script>", unsafe_allow_html=True)
@@ -43,60 +148,73 @@ st.markdown("<script>window.scrollTo(0, 0);</script>", unsafe_allow_html=True)
 # ---------------------------
 with dashboard_container:
 
-    # leitura e tratamento
-    try:
-        df_raw = pd.read_excel(uploaded_file, sheet_name="SOLICITAÇÕES", header=1)
-    except Exception as e:
-        st.error(f"Erro ao ler a aba SOLICITAÇÕES: {e}")
-        st.stop()
-
-    df_tratada = processar_solicitacoes(df_raw)
-
-    # filtros (isso desenha o header + filtros e retorna a máscara)
-    mask = dv.header_com_filtros(df_tratada)
+    # filtros (isso desenha o header + filtros e retorna a máscara e as seleções)
+    indice_filtros = obter_indice_filtros(chave_arquivo, df_tratada)
+    mask, selecoes = dv.header_com_filtros(df_tratada, indice_filtros)
 
     # aplicar máscara e gerar KPIs
-    df_filtrado = df_tratada[mask]
     kpis = kpi_mod.gerar_resumo_kpis(df_tratada, mask)
 
-    # mostrar cards (passando df_filtrado para que os cards respeitem filtros)
-    dv.mostrar_kpi_cards(kpis, df_filtrado)
+    # rollup mensal pré-agregado, recortado pelos mesmos filtros (séries temporais e card 5)
+    rollup = filtrar_rollup(obter_rollup_mensal(chave_arquivo, df_tratada), selecoes)
+
+    # contexto de renderização: recorte filtrado, datas e máscara de JIRA montados uma vez por rerun
+    contexto = ContextoRender(
+        df_tratada, mask, rollup,
+        selecoes=selecoes,
+        primeira_ocorrencia=obter_primeira_ocorrencia(chave_arquivo, df_tratada),
+    )
+
+    # mostrar cards (passando o contexto para que os cards respeitem filtros)
+    dv.mostrar_kpi_cards(kpis, contexto)
     st.markdown("<br><hr style='border:0.5px solid #ddd;margin:10px 0;'><br>", unsafe_allow_html=True)
 
-    # gráficos (usando df_tratada e mask como você já tinha)
+    # gráficos (todos leem o mesmo contexto)
     # Gráficos: BU + TIPO (lado a lado) e pizza à direita
     col_main, col_pizza = st.columns([2.5, 1])
 
     with col_main:
         subcol_bu, subcol_tipo = st.columns([1, 1])
         with subcol_bu:
-            dv.grafico_linhas_por_bu(df_tratada, mask)
+            dv.grafico_linhas_por_bu(contexto)
         with subcol_tipo:
-            dv.grafico_linhas_por_tipo(df_tratada, mask)
+            dv.grafico_linhas_por_tipo(contexto)
 
     with col_pizza:
     # Ajuste para alinhar o título com o gráfico da esquerda
         st.markdown("<div style='margin-top:-60px'></div>", unsafe_allow_html=True)
-        dv.grafico_pizza_status(df_tratada, mask)
+        dv.grafico_pizza_status(contexto)
 
 
-    dv.grafico_sla_mensal(df_tratada, mask)
+    dv.grafico_sla_mensal(contexto)
 
     st.markdown("---")
     st.markdown("### Tabela detalhada")
-    dv.tabela_detalhada(df_tratada, mask)
-
-    # botão para baixar
-    def gerar_excel_em_bytes(df_tratada):
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-            df_tratada.to_excel(writer, sheet_name="Solicitações Tratada", index=False)
-            pivot = df_tratada.pivot_table(index=["BU","STATUS"], values="JIRA", aggfunc="count", fill_value=0).reset_index().rename(columns={"JIRA":"QTDE"})
-            pivot.to_excel(writer, sheet_name="Base KPI", index=False)
-            pd.DataFrame({"Placeholder":["Este espaço será usado para análises e dashboards."]}).to_excel(writer, sheet_name="Análises para Dashboard", index=False)
-            pd.DataFrame({"Placeholder":["Aba Acompanhamento SM - modelos e gráficos serão gerados no Streamlit."]}).to_excel(writer, sheet_name="Acompanhamento SM", index=False)
-        output.seek(0)
-        return output
-
-    excel_bytes = gerar_excel_em_bytes(df_tratada)
-    st.download_button("Baixar Excel tratado (com abas)", data=excel_bytes, file_name="Solicitacoes_Tratada_e_Bases.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    dv.tabela_detalhada(contexto)
+
+    # botões para baixar: o arquivo só é montado no clique (data como callable) e fica em cache por arquivo
+    rotulos_download = {
+        "xlsx": "Baixar Excel tratado (com abas)",
+        "parquet": "Baixar Parquet",
+        "feather": "Baixar Feather",
+        "csv": "Baixar CSV",
+    }
+    for col_download, formato in zip(st.columns(len(FORMATOS_EXPORTACAO)), FORMATOS_EXPORTACAO):
+        with col_download:
+            st.download_button(
+                rotulos_download[formato],
+                data=lambda formato=formato: _ler_exportacao(chave_arquivo, formato, df_tratada),
+                file_name=nome_arquivo(formato),
+                mime=FORMATOS_EXPORTACAO[formato][1],
+                key=f"download_{formato}",
+            )
+
+    # painel de performance: só com a instrumentação ligada (variável de ambiente KPI_SM_PERF)
+    if instrumentacao.ativo():
+        with st.expander("Performance", expanded=False):
+            tabela_perf = instrumentacao.tabela_registros(registros_perf)
+            st.caption(
+                "Tempo, linhas e pico de memória por etapa neste rerun "
+                "(etapas em cache não reaparecem; `nivel` > 0 = etapa interna)."
+            )
+            st.dataframe(tabela_perf, width="stretch", hide_index=True)
@@ -0,0 +1 @@
+"""Benchmarks do pipeline de KPIs (ver bench_pipeline.py) e gerador de bases sintéticas (sintetico.py)."""
@@ -0,0 +1,82 @@
+"""
+bench_importtime.py
+Tempo de inicialização (imports) até o primeiro desenho do app, medido com `python -X importtime`.
+Importa, num processo novo, os mesmos módulos que o topo do app.py importa (lidos do próprio app.py)
+e mostra o tempo total, os módulos mais caros e se dependências pesadas (plotly, xlsxwriter,
+openpyxl) foram carregadas já no import.
+
+Uso:
+    python benchmarks/bench_importtime.py [--alvo app|headless] [--top 15] [--repeticoes 3]
+"""
+
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PESADOS = ("plotly", "xlsxwriter", "openpyxl", "python_calamine", "pyarrow")
+_LINHA = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def imports_do_script(caminho: str) -> list:
+    """Módulos importados no nível de topo de um script (sem executá-lo)."""
+    with open(caminho, encoding="utf-8") as f:
+        arvore = ast.parse(f.read())
+    modulos = []
+    for no in arvore.body:
+        if isinstance(no, ast.Import):
+            modulos += [a.name for a in no.names]
+        elif isinstance(no, ast.ImportFrom) and no.module and no.level == 0:
+            modulos.append(no.module)
+    return list(dict.fromkeys(modulos))
+
+
+def medir(modulos: list) -> list:
+    """Roda `python -X importtime -c 'import ...'` e devolve [(self_us, cumulativo_us, nivel, modulo)]."""
+    codigo = "; ".join(f"import {m}" for m in modulos)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ, capture_output=True, text=True, check=True,
+    )
+    linhas = []
+    for linha in proc.stderr.splitlines():
+        m = _LINHA.match(linha)
+        if m:
+            linhas.append((int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2, m.group(4)))
+    return linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alvo", choices=["app", "headless"], default="app")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.alvo == "app":
+        modulos = imports_do_script(os.path.join(RAIZ, "app.py"))
+    else:
+        modulos = ["kpi_sm"]
+    print("módulos:", ", ".join(modulos))
+
+    execucoes = [medir(modulos) for _ in range(args.repeticoes)]
+    totais = [sum(c for _, c, nivel, _ in linhas if nivel == 0) for linhas in execucoes]
+    linhas = execucoes[totais.index(min(totais))]
+
+    print(f"tempo total de import: {min(totais) / 1e3:.0f} ms (melhor de {args.repeticoes})")
+    print(f"\n{'cumulativo (ms)':>16}  módulo (nível de topo)")
+    topo = sorted((l for l in linhas if l[2] == 0), key=lambda l: l[1], reverse=True)
+    for _, cumulativo, _, modulo in topo[: args.top]:
+        print(f"{cumulativo / 1e3:16.1f}  {modulo}")
+
+    carregados = {modulo.split(".")[0] for _, _, _, modulo in linhas}
+    print("\ndependências pesadas carregadas no import:")
+    for pesado in PESADOS:
+        print(f"  {pesado:<16} {'sim' if pesado in carregados else 'não'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+bench_leitura_excel.py
+Compara as engines de leitura de leitura_excel.ler_solicitacoes numa planilha sintética
+(benchmarks/sintetico.py).
+
+Uso:
+    python benchmarks/bench_leitura_excel.py [--linhas 100000] [--repeticoes 1]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.sintetico import gerar_planilha  # noqa: E402
+from leitura_excel import engines_disponiveis, ler_solicitacoes  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--repeticoes", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = os.path.join(tmp, "sintetico.xlsx")
+        t0 = time.perf_counter()
+        gerar_planilha(caminho, args.linhas)
+        print(f"planilha sintética: {args.linhas} linhas, {os.path.getsize(caminho) / 1e6:.1f} MB "
+              f"({time.perf_counter() - t0:.1f}s)")
+
+        for engine in engines_disponiveis():
+            tempos = []
+            for _ in range(args.repeticoes):
+                t0 = time.perf_counter()
+                df = ler_solicitacoes(caminho, engine=engine)
+                tempos.append(time.perf_counter() - t0)
+            print(f"{engine:<20} {min(tempos):8.2f}s  ({len(df)} linhas x {df.shape[1]} colunas)")
+
+
+if __name__ == "__main__":
+    main()
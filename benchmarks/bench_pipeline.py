@@ -0,0 +1,208 @@
+"""
+bench_pipeline.py
+Benchmark ponta a ponta do pipeline de KPIs numa base SOLICITAÇÕES sintética (benchmarks/sintetico.py):
+leitura do Excel (pd.read_excel e ler_solicitacoes_esquema), processar_solicitacoes, gerar_resumo_kpis,
+índices/rollup, cada passo de renderização do dashboard_view (com o Streamlit substituído por um
+stub, então mede-se só a agregação + montagem das figuras) e a exportação (Excel, Parquet, CSV).
+
+Cada etapa é medida `--repeticoes` vezes e vale o menor tempo. O resultado vai para um JSON
+(versão do pipeline, commit, versões de Python/pandas e segundos por etapa) para comparar versões:
+
+Uso:
+    python benchmarks/bench_pipeline.py [--linhas 10000 100000] [--repeticoes 3] [--saida resultado.json]
+    python benchmarks/bench_pipeline.py --linhas 100000 --comparar benchmarks/resultados/anterior.json
+
+Acima de sintetico.LIMITE_LINHAS_XLSX linhas (limite do Excel) a leitura e a exportação .xlsx são
+puladas e o pipeline parte do DataFrame bruto gerado em memória.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import pandas as pd  # noqa: E402
+
+import dashboard_view as dv  # noqa: E402
+import exportacao  # noqa: E402
+import kpi_calculos  # noqa: E402
+from benchmarks.sintetico import LIMITE_LINHAS_XLSX, gerar_solicitacoes, gravar_planilha  # noqa: E402
+from benchmarks.streamlit_falso import StreamlitFalso  # noqa: E402
+from contexto_render import ContextoRender  # noqa: E402
+from indice_filtros import IndiceFiltros  # noqa: E402
+from leitura_excel import ABA_SOLICITACOES, LINHA_CABECALHO, ler_solicitacoes_esquema  # noqa: E402
+from primeira_ocorrencia import IndicePrimeiraOcorrencia  # noqa: E402
+from processar_solicitacoes import VERSAO_PIPELINE, processar_solicitacoes  # noqa: E402
+from rollup_mensal import filtrar_rollup, gerar_rollup_mensal  # noqa: E402
+
+DIR_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+LIMITE_REGRESSAO = 1.2  # etapa 20% mais lenta que a referência = regressão
+MINIMO_SEGUNDOS = 0.01  # etapas abaixo disso são ruído de medição e não contam como regressão
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Cronometro:
+    """Acumula os tempos de cada etapa nas repetições (nome -> [segundos, ...])."""
+
+    def __init__(self):
+        self.tempos = {}
+
+    def medir(self, etapa, funcao, *args, **kwargs):
+        t0 = time.perf_counter()
+        resultado = funcao(*args, **kwargs)
+        self.tempos.setdefault(etapa, []).append(time.perf_counter() - t0)
+        return resultado
+
+    def resumo(self) -> dict:
+        return {etapa: {"segundos": min(t), "tempos": t} for etapa, t in self.tempos.items()}
+
+
+def _renderizar_dashboard(cron: Cronometro, df, kpis, rollup_base, primeira):
+    """Mesma sequência do app.py (um rerun), cada chamada do dashboard_view medida separadamente."""
+    indice = cron.medir("dashboard.indice_filtros", IndiceFiltros, df)
+    mask, selecoes = cron.medir("dashboard.header_com_filtros", dv.header_com_filtros, df, indice)
+    rollup = cron.medir("dashboard.filtrar_rollup", filtrar_rollup, rollup_base, selecoes)
+    ctx = cron.medir(
+        "dashboard.contexto_render", ContextoRender, df, mask, rollup,
+        selecoes=selecoes, primeira_ocorrencia=primeira,
+    )
+    cron.medir("dashboard.mostrar_kpi_cards", dv.mostrar_kpi_cards, kpis, ctx)
+    cron.medir("dashboard.grafico_linhas_por_bu", dv.grafico_linhas_por_bu, ctx)
+    cron.medir("dashboard.grafico_linhas_por_tipo", dv.grafico_linhas_por_tipo, ctx)
+    cron.medir("dashboard.grafico_pizza_status", dv.grafico_pizza_status, ctx)
+    cron.medir("dashboard.grafico_sla_mensal", dv.grafico_sla_mensal, ctx)
+    cron.medir("dashboard.tabela_detalhada", dv.tabela_detalhada, ctx)
+
+
+def executar(linhas: int, repeticoes: int, semente: int = 42) -> dict:
+    """Roda todas as etapas para uma base de `linhas` linhas e devolve {linhas, tamanho_xlsx_mb, etapas}."""
+    cron = Cronometro()
+    df_bruto = cron.medir("sintetico.gerar", gerar_solicitacoes, linhas, semente)
+    usar_xlsx = linhas <= LIMITE_LINHAS_XLSX
+    tamanho_mb = None
+
+    dv.st = StreamlitFalso()
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = os.path.join(tmp, "sintetico.xlsx")
+        if usar_xlsx:
+            cron.medir("sintetico.gravar_xlsx", gravar_planilha, df_bruto, caminho)
+            tamanho_mb = round(os.path.getsize(caminho) / 1e6, 2)
+
+        for _ in range(repeticoes):
+            if usar_xlsx:
+                cron.medir("leitura.pd_read_excel", pd.read_excel, caminho, sheet_name=ABA_SOLICITACOES,
+                           header=LINHA_CABECALHO, engine="openpyxl")
+                entrada = cron.medir("leitura.ler_solicitacoes_esquema", ler_solicitacoes_esquema, caminho)
+            else:
+                entrada = df_bruto.copy()
+
+            df = cron.medir("processar_solicitacoes", processar_solicitacoes, entrada)
+            kpis = cron.medir("kpi.gerar_resumo_kpis", kpi_calculos.gerar_resumo_kpis, df)
+            cron.medir("kpi.gerar_cubo_kpis", kpi_calculos.gerar_cubo_kpis, df)
+            rollup = cron.medir("rollup.gerar_rollup_mensal", gerar_rollup_mensal, df)
+            primeira = cron.medir("primeira_ocorrencia.indice", IndicePrimeiraOcorrencia, df)
+
+            dv.st.session_state.clear()
+            _renderizar_dashboard(cron, df, kpis, rollup, primeira)
+
+            if usar_xlsx:
+                cron.medir("exportacao.xlsx", exportacao.escrever_excel, df, os.path.join(tmp, "saida.xlsx"),
+                           rollup=rollup)
+            cron.medir("exportacao.parquet", exportacao.escrever_parquet, df, os.path.join(tmp, "saida.parquet"))
+            cron.medir("exportacao.csv", exportacao.escrever_csv, df, os.path.join(tmp, "saida.csv"))
+
+    return {"linhas": linhas, "tamanho_xlsx_mb": tamanho_mb, "etapas": cron.resumo()}
+
+
+def comparar(atual: dict, referencia: dict, limite: float = LIMITE_REGRESSAO) -> list:
+    """Imprime atual x referência por etapa (mesmo nº de linhas) e devolve as etapas que regrediram."""
+    regressoes = []
+    por_linhas = {e["linhas"]: e for e in referencia["execucoes"]}
+    for execucao in atual["execucoes"]:
+        ref = por_linhas.get(execucao["linhas"])
+        if ref is None:
+            print(f"\n{execucao['linhas']} linhas: sem referência no arquivo de comparação")
+            continue
+        print(f"\n{execucao['linhas']} linhas — referência {referencia['meta'].get('commit')} "
+              f"(pipeline v{referencia['meta'].get('versao_pipeline')})")
+        for etapa, medida in execucao["etapas"].items():
+            anterior = ref["etapas"].get(etapa)
+            if anterior is None:
+                continue
+            razao = medida["segundos"] / anterior["segundos"] if anterior["segundos"] else float("inf")
+            regrediu = razao > limite and medida["segundos"] >= MINIMO_SEGUNDOS
+            marca = "  REGRESSÃO" if regrediu else ""
+            print(f"  {etapa:<36} {anterior['segundos']:9.3f}s -> {medida['segundos']:9.3f}s  x{razao:5.2f}{marca}")
+            if regrediu:
+                regressoes.append((execucao["linhas"], etapa, razao))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000],
+                        help="tamanhos da base sintética (10 mil a 5 milhões)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="arquivo JSON (padrão: benchmarks/resultados/<data>_<commit>.json)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar etapa a etapa")
+    parser.add_argument("--limite", type=float, default=LIMITE_REGRESSAO,
+                        help="razão atual/referência acima da qual a etapa é marcada como regressão")
+    args = parser.parse_args()
+
+    commit = _commit_atual()
+    resultado = {
+        "meta": {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit,
+            "versao_pipeline": VERSAO_PIPELINE,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "plataforma": platform.platform(),
+            "repeticoes": args.repeticoes,
+            "semente": args.semente,
+        },
+        "execucoes": [],
+    }
+    for linhas in args.linhas:
+        print(f"\n== {linhas} linhas ==")
+        execucao = executar(linhas, args.repeticoes, args.semente)
+        resultado["execucoes"].append(execucao)
+        for etapa, medida in execucao["etapas"].items():
+            print(f"  {etapa:<36} {medida['segundos']:9.3f}s")
+
+    saida = args.saida or os.path.join(
+        DIR_RESULTADOS, f"{datetime.now():%Y%m%d_%H%M%S}_{commit or 'sem_commit'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"\nresultado gravado em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regressoes = comparar(resultado, json.load(f), args.limite)
+        if regressoes:
+            print(f"\n{len(regressoes)} etapa(s) acima de x{args.limite:.2f} da referência")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
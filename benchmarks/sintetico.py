@@ -0,0 +1,139 @@
+"""
+sintetico.py
+Gerador de bases SOLICITAÇÕES sintéticas e realistas para os benchmarks.
+- Variantes de cabeçalho que o pipeline normaliza (RENAME_MAP: 'RESP. SM', 'QTIA QUEST', acentos, caixa...)
+- STATUS com grafias misturadas ('Concluído', ' concluído', 'CONCLUÍDO', 'Work In Progress', 'On Hold'...)
+- JIRA com vazios, '-', números inteiros e floats vindos do Excel ('301.0')
+- Buracos de data (solicitação/conclusão ausentes) e conclusão só para parte dos concluídos
+- De 10 mil a 5 milhões de linhas (geração vetorizada com NumPy; a planilha .xlsx é limitada
+  a LIMITE_LINHAS_XLSX linhas pelo próprio Excel)
+"""
+
+import numpy as np
+import pandas as pd
+
+ABA_SOLICITACOES = "SOLICITAÇÕES"
+LIMITE_LINHAS_XLSX = 1_048_576 - 2  # título + cabeçalho
+
+# nome canônico -> variantes de cabeçalho bruto vistas nas planilhas (todas resolvidas por nome_canonico)
+VARIANTES_CABECALHO = {
+    "BU": ["BU", "bu", " BU "],
+    "RESP_BU": ["RESP. BU", "RESP BU", "Resp. BU"],
+    "DATA_SOLICITACAO": ["DATA SOLICITAÇÃO", "Data Solicitacao", "DATA_SOLICITAÇÃO"],
+    "CLIENTE": ["CLIENTE", "Cliente"],
+    "CATEGORIA": ["CATEGORIA", "Categoria"],
+    "DETALHE_QUESTIONAMENTO": ["DETALHE QUESTIONAMENTO", "DETALHE", "Detalhe Questionamento"],
+    "TIPO": ["TIPO", "Tipo"],
+    "RESP_SM": ["RESP. SM", "RESP  SM", "Resp. SM"],
+    "QTDE_QUEST": ["QTIA QUEST", "QTDE QUEST", "Qtde Quest"],
+    "JIRA": ["JIRA", "Jira"],
+    "QTDE_QUEST_JIRA": ["QTIA QUEST JIRA", "QTDE QUEST JIRA"],
+    "DATA_ABERTURA": ["DATA ABERTURA", "Data Abertura"],
+    "DATA_CONCLUSAO": ["DATA CONCLUSÃO", "Data Conclusao", "DATA_CONCLUSÃO"],
+    "OBSERVACOES": ["OBSERVAÇÕES", "Observacoes"],
+    "STATUS": ["STATUS", "Status"],
+    "CONCLUSAO_QUALITATIVA": ["CONCLUSÃO QUALITATIVA", "Conclusao Qualitativa"],
+}
+
+BUS = [f"BU {i} - {n}" for i, n in enumerate(
+    ["EDUARDO", "PEDRO", "DIEGO", "ANA", "JULIANA", "MARCOS", "GABRIELA", "ZUPPO", "JONATHAN", "LUDMILA"], start=1
+)] + ["PRODUTO"]
+TIPOS = [
+    "Estudo de Cobertura", "Questionamento", "Questionamento pós-liberação", "Validação Scanntrends",
+    "Analise de Sell In", "Triagem Set-Up 3.0", "Reunião cliente", "Dúvida",
+]
+RESPONSAVEIS_SM = ["Thulio", "Brenda", "Dani", "Victor", "Vanessa", "Alice", "Allan", "Caio", "Vini"]
+# (grafia, peso) — as variantes de 'concluído' colidem após a normalização do pipeline
+STATUS = [
+    ("Concluído", 0.60), ("concluído ", 0.08), ("CONCLUÍDO", 0.05), ("Concluído Parcialmente", 0.03),
+    ("Work In Progress", 0.14), ("work in progress", 0.04), ("On Hold", 0.04), ("Pendente", 0.02),
+]
+CONCLUSOES = ["", "", "", "OK, sem ajustes", "Reprocesso necessário", "reprocesso da base", "Ajuste de cadastro"]
+
+
+def cabecalho(semente: int = 0) -> list:
+    """Uma variante de cabeçalho por coluna canônica, na ordem da planilha original."""
+    rnd = np.random.default_rng(semente)
+    return [variantes[rnd.integers(len(variantes))] for variantes in VARIANTES_CABECALHO.values()]
+
+
+def gerar_solicitacoes(linhas: int, semente: int = 42, inicio: str = "2024-01-01", dias: int = 730) -> pd.DataFrame:
+    """
+    DataFrame bruto (como lido do Excel, antes do pipeline) com `linhas` linhas e cabeçalho variante.
+    Valores sorteados com NumPy de uma vez por coluna (5 milhões de linhas em poucos segundos).
+    """
+    rnd = np.random.default_rng(semente)
+    base = np.datetime64(inicio, "D")
+
+    solicitacao = base + rnd.integers(0, dias, linhas).astype("timedelta64[D]")
+    status = rnd.choice([s for s, _ in STATUS], linhas, p=[p for _, p in STATUS])
+    concluido = pd.Series(status).str.strip().str.lower().str.startswith("concl").to_numpy()
+    conclusao = solicitacao + rnd.integers(0, 60, linhas).astype("timedelta64[D]")
+    # buracos de data: conclusão só em parte dos concluídos (e raramente nos demais); ~2% sem solicitação
+    tem_conclusao = np.where(concluido, rnd.random(linhas) < 0.93, rnd.random(linhas) < 0.05)
+    conclusao = np.where(tem_conclusao, conclusao, np.datetime64("NaT"))
+    solicitacao = np.where(rnd.random(linhas) < 0.02, np.datetime64("NaT"), solicitacao)
+
+    # JIRA: ~35% vazio (None, '' ou '-'), o resto número (int ou float como vem do Excel)
+    n_jiras = max(linhas // 4, 10)
+    numeros = rnd.integers(100, 100 + n_jiras, linhas)
+    jira = np.where(rnd.random(linhas) < 0.5, numeros.astype(object), (numeros + 0.0).astype(object))
+    sorteio_vazio = rnd.random(linhas)
+    jira = np.where(sorteio_vazio < 0.15, None, jira)
+    jira = np.where((sorteio_vazio >= 0.15) & (sorteio_vazio < 0.25), "-", jira)
+    jira = np.where((sorteio_vazio >= 0.25) & (sorteio_vazio < 0.35), "", jira)
+
+    colunas = {
+        "BU": rnd.choice(BUS, linhas),
+        "RESP_BU": rnd.choice(["Resp A", "Resp B", "Resp C"], linhas),
+        "DATA_SOLICITACAO": solicitacao,
+        "CLIENTE": np.char.add("Fabricante ", rnd.integers(1, max(linhas // 50, 20), linhas).astype(str)),
+        "CATEGORIA": np.char.add("Categoria ", rnd.integers(1, 400, linhas).astype(str)),
+        "DETALHE_QUESTIONAMENTO": rnd.choice(["", "detalhe do questionamento", "ver anexo"], linhas),
+        "TIPO": rnd.choice(TIPOS, linhas),
+        "RESP_SM": rnd.choice(RESPONSAVEIS_SM, linhas),
+        "QTDE_QUEST": rnd.integers(1, 6, linhas),
+        "JIRA": jira,
+        "QTDE_QUEST_JIRA": rnd.integers(0, 4, linhas),
+        "DATA_ABERTURA": solicitacao,
+        "DATA_CONCLUSAO": conclusao,
+        "OBSERVACOES": rnd.choice(["", "", "cliente pediu urgência"], linhas),
+        "STATUS": status,
+        "CONCLUSAO_QUALITATIVA": rnd.choice(CONCLUSOES, linhas),
+    }
+    df = pd.DataFrame(colunas)
+    df.columns = cabecalho(semente)
+    return df
+
+
+def gravar_planilha(df: pd.DataFrame, caminho: str, titulo: str = "Solicitações ScannMarket"):
+    """Grava `df` na aba SOLICITAÇÕES (título na 1ª linha, cabeçalho na 2ª), em modo constant_memory."""
+    import xlsxwriter
+
+    if len(df) > LIMITE_LINHAS_XLSX:
+        raise ValueError(f"O Excel comporta no máximo {LIMITE_LINHAS_XLSX} linhas de dados por aba.")
+
+    wb = xlsxwriter.Workbook(caminho, {"constant_memory": True, "strings_to_numbers": False, "strings_to_urls": False})
+    ws = wb.add_worksheet(ABA_SOLICITACOES)
+    fmt_data = wb.add_format({"num_format": "yyyy-mm-dd"})
+    for i, c in enumerate(df.columns):
+        if pd.api.types.is_datetime64_any_dtype(df[c]):
+            ws.set_column(i, i, 12, fmt_data)
+    ws.write_row(0, 0, [titulo])
+    ws.write_row(1, 0, list(df.columns))
+
+    linha = 2
+    for inicio in range(0, len(df), 50_000):
+        bloco = df.iloc[inicio: inicio + 50_000]
+        valores = [bloco[c].astype(object).where(bloco[c].notna(), None).tolist() for c in bloco.columns]
+        for registro in zip(*valores):
+            ws.write_row(linha, 0, registro)
+            linha += 1
+    wb.close()
+
+
+def gerar_planilha(caminho: str, linhas: int, semente: int = 42) -> pd.DataFrame:
+    """Gera a base sintética e grava em `caminho`. Devolve o DataFrame bruto gerado."""
+    df = gerar_solicitacoes(linhas, semente)
+    gravar_planilha(df, caminho)
+    return df
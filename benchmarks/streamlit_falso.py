@@ -0,0 +1,26 @@
+"""
+streamlit_falso.py
+Substituto de `streamlit` para chamar o dashboard_view sem servidor (benchmarks e testes):
+toda chamada vira no-op, `columns` devolve blocos usáveis em `with`, `selectbox` escolhe a
+1ª opção ('Todos'). Uso: `dashboard_view.st = StreamlitFalso()`.
+"""
+
+
+class StreamlitFalso:
+    def __init__(self):
+        self.session_state = {}
+
+    def columns(self, spec, *args, **kwargs):
+        return [StreamlitFalso() for _ in range(spec if isinstance(spec, int) else len(spec))]
+
+    def selectbox(self, label, options, *args, **kwargs):
+        return list(options)[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, nome):
+        return lambda *args, **kwargs: StreamlitFalso()
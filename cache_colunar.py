@@ -0,0 +1,147 @@
+"""
+cache_colunar.py
+Cache persistente em disco (Feather) do DataFrame tratado da aba SOLICITAÇÕES.
+- Chave = SHA-256 do arquivo de origem + VERSAO_PIPELINE (muda quando o tratamento muda) +
+  impressão digital do calendário (feriados e mapa BU -> região, que definem as colunas de SLA)
+- Diretório ancorado ao lado deste módulo (ou KPI_SM_CACHE_DIR): app, CLI e lote compartilham o
+  mesmo cache, qualquer que seja o diretório de trabalho
+- Feather sem compressão: num acerto as colunas são decodificadas direto para pandas, sem parse
+  do Excel (o DataFrame é materializado em memória; não há leitura zero-copy)
+- Tamanho limitado por política LRU (número de arquivos e bytes totais). Um upload do app ocupa duas
+  entradas (DataFrame + assinaturas da ingestão incremental); a ingestão em lote aplica a política uma
+  vez no processo principal, com o limite de arquivos ampliado para caber o lote inteiro
+Depende de pyarrow; sem ele o cache fica desativado e tudo segue funcionando (só mais lento).
+pyarrow só é importado no primeiro acesso ao cache (não no import deste módulo).
+"""
+
+import hashlib
+import importlib.util
+import os
+import tempfile
+
+import pandas as pd
+
+import calendario_feriados
+from processar_solicitacoes import VERSAO_PIPELINE
+
+DIRETORIO_CACHE = os.environ.get(
+    "KPI_SM_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_kpi"),
+)
+MAX_ARQUIVOS = int(os.environ.get("KPI_SM_CACHE_MAX_ARQUIVOS", "64"))
+MAX_BYTES = int(os.environ.get("KPI_SM_CACHE_MAX_MB", "1024")) * 1024 * 1024
+
+_EXTENSAO = ".feather"
+
+
+def _feather():
+    """Módulo pyarrow.feather (import tardio) ou None se pyarrow não estiver instalado."""
+    if not cache_disponivel():
+        return None
+    import pyarrow.feather as feather
+
+    return feather
+
+
+def cache_disponivel() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def chave_cache(conteudo: bytes) -> str:
+    """SHA-256 do conteúdo do arquivo + versão do pipeline + impressão digital do calendário de feriados."""
+    calendario = calendario_feriados.impressao_digital()[:12]
+    return f"{hashlib.sha256(conteudo).hexdigest()}-v{VERSAO_PIPELINE}-{calendario}"
+
+
+def _caminho(chave: str, diretorio: str = None) -> str:
+    return os.path.join(diretorio or DIRETORIO_CACHE, chave + _EXTENSAO)
+
+
+def ler_cache(chave: str, diretorio: str = None):
+    """Devolve o DataFrame tratado do cache ou None se não houver."""
+    feather = _feather()
+    if feather is None:
+        return None
+    caminho = _caminho(chave, diretorio)
+    if not os.path.exists(caminho):
+        return None
+    try:
+        df = feather.read_table(caminho).to_pandas()
+    except Exception:
+        # arquivo corrompido/incompatível: descartar e tratar como ausência
+        _remover(caminho)
+        return None
+    # marcar uso recente para a política LRU
+    os.utime(caminho, None)
+    return df
+
+
+def gravar_cache(chave: str, df: pd.DataFrame, diretorio: str = None, lru: bool = True) -> bool:
+    """
+    Grava o DataFrame tratado no cache. Retorna False se não foi possível (sem pyarrow, tipo não suportado...).
+    `lru=False` não aplica a política LRU aqui (ex.: processos de um lote; o principal a aplica no fim).
+    """
+    feather = _feather()
+    if feather is None:
+        return False
+    diretorio = diretorio or DIRETORIO_CACHE
+    os.makedirs(diretorio, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=diretorio, suffix=".tmp")
+    os.close(fd)
+    try:
+        # sem compressão: leitura mais rápida (sem descompressão)
+        feather.write_feather(df.reset_index(drop=True), tmp, compression="uncompressed")
+        os.replace(tmp, _caminho(chave, diretorio))
+    except Exception:
+        _remover(tmp)
+        return False
+    if lru:
+        aplicar_lru(diretorio)
+    return True
+
+
+def aplicar_lru(diretorio: str = None, max_arquivos: int = None):
+    """
+    Remove os arquivos menos recentemente usados até respeitar `max_arquivos` (padrão MAX_ARQUIVOS)
+    e MAX_BYTES. Arquivos removidos por outro processo durante a varredura são ignorados.
+    """
+    diretorio = diretorio or DIRETORIO_CACHE
+    max_arquivos = MAX_ARQUIVOS if max_arquivos is None else max_arquivos
+    if not os.path.isdir(diretorio):
+        return
+    entradas = []
+    for nome in os.listdir(diretorio):
+        if nome.endswith(_EXTENSAO):
+            caminho = os.path.join(diretorio, nome)
+            try:
+                st = os.stat(caminho)
+            except FileNotFoundError:
+                continue
+            entradas.append((st.st_mtime, st.st_size, caminho))
+    entradas.sort(reverse=True)  # mais recentes primeiro
+
+    total = 0
+    for i, (_, tamanho, caminho) in enumerate(entradas):
+        total += tamanho
+        if i >= max_arquivos or (total > MAX_BYTES and i > 0):
+            _remover(caminho)
+
+
+def carregar_ou_processar(conteudo: bytes, processar, diretorio: str = None, lru: bool = True) -> pd.DataFrame:
+    """
+    Devolve o DataFrame tratado para `conteudo`: do cache em disco se existir,
+    senão chama `processar(conteudo)` e grava o resultado no cache (`lru` como em gravar_cache).
+    """
+    chave = chave_cache(conteudo)
+    df = ler_cache(chave, diretorio)
+    if df is None:
+        df = processar(conteudo)
+        gravar_cache(chave, df, diretorio, lru=lru)
+    return df
+
+
+def _remover(caminho: str):
+    try:
+        os.remove(caminho)
+    except OSError:
+        pass
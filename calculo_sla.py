@@ -0,0 +1,108 @@
+"""
+calculo_sla.py
+Motor colunar de SLA em dias úteis.
+- Converte colunas de datas para arrays datetime64[D]
+- Calcula np.busday_count de uma vez sobre o array inteiro (sem apply linha a linha)
+- Linhas com alguma data ausente (NaT) ficam como NaN
+- Desconta feriados via np.busdaycalendar pré-compilado (calendario_feriados), por BU/região; avisa
+  (calendario_feriados.FeriadosForaDaCobertura) quando há datas fora dos anos do arquivo de feriados
+- Duas variantes de SLA, calculadas juntas (uma contagem de dias úteis só):
+    SLA_DIAS_UTEIS_TODOS: todas as linhas com as duas datas (gráfico de SLA mensal / rollup)
+    SLA_DIAS_UTEIS: apenas linhas concluídas (KPI de SLA médio e cards)
+Usado pelo pipeline (processar_solicitacoes) e pelo wrapper escalar calcular_dias_uteis.
+"""
+
+import numpy as np
+import pandas as pd
+
+import calendario_feriados
+
+COLUNA_SLA_CONCLUIDOS = "SLA_DIAS_UTEIS"
+COLUNA_SLA_TODOS = "SLA_DIAS_UTEIS_TODOS"
+
+
+def _para_datetime64_dia(valores) -> np.ndarray:
+    """Converte qualquer sequência de datas (Series, array, lista) para datetime64[D]; inválidos viram NaT."""
+    serie = pd.to_datetime(pd.Series(valores), errors="coerce")
+    if getattr(serie.dt, "tz", None) is not None:
+        serie = serie.dt.tz_localize(None)
+    return serie.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+
+
+def dias_uteis_vetorizado(inicio, fim, calendario: np.busdaycalendar = None) -> np.ndarray:
+    """
+    Conta dias úteis entre `inicio` e `fim` (exclui o dia final, igual ao np.busday_count).
+    Sem `calendario`, usa o calendário nacional (seg-sex + feriados nacionais).
+    Retorna array float64 do mesmo tamanho das entradas, com NaN onde alguma data é NaT.
+    """
+    ini = _para_datetime64_dia(inicio)
+    fim_ = _para_datetime64_dia(fim)
+    if calendario is None:
+        calendario = calendario_feriados.obter_calendario()
+
+    resultado = np.full(len(ini), np.nan, dtype="float64")
+    validos = ~(np.isnat(ini) | np.isnat(fim_))
+    calendario_feriados.avisar_fora_da_cobertura(ini[validos], fim_[validos])
+    if validos.any():
+        resultado[validos] = np.busday_count(ini[validos], fim_[validos], busdaycal=calendario)
+    return resultado
+
+
+def dias_uteis_por_bu(inicio, fim, bu=None) -> np.ndarray:
+    """
+    Igual a dias_uteis_vetorizado, mas cada linha usa o calendário da região da sua BU.
+    Faz um np.busday_count por região distinta (poucas), nunca por linha.
+    """
+    if bu is None or not calendario_feriados.REGIAO_POR_BU:
+        return dias_uteis_vetorizado(inicio, fim)
+
+    ini = _para_datetime64_dia(inicio)
+    fim_ = _para_datetime64_dia(fim)
+    bus = pd.Series(bu).to_numpy(dtype=object)
+    regioes = pd.Series(bus).map({b: calendario_feriados.regiao_da_bu(b) for b in pd.unique(bus)}).to_numpy()
+
+    resultado = np.full(len(ini), np.nan, dtype="float64")
+    validos = ~(np.isnat(ini) | np.isnat(fim_))
+    calendario_feriados.avisar_fora_da_cobertura(ini[validos], fim_[validos])
+    for regiao in pd.unique(regioes[validos]):
+        sel = validos & (regioes == regiao)
+        resultado[sel] = np.busday_count(ini[sel], fim_[sel], busdaycal=calendario_feriados.obter_calendario(regiao))
+    return resultado
+
+
+def status_concluido(status) -> np.ndarray:
+    """
+    Máscara booleana do gate 'concl*' (STATUS já normalizado em minúsculas).
+    Para STATUS categórico, o teste de texto roda só sobre as categorias e é expandido pelos códigos.
+    """
+    status = pd.Series(status)
+    if isinstance(status.dtype, pd.CategoricalDtype):
+        por_categoria = np.asarray(status.cat.categories.astype(str).str.startswith("concl"), dtype=bool)
+        codigos = status.cat.codes.to_numpy()
+        if not len(por_categoria):
+            return np.zeros(len(codigos), dtype=bool)
+        return np.where(codigos >= 0, por_categoria[codigos], False)
+    return status.astype(str).str.startswith("concl", na=False).to_numpy(dtype=bool)
+
+
+def sla_todas_linhas(inicio, fim, bu=None) -> np.ndarray:
+    """SLA em dias úteis de todas as linhas com as duas datas, independente do STATUS."""
+    return dias_uteis_por_bu(inicio, fim, bu)
+
+
+def sla_concluidos(inicio, fim, status, bu=None) -> np.ndarray:
+    """
+    SLA em dias úteis apenas para linhas cujo STATUS começa com 'concl'
+    (STATUS já normalizado em minúsculas). Demais linhas ficam NaN.
+    """
+    return calcular_slas(inicio, fim, status, bu)[COLUNA_SLA_CONCLUIDOS]
+
+
+def calcular_slas(inicio, fim, status, bu=None) -> dict:
+    """
+    As duas variantes de SLA a partir de uma única contagem de dias úteis:
+    {COLUNA_SLA_TODOS: todas as linhas com as duas datas, COLUNA_SLA_CONCLUIDOS: só as concluídas}.
+    """
+    todas = sla_todas_linhas(inicio, fim, bu)
+    concluidos = np.where(status_concluido(status), todas, np.nan)
+    return {COLUNA_SLA_TODOS: todas, COLUNA_SLA_CONCLUIDOS: concluidos}
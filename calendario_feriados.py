@@ -0,0 +1,158 @@
+"""
+calendario_feriados.py
+Calendário de dias úteis com feriados (nacionais e regionais).
+- Lê um arquivo local de feriados (CSV `DATA;REGIAO;DESCRICAO` ou JSON `{"REGIAO": ["AAAA-MM-DD", ...]}`)
+- Monta um np.busdaycalendar por região UMA vez por processo (cache)
+- Resolve a região de cada BU pelo arquivo `regioes_bu.csv` (`BU;REGIAO`; linhas iniciadas por '#'
+  são comentários); BUs fora dele usam só os feriados nacionais (região "BR"). O arquivo padrão não
+  mapeia nenhuma BU: a região de cada uma é uma decisão do negócio, não algo que o código deduza
+- O arquivo de feriados cobre um intervalo de anos (anos_cobertos); SLAs com datas fora dele são
+  calculados só com fins de semana e emitem um FeriadosForaDaCobertura (aviso, não erro)
+Nenhum acesso à rede: os arquivos padrão ficam ao lado deste módulo, podendo ser trocados pelas
+variáveis de ambiente KPI_SM_FERIADOS e KPI_SM_REGIOES_BU.
+impressao_digital() resume feriados + mapa BU -> região (entra na chave do cache colunar).
+"""
+
+import csv
+import hashlib
+import json
+import os
+import warnings
+from functools import lru_cache
+
+import numpy as np
+
+REGIAO_NACIONAL = "BR"
+
+ARQUIVO_FERIADOS = os.environ.get(
+    "KPI_SM_FERIADOS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "feriados.csv"),
+)
+
+ARQUIVO_REGIOES_BU = os.environ.get(
+    "KPI_SM_REGIOES_BU",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "regioes_bu.csv"),
+)
+
+
+class FeriadosForaDaCobertura(UserWarning):
+    """Datas de SLA fora dos anos cobertos pelo arquivo de feriados (feriados ignorados nesses anos)."""
+
+
+def _chave_bu(bu: str) -> str:
+    return " ".join(str(bu).split()).upper()
+
+
+def carregar_regioes_bu(caminho: str = None) -> dict:
+    """Lê o mapa BU -> região (CSV `BU;REGIAO`); arquivo ausente = mapa vazio (só feriados nacionais)."""
+    caminho = caminho or ARQUIVO_REGIOES_BU
+    regioes = {}
+    if not os.path.exists(caminho):
+        return regioes
+    with open(caminho, encoding="utf-8", newline="") as f:
+        for linha in csv.DictReader(f, delimiter=";"):
+            bu, regiao = (linha.get("BU") or "").strip(), (linha.get("REGIAO") or "").strip()
+            if bu and regiao and not bu.startswith("#"):
+                regioes[_chave_bu(bu)] = regiao.upper()
+    return regioes
+
+
+# BU (normalizada: espaços colapsados, MAIÚSCULAS) -> região de feriados regionais.
+# BUs fora do mapa usam apenas os feriados nacionais.
+REGIAO_POR_BU = carregar_regioes_bu()
+
+
+@lru_cache(maxsize=None)
+def _carregar_feriados(caminho: str) -> dict:
+    """Lê o arquivo de feriados e devolve {REGIAO: tuple de datas 'AAAA-MM-DD'}."""
+    feriados = {}
+    if not os.path.exists(caminho):
+        return feriados
+
+    if caminho.lower().endswith(".json"):
+        with open(caminho, encoding="utf-8") as f:
+            dados = json.load(f)
+        for regiao, datas in dados.items():
+            feriados.setdefault(str(regiao).strip().upper(), []).extend(str(d).strip() for d in datas)
+    else:
+        with open(caminho, encoding="utf-8", newline="") as f:
+            for linha in csv.DictReader(f, delimiter=";"):
+                data = (linha.get("DATA") or "").strip()
+                if not data:
+                    continue
+                regiao = (linha.get("REGIAO") or REGIAO_NACIONAL).strip().upper()
+                feriados.setdefault(regiao, []).append(data)
+
+    return {regiao: tuple(sorted(set(datas))) for regiao, datas in feriados.items()}
+
+
+def obter_calendario(regiao: str = REGIAO_NACIONAL, caminho: str = None) -> np.busdaycalendar:
+    """
+    Devolve o np.busdaycalendar (seg-sex + feriados) da região.
+    Regiões regionais somam os feriados nacionais aos próprios.
+    O calendário é construído uma única vez por (região, arquivo).
+    """
+    return _calendario((regiao or REGIAO_NACIONAL).strip().upper(), caminho or ARQUIVO_FERIADOS)
+
+
+@lru_cache(maxsize=None)
+def _calendario(regiao: str, caminho: str) -> np.busdaycalendar:
+    feriados = _carregar_feriados(caminho)
+    datas = list(feriados.get(REGIAO_NACIONAL, ()))
+    if regiao != REGIAO_NACIONAL:
+        datas += list(feriados.get(regiao, ()))
+    return np.busdaycalendar(weekmask="1111100", holidays=np.array(sorted(set(datas)), dtype="datetime64[D]"))
+
+
+def anos_cobertos(caminho: str = None):
+    """(primeiro, último) ano com feriados nacionais no arquivo; None se não houver feriados."""
+    nacionais = _carregar_feriados(caminho or ARQUIVO_FERIADOS).get(REGIAO_NACIONAL, ())
+    if not nacionais:
+        return None
+    return int(nacionais[0][:4]), int(nacionais[-1][:4])
+
+
+def avisar_fora_da_cobertura(*datas: np.ndarray):
+    """
+    Emite FeriadosForaDaCobertura se alguma data (arrays datetime64[D], NaT ignorado) cair fora de
+    anos_cobertos(): nesses anos o SLA desconta só fins de semana.
+    """
+    cobertura = anos_cobertos()
+    validas = [d[~np.isnat(d)] for d in datas]
+    validas = [d for d in validas if len(d)]
+    if not validas:
+        return
+    anos = np.concatenate(validas).astype("datetime64[Y]").astype(int) + 1970
+    primeiro, ultimo = int(anos.min()), int(anos.max())
+    if cobertura is None or primeiro < cobertura[0] or ultimo > cobertura[1]:
+        cobertos = "nenhum" if cobertura is None else f"{cobertura[0]}–{cobertura[1]}"
+        warnings.warn(
+            f"Datas de {primeiro} a {ultimo}, mas o arquivo de feriados ({ARQUIVO_FERIADOS}) cobre: {cobertos}. "
+            "Fora desses anos o SLA desconta só fins de semana.",
+            FeriadosForaDaCobertura,
+            stacklevel=3,
+        )
+
+
+def regiao_da_bu(bu) -> str:
+    """Região de feriados de uma BU (nacional quando não mapeada)."""
+    if not isinstance(bu, str):
+        return REGIAO_NACIONAL
+    return REGIAO_POR_BU.get(_chave_bu(bu), REGIAO_NACIONAL)
+
+
+def calendario_da_bu(bu) -> np.busdaycalendar:
+    return obter_calendario(regiao_da_bu(bu))
+
+
+
+def impressao_digital() -> str:
+    """
+    Resumo (SHA-256) dos feriados carregados e do mapa BU -> região em uso: muda quando o arquivo de
+    feriados (ou KPI_SM_FERIADOS) ou o mapeamento de regiões mudam, invalidando SLAs já persistidos.
+    """
+    conteudo = {
+        "feriados": _carregar_feriados(ARQUIVO_FERIADOS),
+        "regioes": sorted(REGIAO_POR_BU.items()),
+    }
+    return hashlib.sha256(json.dumps(conteudo, sort_keys=True).encode()).hexdigest()
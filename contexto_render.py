@@ -0,0 +1,81 @@
+"""
+contexto_render.py
+Contexto de renderização criado UMA vez por rerun do dashboard e compartilhado (somente leitura)
+por todos os cards e gráficos.
+- Recorte filtrado (df[mask]) materializado uma única vez
+- Arrays de datas já convertidos (datetime64[ns]) e código do mês de cada linha
+- Máscara de "possui JIRA" (coluna POSSUI_JIRA da ingestão)
+- Rollup mensal já filtrado (quando fornecido)
+- Seleções do header e índice de primeira ocorrência (primeira_ocorrencia), quando fornecidos
+Nenhuma função de renderização deve copiar o DataFrame inteiro; `copias` conta as cópias
+de frame inteiro feitas pelo contexto (no máximo 1 por rerun).
+"""
+
+import numpy as np
+import pandas as pd
+
+from normalizacao_jira import possui_jira
+
+SEM_MES = np.iinfo("int64").min
+
+
+def codigo_mes(datas) -> np.ndarray:
+    """Meses desde 1970-01 (int64) de cada data; NaT vira SEM_MES."""
+    datas = np.asarray(datas, dtype="datetime64[ns]")
+    return datas.astype("datetime64[M]").astype("int64")
+
+
+def codigo_do_mes(referencia) -> int:
+    """Código (meses desde 1970-01) de um mês de referência (Timestamp, datetime ou 'AAAA-MM')."""
+    return int(np.datetime64(pd.Timestamp(referencia), "M").astype("int64"))
+
+
+class ContextoRender:
+    """Visão filtrada + arrays derivados, montados uma vez por rerun e lidos por todos os widgets."""
+
+    def __init__(self, df: pd.DataFrame, mask=None, rollup: pd.DataFrame = None,
+                 selecoes: dict = None, primeira_ocorrencia=None):
+        self.df = df
+        self.copias = 0
+
+        if mask is None or bool(np.asarray(mask, dtype=bool).all()):
+            self.mask = np.ones(len(df), dtype=bool)
+            self.df_filtrado = df
+        else:
+            self.mask = np.asarray(mask, dtype=bool)
+            self.df_filtrado = df[self.mask]
+            self.copias += 1
+
+        self.datas_solicitacao = self._datas("DATA_SOLICITACAO")
+        self.datas_conclusao = self._datas("DATA_CONCLUSAO")
+        # NaT.astype(int64) já é o menor int64 (= SEM_MES)
+        self.codigo_mes = codigo_mes(self.datas_solicitacao)
+        self.possui_jira = possui_jira(self.df_filtrado)
+
+        self.rollup = rollup
+        self.selecoes = dict(selecoes or {})
+        self.primeira_ocorrencia = primeira_ocorrencia
+
+    def _datas(self, coluna: str) -> np.ndarray:
+        if coluna not in self.df_filtrado.columns:
+            return np.full(len(self.df_filtrado), np.datetime64("NaT"), dtype="datetime64[ns]")
+        serie = self.df_filtrado[coluna]
+        if not pd.api.types.is_datetime64_any_dtype(serie):
+            serie = pd.to_datetime(serie, errors="coerce")
+        return serie.to_numpy(dtype="datetime64[ns]")
+
+    @property
+    def vazio(self) -> bool:
+        return len(self.df_filtrado) == 0
+
+    def coluna(self, nome: str) -> np.ndarray:
+        """Valores de uma coluna do recorte (view NumPy, sem cópia do frame)."""
+        return self.df_filtrado[nome].to_numpy()
+
+    def linhas_no_mes(self, referencia) -> np.ndarray:
+        """Máscara das linhas cuja DATA_SOLICITACAO cai no mês de `referencia`."""
+        return self.codigo_mes == codigo_do_mes(referencia)
+
+    def linhas_desde(self, inicio) -> np.ndarray:
+        """Máscara das linhas com DATA_SOLICITACAO >= inicio (NaT fica de fora)."""
+        return self.datas_solicitacao >= np.datetime64(pd.Timestamp(inicio), "ns")
@@ -1,21 +1,41 @@
+import base64
+import math
+from datetime import datetime
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from io import BytesIO
 import numpy as np
 
+import kpi_calculos as kc
+from instrumentacao import medir
+from resolucao_cabecalho import encontrar_coluna
+from indice_filtros import IndiceFiltros
+from rollup_mensal import gerar_rollup_mensal, serie_mensal
+from contexto_render import ContextoRender, codigo_do_mes, codigo_mes
+
+# séries mensais e card 5 consideram dados a partir de jul/2025
+INICIO_SERIES = pd.Timestamp(2025, 7, 1)
+
+# plotly é importado só dentro das funções de gráfico (carregado no primeiro gráfico desenhado,
+# não no import do módulo); este módulo não tem efeitos colaterais de import.
+
+
 # ===============================================================
 # CONFIGURAÇÕES DE PÁGINA E ESTILO GERAL
 # ===============================================================
-st.set_page_config(
-    page_title="Acompanhamento KPI ScannMarket",
-    page_icon="📊",
-    layout="wide",
-)
-
-# CSS customizado para estilo executivo e ocupar toda a tela
-st.markdown("""
+def configurar_pagina():
+    """set_page_config + CSS global. Chamar uma vez, como primeiro comando Streamlit do app."""
+    st.set_page_config(
+        page_title="Acompanhamento KPI ScannMarket",
+        page_icon="📊",
+        layout="wide",
+    )
+
+    # CSS customizado para estilo executivo e ocupar toda a tela
+    st.markdown(CSS_GLOBAL, unsafe_allow_html=True)
+
+
+CSS_GLOBAL = """
     <style>
         /* Remove margens e padding extras */
         .block-container {
@@ -63,23 +83,25 @@ st.markdown("""
             color: #666;
         }
     </style>
-""", unsafe_allow_html=True)
+"""
 
 # ===============================================================
 # HEADER COM LOGO E FILTROS
 # ===============================================================
 
-import base64
-
-def header_com_filtros(df):
-    """Cria o header com logo da Scanntech e filtros no topo."""
+@medir()
+def header_com_filtros(df, indice=None):
+    """
+    Cria o header com logo da Scanntech e filtros no topo.
+    `indice` (IndiceFiltros) pode vir pré-construído/cacheado; sem ele, é montado aqui.
+    Retorna (máscara, seleções): a máscara por linha e as seleções ({dimensão: valor ou 'Todos'}),
+    para quem consome tabelas pré-agregadas (rollup mensal) em vez da máscara.
+    """
 
-    # --- Garantir que a coluna RESP_SM exista ---
-    df_cols_upper = {c.upper().replace(".", "").replace(" ", "_"): c for c in df.columns}
-    for key in df_cols_upper.keys():
-        if "RESP_SM" in key or "RESPONSAVEL_SM" in key or "RESP_SM" in key.replace("_", ""):
-            df = df.rename(columns={df_cols_upper[key]: "RESP_SM"})
-            break
+    # --- Garantir que a coluna RESP_SM exista (variantes resolvidas por resolucao_cabecalho) ---
+    coluna_resp = encontrar_coluna(df.columns, "RESP_SM")
+    if coluna_resp is not None and coluna_resp != "RESP_SM":
+        df = df.rename(columns={coluna_resp: "RESP_SM"})
 
     # --- CSS visual do header ---
     st.markdown("""
@@ -158,30 +180,29 @@ def header_com_filtros(df):
 
 
     # --- Filtros (4 colunas alinhadas) ---
+    if indice is None:
+        indice = IndiceFiltros(df)
     cols = st.columns([1, 1, 1, 1])
-    bu_vals = ["Todos"] + sorted(df["BU"].dropna().unique().tolist())
-    resp_vals = ["Todos"] + sorted(df["RESP_SM"].dropna().unique().tolist()) if "RESP_SM" in df.columns else ["Todos"]
-    status_vals = ["Todos"] + sorted(df["STATUS"].dropna().unique().tolist()) if "STATUS" in df.columns else ["Todos"]
-    tipo_vals = ["Todos"] + sorted(df["TIPO"].dropna().unique().tolist()) if "TIPO" in df.columns else ["Todos"]
+    bu_vals = ["Todos"] + indice.opcoes("BU")
+    resp_vals = ["Todos"] + indice.opcoes("RESP_SM")
+    status_vals = ["Todos"] + indice.opcoes("STATUS")
+    tipo_vals = ["Todos"] + indice.opcoes("TIPO")
 
     selected_bu = cols[0].selectbox("BU", bu_vals)
     selected_resp = cols[1].selectbox("Responsável SM", resp_vals)
     selected_status = cols[2].selectbox("Status", status_vals)
     selected_tipo = cols[3].selectbox("Tipo", tipo_vals)
 
-    # --- Construir máscara de filtro ---
-    mask = pd.Series(True, index=df.index)
-    if selected_bu != "Todos":
-        mask &= (df["BU"] == selected_bu)
-    if selected_resp != "Todos":
-        mask &= (df["RESP_SM"] == selected_resp)
-    if selected_status != "Todos":
-        mask &= (df["STATUS"] == selected_status)
-    if selected_tipo != "Todos":
-        mask &= (df["TIPO"] == selected_tipo)
-
-    return mask
+    # --- Construir máscara de filtro (AND dos bitmaps pré-computados) ---
+    selecoes = {
+        "BU": selected_bu,
+        "RESP_SM": selected_resp,
+        "STATUS": selected_status,
+        "TIPO": selected_tipo,
+    }
+    mask = indice.mascara(selecoes)
 
+    return mask, selecoes
 
 
 # ===============================   ================================
@@ -206,7 +227,8 @@ def calcular_kpis(df):
 # ------------------------------------------------------------
 # 2️⃣ KPIs - Cards principais (compatível com dict ou DataFrame)
 # ------------------------------------------------------------
-def mostrar_kpi_cards(data, df_fonte=None):
+@medir()
+def mostrar_kpi_cards(data, df_fonte=None, rollup=None, mes_referencia=None):
     """
     Exibe os principais KPIs em cards executivos com sombra suave.
 
@@ -214,25 +236,25 @@ def mostrar_kpi_cards(data, df_fonte=None):
       - data: pd.DataFrame OR dict
           Se for pd.DataFrame, a função calcula os KPIs e também mês/semana vigentes.
           Se for dict (resumo), a função usa os valores disponíveis.
-      - df_fonte: pd.DataFrame (opcional)
-          Se 'data' for dict e você passar df_fonte, será usado df_fonte para cálculos adicionais.
+      - df_fonte: ContextoRender OR pd.DataFrame (opcional)
+          Se 'data' for dict, df_fonte é usado para os cálculos adicionais. O app passa o
+          ContextoRender do rerun (recorte filtrado + datas já convertidas), sem cópias.
+      - rollup: pd.DataFrame (opcional)
+          Rollup mensal (rollup_mensal) já filtrado, usado no card 5. Sem ele, é montado a partir do df.
+      - mes_referencia: data/Timestamp/'AAAA-MM' (opcional)
+          Mês dos "novos no mês" (cards 3/4) e do "Mês atual" do card 5; padrão: mês corrente.
+          "Desde julho" (cards 3/4) usa o ano dele.
 
     Observações:
-      - Para os novos requisitos, usamos `df_fonte` (DataFrame filtrado) para:
+      - Para os novos requisitos, usamos o recorte filtrado para:
          * SLA separado em linhas sem JIRA (principal) e com JIRA (subvalor)
-         * Card 5: categorias únicas no mês e clientes/fabricantes únicos no mês
+         * Cards 3/4: fabricantes e categorias únicos desde julho + novos no mês
+         * Card 5: totais desde jul/25, mês atual e média mensal (rollup)
     """
-    import kpi_calculos as kc
-    import math
-    import pandas as pd
-    import numpy as np
-    from datetime import datetime
-    import streamlit as st
-
     # Determinar se 'data' é DataFrame (então usamos ele como fonte) ou dict (resumo)
-    df_for_calc = None
+    contexto = None
     if isinstance(data, pd.DataFrame):
-        df_for_calc = data.copy()
+        contexto = _contexto(data, rollup=rollup)
         try:
             resumo = kc.gerar_resumo_kpis(data)
         except Exception:
@@ -240,8 +262,8 @@ def mostrar_kpi_cards(data, df_fonte=None):
     else:
         resumo = data if isinstance(data, dict) else {}
         # se foi passado df_fonte (2º argumento), usamos ele para cálculos temporais
-        if isinstance(df_fonte, pd.DataFrame):
-            df_for_calc = df_fonte.copy()
+        if isinstance(df_fonte, (ContextoRender, pd.DataFrame)):
+            contexto = _contexto(df_fonte, rollup=rollup)
 
     # --- Mapear keys possíveis para os nomes que usaremos aqui ---
     def pick(*keys):
@@ -285,42 +307,35 @@ def mostrar_kpi_cards(data, df_fonte=None):
     # 1) SLA separado: sem JIRA (principal) e com JIRA (subvalor)
     sla_sem_jira = None
     sla_com_jira = None
-    if df_for_calc is not None and "SLA_DIAS_UTEIS" in df_for_calc.columns and "JIRA" in df_for_calc.columns:
-        # garantir tipos e padronizar JIRA vazio como string vazia
-        df_for_calc["JIRA_STR"] = df_for_calc["JIRA"].astype(str).fillna("").str.strip()
-        # filtrar apenas linhas com SLA calculado (não NaN)
-        df_sla = df_for_calc[df_for_calc["SLA_DIAS_UTEIS"].notna()].copy()
-
-        if not df_sla.empty:
-            sla_sem_jira_vals = df_sla[df_sla["JIRA_STR"] == ""]["SLA_DIAS_UTEIS"]
-            sla_com_jira_vals = df_sla[df_sla["JIRA_STR"] != ""]["SLA_DIAS_UTEIS"]
-
-            sla_sem_jira = float(sla_sem_jira_vals.mean()) if not sla_sem_jira_vals.empty else float("nan")
-            sla_com_jira = float(sla_com_jira_vals.mean()) if not sla_com_jira_vals.empty else float("nan")
-
-    # 2) Card 5: categorias únicas no mês e clientes/fabricantes únicos no mês
-    total_categorias_mes = "-"
-    total_clientes_mes = "-"
-    if df_for_calc is not None and "DATA_SOLICITACAO" in df_for_calc.columns:
-        df_dates = df_for_calc.copy()
-        df_dates["DATA_SOLICITACAO"] = pd.to_datetime(df_dates["DATA_SOLICITACAO"], errors="coerce")
-        hoje = datetime.now()
-        mes_vig = df_dates[
-            (df_dates["DATA_SOLICITACAO"].dt.month == hoje.month) &
-            (df_dates["DATA_SOLICITACAO"].dt.year == hoje.year)
-        ]
-        if not mes_vig.empty:
-            # categorias únicas
-            if "CATEGORIA" in mes_vig.columns:
-                total_categorias_mes = int(mes_vig["CATEGORIA"].dropna().nunique())
-            else:
-                total_categorias_mes = 0
-            # clientes/fabricantes únicos - usar coluna CLIENTE se existir, senão usar PRODUTO
-            cliente_col = "CLIENTE" if "CLIENTE" in mes_vig.columns else ("PRODUTO" if "PRODUTO" in mes_vig.columns else None)
-            if cliente_col is not None:
-                total_clientes_mes = int(mes_vig[cliente_col].dropna().nunique())
-            else:
-                total_clientes_mes = 0
+    if contexto is not None and "SLA_DIAS_UTEIS" in contexto.df_filtrado.columns and "JIRA" in contexto.df_filtrado.columns:
+        sla = contexto.coluna("SLA_DIAS_UTEIS").astype("float64")
+        # apenas linhas com SLA calculado (não NaN)
+        com_sla = ~np.isnan(sla)
+
+        if com_sla.any():
+            sla_sem_jira_vals = sla[com_sla & ~contexto.possui_jira]
+            sla_com_jira_vals = sla[com_sla & contexto.possui_jira]
+
+            sla_sem_jira = float(sla_sem_jira_vals.mean()) if len(sla_sem_jira_vals) else float("nan")
+            sla_com_jira = float(sla_com_jira_vals.mean()) if len(sla_com_jira_vals) else float("nan")
+
+    referencia = pd.Timestamp(mes_referencia) if mes_referencia is not None else pd.Timestamp(datetime.now())
+
+    def _unicos_desde_julho_e_novos(coluna):
+        """Valores distintos desde julho e quantos têm a 1ª ocorrência (data mínima) no mês de referência."""
+        inicio = datetime(referencia.year, 7, 1)
+        indice = contexto.primeira_ocorrencia
+        if indice is not None and coluna in indice.entidades():
+            # consulta ao índice pré-computado (recortado pelas mesmas seleções do header)
+            return (
+                indice.unicos_desde(coluna, inicio, contexto.selecoes),
+                indice.novos_no_mes(coluna, referencia, contexto.selecoes),
+            )
+        serie = contexto.df_filtrado[coluna]
+        unicos = serie[contexto.linhas_desde(inicio)].nunique()
+        primeira = pd.Series(contexto.datas_solicitacao, index=serie.index).groupby(serie, observed=True).min()
+        novos = int((codigo_mes(primeira.to_numpy()) == codigo_do_mes(referencia)).sum())
+        return unicos, novos
 
     # --- Layout visual dos 5 cards ---
     col1, col2, col3, col4, col5 = st.columns(5)
@@ -382,25 +397,9 @@ def mostrar_kpi_cards(data, df_fonte=None):
     fabricantes_unicos = "-"
     fabricantes_novos = "-"
 
-    if df_for_calc is not None and "DATA_SOLICITACAO" in df_for_calc.columns and "CLIENTE" in df_for_calc.columns:
-
-        df_aux = df_for_calc.copy()
-        df_aux["DATA_SOLICITACAO"] = pd.to_datetime(df_aux["DATA_SOLICITACAO"], errors="coerce")
-
-        hoje = datetime.now()
-
-        # recorte: apenas dados de JULHO pra frente
-        df_julho = df_aux[df_aux["DATA_SOLICITACAO"] >= datetime(hoje.year, 7, 1)]
-
-        # fabricantes únicos desde julho
-        fabricantes_unicos = df_julho["CLIENTE"].nunique()
-
-        # fabricantes cuja 1ª ocorrência é neste mês
-        primeira_ocorrencia = df_aux.sort_values("DATA_SOLICITACAO").groupby("CLIENTE").first().reset_index()
-        fabricantes_novos = primeira_ocorrencia[
-            (primeira_ocorrencia["DATA_SOLICITACAO"].dt.month == hoje.month) &
-            (primeira_ocorrencia["DATA_SOLICITACAO"].dt.year == hoje.year)
-        ]["CLIENTE"].nunique()
+    if contexto is not None and "DATA_SOLICITACAO" in contexto.df_filtrado.columns and "CLIENTE" in contexto.df_filtrado.columns:
+        # fabricantes únicos desde julho + fabricantes cuja 1ª ocorrência é neste mês
+        fabricantes_unicos, fabricantes_novos = _unicos_desde_julho_e_novos("CLIENTE")
 
     with col3:
         st.markdown(f"""
@@ -419,22 +418,8 @@ def mostrar_kpi_cards(data, df_fonte=None):
     categorias_unicas = "-"
     categorias_novas = "-"
 
-    if df_for_calc is not None and "DATA_SOLICITACAO" in df_for_calc.columns and "CATEGORIA" in df_for_calc.columns:
-
-        df_aux = df_for_calc.copy()
-        df_aux["DATA_SOLICITACAO"] = pd.to_datetime(df_aux["DATA_SOLICITACAO"], errors="coerce")
-
-        hoje = datetime.now()
-
-        df_julho = df_aux[df_aux["DATA_SOLICITACAO"] >= datetime(hoje.year, 7, 1)]
-
-        categorias_unicas = df_julho["CATEGORIA"].nunique()
-
-        primeira_categoria = df_aux.sort_values("DATA_SOLICITACAO").groupby("CATEGORIA").first().reset_index()
-        categorias_novas = primeira_categoria[
-            (primeira_categoria["DATA_SOLICITACAO"].dt.month == hoje.month) &
-            (primeira_categoria["DATA_SOLICITACAO"].dt.year == hoje.year)
-        ]["CATEGORIA"].nunique()
+    if contexto is not None and "DATA_SOLICITACAO" in contexto.df_filtrado.columns and "CATEGORIA" in contexto.df_filtrado.columns:
+        categorias_unicas, categorias_novas = _unicos_desde_julho_e_novos("CATEGORIA")
 
     with col4:
         st.markdown(f"""
@@ -454,32 +439,21 @@ def mostrar_kpi_cards(data, df_fonte=None):
     total_mes_atual = "-"
     media_mensal = "-"
 
-    if df_for_calc is not None and "DATA_SOLICITACAO" in df_for_calc.columns:
+    rollup = contexto.rollup if contexto is not None else None
+    if rollup is not None:
+        # --- 1) Desde JULHO/2025, por mês (a partir do rollup mensal) ---
+        por_mes = serie_mensal(rollup, desde=INICIO_SERIES)
 
-        df_aux = df_for_calc.copy()
-        df_aux["DATA_SOLICITACAO"] = pd.to_datetime(df_aux["DATA_SOLICITACAO"], errors="coerce")
+        if not por_mes.empty:
+            # Total desde julho
+            total_desde_jul = str(int(por_mes["QTDE_QUEST"].sum()))
 
-        # --- 1) Filtrar desde JULHO/2025 ---
-        inicio = pd.Timestamp(2025, 7, 1)
-        df_desde_jul = df_aux[df_aux["DATA_SOLICITACAO"] >= inicio]
+            # --- 2) Total do mês de referência (o mesmo dos cards 3/4) ---
+            mes_atual = referencia.to_period("M").to_timestamp()
+            total_mes_atual = str(int(por_mes.loc[por_mes["MES"] == mes_atual, "QTDE_QUEST"].sum()))
 
-        if not df_desde_jul.empty:
-            # Total desde julho
-            # total_desde_jul = str(len(df_desde_jul))
-            total_desde_jul = str(int(df_desde_jul['QTDE_QUEST'].sum()))
-
-            # --- 2) Total do mês atual ---
-            hoje = datetime.now()
-            df_mes = df_desde_jul[
-                (df_desde_jul["DATA_SOLICITACAO"].dt.month == hoje.month) &
-                (df_desde_jul["DATA_SOLICITACAO"].dt.year == hoje.year)
-            ]
-            # total_mes_atual = str(len(df_mes))
-            total_mes_atual = str(int(df_mes['QTDE_QUEST'].sum()))
-
-            # --- 3) Média mensal ---
-            df_desde_jul["ANO_MES"] = df_desde_jul["DATA_SOLICITACAO"].dt.to_period("M")
-            media_calc = df_desde_jul.groupby("ANO_MES").size().mean()
+            # --- 3) Média mensal (solicitações por mês) ---
+            media_calc = por_mes["N_LINHAS"].mean()
             media_mensal = f"{media_calc:.0f}"
 
     with col5:
@@ -508,113 +482,52 @@ def mostrar_kpi_cards(data, df_fonte=None):
 def __detect_qty_col(df):
     """
     Retorna o nome da coluna que representa a quantidade de questionamentos,
-    tentando cobrir variantes comuns no Excel: QTDE_QUEST, QTIA_QUEST, 'QTIA QUEST', etc.
-    Retorna None se não encontrar.
+    resolvendo as variantes do Excel (QTDE_QUEST, QTIA_QUEST, 'QTIA QUEST', etc.) pelo
+    registro de aliases de resolucao_cabecalho. Retorna None se não encontrar.
     """
     if df is None:
         return None
-    cols = [c.upper().replace(".", "_").replace(" ", "_") for c in df.columns]
-    mapping = dict(zip(cols, df.columns))  # map normalized -> original
-    candidates = ["QTDE_QUEST", "QTIA_QUEST", "QTDE_QUEST_JIRA", "QTDEQUEST", "QTIAQUEST", "QTIA_QUEST_JIRA"]
-    for cand in candidates:
-        if cand in mapping:
-            return mapping[cand]
-    # also try exact names
-    for try_name in ["QTDE_QUEST", "QTIA QUEST", "QTIA_QUEST", "QTDE QUEST"]:
-        if try_name in df.columns:
-            return try_name
-    return None
+    return encontrar_coluna(df.columns, "QTDE_QUEST", "QTDE_QUEST_JIRA")
 
 # ---------------------------
-# Helper: detectar e formatar coluna de data em MES_ANO
+# Helper: contexto de renderização (recorte filtrado + rollup)
 # ---------------------------
-def __add_mes_ano_col(df):
+def _contexto(df, mask=None, rollup=None):
     """
-    Detecta a coluna de data (buscando nomes como 'DATA', 'DT_SOLIC', 'DATA_SOLICITACAO', etc.)
-    e cria uma coluna 'MES_ANO' no formato YYYY-MM.
-    Retorna o DataFrame atualizado.
+    Devolve o ContextoRender a usar. O app cria um por rerun e passa para todos os widgets;
+    chamadas com (df, mask) montam um aqui (caminho de compatibilidade), incluindo o rollup
+    mensal do recorte quando ele não vier pré-agregado.
     """
-    import pandas as pd
-
-    if df is None or df.empty:
-        return df
-
-    data_cols = [c for c in df.columns if "DATA" in c.upper() or "DT" in c.upper()]
-    if not data_cols:
-        return df
-
-    # Pega a primeira coluna de data encontrada
-    col = data_cols[0]
-    df = df.copy()
-    try:
-        df[col] = pd.to_datetime(df[col], errors="coerce")
-        df["MES_ANO"] = df[col].dt.to_period("M").astype(str)
-    except Exception:
-        pass
-    return df
+    contexto = df if isinstance(df, ContextoRender) else ContextoRender(df, mask, rollup)
+    if contexto.rollup is None and "DATA_SOLICITACAO" in contexto.df_filtrado.columns:
+        df_recorte = contexto.df_filtrado
+        qty_col = __detect_qty_col(df_recorte)
+        if qty_col and qty_col != "QTDE_QUEST":
+            df_recorte = df_recorte.rename(columns={qty_col: "QTDE_QUEST"})
+        elif qty_col is None:
+            df_recorte = df_recorte.assign(QTDE_QUEST=1)
+        contexto.rollup = gerar_rollup_mensal(df_recorte)
+    return contexto
 
 
 # ---------------------------
 # Grafico: Solicitações por BU (agrega por soma de quantidade quando disponível)
 # ---------------------------
-def grafico_linhas_por_bu(df, mask):
+@medir()
+def grafico_linhas_por_bu(df, mask=None, rollup=None):
     import plotly.express as px
-    import pandas as pd
 
-    df_filtrado = df[mask].copy() if mask is not None else df.copy()
-    if df_filtrado.empty:
+    rollup = _contexto(df, mask, rollup).rollup
+    if rollup.empty:
         st.warning("Nenhum dado encontrado com os filtros selecionados.")
         return
 
-    # garantir MES_ANO
-    df_filtrado = __add_mes_ano_col(df_filtrado)
-
-    # criar coluna MES_ANO_DT tentando vários formatos
-    mes = df_filtrado.get("MES_ANO")
-    mes_dt = pd.to_datetime(mes, format="%Y-%m", errors="coerce")
-    if mes_dt.isna().all():
-        mes_dt = pd.to_datetime(mes, format="%m/%y", errors="coerce")
-    if mes_dt.isna().all():
-        # tentativa geral
-        mes_dt = pd.to_datetime(mes, errors="coerce")
-
-    # se ainda tudo NA, tentar basear no primeiro campo de data real
-    if mes_dt.isna().all():
-        date_cols = [c for c in df_filtrado.columns if ("DATA" in c.upper()) or ("DT" in c.upper())]
-        if date_cols:
-            mes_dt = pd.to_datetime(df_filtrado[date_cols[0]], errors="coerce").dt.to_period("M").dt.to_timestamp()
-        else:
-            mes_dt = pd.Series([pd.NaT]*len(df_filtrado), index=df_filtrado.index)
-
-    df_filtrado["MES_ANO_DT"] = mes_dt
-
-    # filtrar a partir de 2025-07-01
-    df_filtrado = df_filtrado[df_filtrado["MES_ANO_DT"].notna()]  # excluir nulos
-    df_filtrado = df_filtrado[df_filtrado["MES_ANO_DT"] >= pd.Timestamp(2025, 7, 1)]
-    if df_filtrado.empty:
+    # série mensal por BU a partir de jul/2025 (reagregação do rollup, sem tocar nas linhas)
+    df_group = serie_mensal(rollup, por="BU", desde=INICIO_SERIES).rename(columns={"QTDE_QUEST": "Quantidade"})
+    if df_group.empty:
         st.info("Não há dados a partir de jul/2025 para exibir.")
         return
 
-    # preparar coluna MES_ANO formatada (YYYY-MM) para o eixo x
-    df_filtrado["MES_ANO"] = df_filtrado["MES_ANO_DT"].dt.to_period("M").astype(str)
-
-    qty_col = __detect_qty_col(df_filtrado)
-    if qty_col:
-        df_group = (
-            df_filtrado.groupby(["MES_ANO_DT", "MES_ANO", "BU"], dropna=False)[qty_col]
-            .sum()
-            .reset_index()
-            .rename(columns={qty_col: "Quantidade"})
-        )
-    else:
-        df_group = (
-            df_filtrado.groupby(["MES_ANO_DT", "MES_ANO", "BU"], dropna=False)
-            .size()
-            .reset_index(name="Quantidade")
-        )
-
-    df_group = df_group.sort_values("MES_ANO_DT")
-
     fig = px.line(
         df_group,
         x="MES_ANO",
@@ -646,63 +559,26 @@ def grafico_linhas_por_bu(df, mask):
     )
 
     st.markdown('<div class="graf-card">', unsafe_allow_html=True)
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, width="stretch")
     st.markdown('</div>', unsafe_allow_html=True)
 
 # ---------------------------
 # Grafico: Quantidade por TIPO (soma da coluna QTDE_QUEST quando existir)
 # ---------------------------
-def grafico_linhas_por_tipo(df, mask):
+@medir()
+def grafico_linhas_por_tipo(df, mask=None, rollup=None):
     import plotly.express as px
-    import pandas as pd
 
-    df_filtrado = df[mask].copy() if mask is not None else df.copy()
-    if df_filtrado.empty:
+    rollup = _contexto(df, mask, rollup).rollup
+    if rollup.empty:
         st.warning("Nenhum dado encontrado com os filtros selecionados.")
         return
 
-    df_filtrado = __add_mes_ano_col(df_filtrado)
-
-    mes = df_filtrado.get("MES_ANO")
-    mes_dt = pd.to_datetime(mes, format="%Y-%m", errors="coerce")
-    if mes_dt.isna().all():
-        mes_dt = pd.to_datetime(mes, format="%m/%y", errors="coerce")
-    if mes_dt.isna().all():
-        mes_dt = pd.to_datetime(mes, errors="coerce")
-
-    if mes_dt.isna().all():
-        date_cols = [c for c in df_filtrado.columns if ("DATA" in c.upper()) or ("DT" in c.upper())]
-        if date_cols:
-            mes_dt = pd.to_datetime(df_filtrado[date_cols[0]], errors="coerce").dt.to_period("M").dt.to_timestamp()
-        else:
-            mes_dt = pd.Series([pd.NaT]*len(df_filtrado), index=df_filtrado.index)
-
-    df_filtrado["MES_ANO_DT"] = mes_dt
-    df_filtrado = df_filtrado[df_filtrado["MES_ANO_DT"].notna()]
-    df_filtrado = df_filtrado[df_filtrado["MES_ANO_DT"] >= pd.Timestamp(2025, 7, 1)]
-    if df_filtrado.empty:
+    df_group = serie_mensal(rollup, por="TIPO", desde=INICIO_SERIES).rename(columns={"QTDE_QUEST": "Quantidade"})
+    if df_group.empty:
         st.info("Não há dados a partir de jul/2025 para exibir.")
         return
 
-    df_filtrado["MES_ANO"] = df_filtrado["MES_ANO_DT"].dt.to_period("M").astype(str)
-
-    qty_col = __detect_qty_col(df_filtrado)
-    if qty_col:
-        df_group = (
-            df_filtrado.groupby(["MES_ANO_DT", "MES_ANO", "TIPO"], dropna=False)[qty_col]
-            .sum()
-            .reset_index()
-            .rename(columns={qty_col: "Quantidade"})
-        )
-    else:
-        df_group = (
-            df_filtrado.groupby(["MES_ANO_DT", "MES_ANO", "TIPO"], dropna=False)
-            .size()
-            .reset_index(name="Quantidade")
-        )
-
-    df_group = df_group.sort_values("MES_ANO_DT")
-
     fig = px.line(
         df_group,
         x="MES_ANO",
@@ -734,19 +610,24 @@ def grafico_linhas_por_tipo(df, mask):
     )
 
     st.markdown('<div class="graf-card">', unsafe_allow_html=True)
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, width="stretch")
     st.markdown('</div>', unsafe_allow_html=True)
 
 
-def grafico_pizza_status(df, mask):
+@medir()
+def grafico_pizza_status(df, mask=None):
     """Gráfico de pizza mostrando proporção de status (Concluída x Pendente)."""
-    df_filtrado = df[mask].copy()
-    if df_filtrado.empty:
+    contexto = _contexto(df, mask)
+    if contexto.vazio:
         st.info("Nenhum dado disponível para o gráfico de status.")
         return
 
-    status_counts = df_filtrado["STATUS"].value_counts().reset_index()
+    status_counts = contexto.df_filtrado["STATUS"].value_counts().reset_index()
     status_counts.columns = ["STATUS", "Quantidade"]
+    # categorias não observadas no recorte aparecem com 0 — não entram na pizza
+    status_counts = status_counts[status_counts["Quantidade"] > 0]
+
+    import plotly.express as px
 
     fig = px.pie(
         status_counts,
@@ -761,81 +642,51 @@ def grafico_pizza_status(df, mask):
         margin=dict(t=45)
     )
     fig.update_traces(textposition="inside", textinfo="percent", textfont_size=14)
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, width="stretch")
 
-def tabela_detalhada(df, mask):
+@medir()
+def tabela_detalhada(df, mask=None):
     """Exibe a tabela detalhada filtrada com estilo clean."""
-    df_filtrado = df[mask].copy()
-    if df_filtrado.empty:
+    contexto = _contexto(df, mask)
+    if contexto.vazio:
         st.info("Nenhum registro encontrado para os filtros selecionados.")
         return
 
     st.markdown("### 📋 Tabela Detalhada")
     st.dataframe(
-        df_filtrado.reset_index(drop=True),
-        use_container_width=True,
+        contexto.df_filtrado,
+        width="stretch",
         height=400,
+        hide_index=True,
     )
 
 
 
-def grafico_sla_mensal(df, mask):
+@medir()
+def grafico_sla_mensal(df, mask=None, rollup=None):
 
-    df_filtrado = df[mask].copy()
-    if df_filtrado.empty:
+    rollup = _contexto(df, mask, rollup).rollup
+    if rollup.empty:
         st.warning("Nenhum dado encontrado com os filtros selecionados.")
         return
 
-    # --- Conversões de data ---
-    df_filtrado["DATA_SOLICITACAO"] = pd.to_datetime(df_filtrado["DATA_SOLICITACAO"], errors="coerce")
-    df_filtrado["DATA_CONCLUSAO"] = pd.to_datetime(df_filtrado["DATA_CONCLUSAO"], errors="coerce")
-
-    # --- Calcular SLA em dias úteis ---
-    df_filtrado["SLA_DIAS"] = df_filtrado.apply(
-        lambda x: np.busday_count(x["DATA_SOLICITACAO"].date(), x["DATA_CONCLUSAO"].date())
-        if pd.notna(x["DATA_SOLICITACAO"]) and pd.notna(x["DATA_CONCLUSAO"]) else np.nan,
-        axis=1
-    )
-
-    # --- Criar coluna ANO_MES ---
-    df_filtrado["ANO_MES"] = df_filtrado["DATA_SOLICITACAO"].dt.to_period("M").astype(str)
-
-    # --- Filtrar a partir de julho/2025 ---
-    df_filtrado = df_filtrado[df_filtrado["DATA_SOLICITACAO"] >= "2025-07-01"]
-    if df_filtrado.empty:
+    # --- A partir de julho/2025, por mês (rollup mensal) ---
+    rollup = rollup[rollup["MES"] >= INICIO_SERIES]
+    if rollup.empty:
         st.info("Não há dados a partir de jul/2025 para exibir.")
         return
 
-    # --- Separar entre COM JIRA e SEM JIRA ---
-    if "JIRA" in df_filtrado.columns:
-    # forçar string, tirar espaços e normalizar lowercase
-        jira_str = df_filtrado["JIRA"].astype(str).fillna("").str.strip().str.lower()
-
-        # considerar como sem JIRA quando vazio ou representações textuais de NaN/None
-        invalid_tokens = ["", "nan", "none", "na", "n/a", "null"]
-        df_filtrado["Possui_JIRA"] = ~jira_str.isin(invalid_tokens)
-
-        # opcional: remover casos em que o valor seja somente '-' ou '.' (ajuste se necessário)
-        df_filtrado.loc[jira_str.isin(["-", "."]), "Possui_JIRA"] = False
-    else:
-        # se não houver coluna, marcar tudo como sem JIRA
-        df_filtrado["Possui_JIRA"] = False
-
-    # --- SLA médio por mês e tipo de solicitação ---
-    df_sla = (
-        df_filtrado.groupby(["ANO_MES", "Possui_JIRA"])
-        .agg(SLA_MEDIO=("SLA_DIAS", "mean"))
-        .reset_index()
+    # --- SLA médio por mês e COM/SEM JIRA (soma/contagem de SLA do rollup) ---
+    df_sla = serie_mensal(rollup, por="POSSUI_JIRA").rename(
+        columns={"MES_ANO": "ANO_MES", "POSSUI_JIRA": "Possui_JIRA"}
     )
 
     # --- Quantidade de solicitações por mês ---
-    df_qtde = (
-        df_filtrado.groupby("ANO_MES")
-        .agg(QTDE_SOLICITACOES=("JIRA", "count"))
-        .reset_index()
-    )
+    df_qtde = serie_mensal(rollup).rename(columns={"MES_ANO": "ANO_MES", "N_LINHAS": "QTDE_SOLICITACOES"})
 
     # --- Gráfico combinado ---
+    import plotly.graph_objects as go
+
     fig = go.Figure()
 
     # Linha 1 - SLA médio (Sem JIRA)
@@ -912,7 +763,7 @@ def grafico_sla_mensal(df, mask):
 
     # --- Exibir no Streamlit ---
     st.markdown('<div class="graf-card">', unsafe_allow_html=True)
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, width="stretch")
     st.markdown('</div>', unsafe_allow_html=True)
 
 
@@ -922,9 +773,11 @@ def grafico_sla_mensal(df, mask):
 # ===============================================================
 
 def exibir_dashboard(df_tratada):
+    import plotly.express as px
+
     st.markdown("<br>", unsafe_allow_html=True)
 
-    mask = header_com_filtros(df_tratada)
+    mask, _ = header_com_filtros(df_tratada)
     df_filtro = df_tratada[mask]
 
     # KPIs principais
@@ -953,6 +806,7 @@ def exibir_dashboard(df_tratada):
     if not df_filtro.empty:
         solicitacoes_bu = df_filtro["BU"].value_counts().reset_index()
         solicitacoes_bu.columns = ["BU", "Quantidade"]
+        solicitacoes_bu = solicitacoes_bu[solicitacoes_bu["Quantidade"] > 0]
 
         fig_bu = px.bar(
             solicitacoes_bu,
@@ -969,7 +823,7 @@ def exibir_dashboard(df_tratada):
             title=dict(x=0.02, font=dict(size=16, color="#054FE1"))
         )
 
-        st.plotly_chart(fig_bu, use_container_width=True)
+        st.plotly_chart(fig_bu, width="stretch")
     else:
         st.info("Nenhum dado encontrado para os filtros selecionados.")
 
@@ -982,7 +836,7 @@ def exibir_dashboard(df_tratada):
         df_filtro["DATA_CONCLUSÃO"] = pd.to_datetime(df_filtro["DATA_CONCLUSÃO"], errors="coerce")
         df_filtro["SLA_DIAS"] = (df_filtro["DATA_CONCLUSÃO"] - df_filtro["DATA_SOLICITAÇÃO"]).dt.days
 
-        sla_por_resp = df_filtro.groupby("RESP_SM")["SLA_DIAS"].mean().reset_index().dropna()
+        sla_por_resp = df_filtro.groupby("RESP_SM", observed=True)["SLA_DIAS"].mean().reset_index().dropna()
         fig_sla = px.bar(
             sla_por_resp,
             x="RESP_SM",
@@ -994,6 +848,6 @@ def exibir_dashboard(df_tratada):
         )
         fig_sla.update_traces(texttemplate="%{text:.1f}", textposition="outside")
         fig_sla.update_layout(showlegend=False, title_x=0.3)
-        st.plotly_chart(fig_sla, use_container_width=True)
+        st.plotly_chart(fig_sla, width="stretch")
     else:
         st.warning("Não há colunas de data suficientes para calcular SLA.")
@@ -0,0 +1,230 @@
+"""
+exportacao.py
+Exportação do dataset tratado para Excel (multi-abas), sem dependência de Streamlit.
+Usada pelo botão de download do app.py (gerada só no clique, em arquivo temporário, com cache por
+arquivo) e pelo modo headless (kpi_sm.py).
+- "Solicitações Tratada": DataFrame tratado completo
+- "Base KPI": cubo de KPIs (BU x RESP_SM x ANO_MES, ver kpi_calculos.gerar_cubo_kpis)
+- "Análises para Dashboard": séries mensais (total, por BU, por TIPO, com/sem JIRA) do rollup mensal
+- "Acompanhamento SM": série mensal por responsável SM e distribuição por status
+Escrita com xlsxwriter em modo constant_memory: cada linha vai para disco assim que é escrita, e as
+colunas são convertidas em bloco (TAMANHO_BLOCO_ESCRITA linhas por vez), então a memória da
+exportação não cresce com o número de linhas.
+
+Formatos alternativos (para jobs de BI que releem a base): Parquet e Feather (colunares, preservam
+os dicionários das categóricas e os tipos de processar_solicitacoes) e CSV gerado em blocos.
+A escrita em blocos só limita a memória quando o destino é um arquivo (kpi_sm e exportar_em_arquivo).
+No app, o Streamlit ainda carrega o arquivo pronto inteiro em memória para servir o download
+(uma cópia, no clique); exportar_em_bytes monta o arquivo inteiro num BytesIO.
+"""
+
+import io
+import os
+import tempfile
+
+import pandas as pd
+
+from instrumentacao import medir
+from kpi_calculos import gerar_cubo_kpis
+from rollup_mensal import gerar_rollup_mensal, serie_mensal
+
+NOME_ARQUIVO_EXPORTACAO = "Solicitacoes_Tratada_e_Bases.xlsx"
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# formato -> (extensão, MIME)
+FORMATOS_EXPORTACAO = {
+    "xlsx": (".xlsx", MIME_XLSX),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "feather": (".feather", "application/vnd.apache.arrow.file"),
+    "csv": (".csv", "text/csv"),
+}
+
+TAMANHO_BLOCO_ESCRITA = 10_000
+TAMANHO_BLOCO_CSV = 50_000
+
+COLUNAS_SERIE = ["QTDE_QUEST", "N_LINHAS", "SLA_MEDIO"]
+
+
+def _valores_em_bloco(df: pd.DataFrame) -> list:
+    """Colunas do bloco como listas de valores Python (conversão vetorizada por coluna; vazios viram None)."""
+    return [df[c].astype(object).where(df[c].notna(), None).tolist() for c in df.columns]
+
+
+def _escrever_tabela(ws, df: pd.DataFrame, linha: int, formatos: dict, titulo: str = None) -> int:
+    """Escreve `df` a partir de `linha` (título opcional + cabeçalho + dados). Retorna a próxima linha livre."""
+    if titulo:
+        ws.write(linha, 0, titulo, formatos["titulo"])
+        linha += 1
+    ws.write_row(linha, 0, [str(c) for c in df.columns], formatos["cabecalho"])
+    linha += 1
+    for inicio in range(0, len(df), TAMANHO_BLOCO_ESCRITA):
+        bloco = df.iloc[inicio: inicio + TAMANHO_BLOCO_ESCRITA]
+        for valores in zip(*_valores_em_bloco(bloco)):
+            ws.write_row(linha, 0, valores)
+            linha += 1
+    return linha
+
+
+def _formatar_colunas(ws, df: pd.DataFrame, formatos: dict):
+    """Formato por coluna (datas, percentuais, decimais), definido antes de escrever as células."""
+    for i, c in enumerate(df.columns):
+        if pd.api.types.is_datetime64_any_dtype(df[c]):
+            ws.set_column(i, i, 12, formatos["data"])
+        elif c.startswith(("TAXA_", "PCT_")):
+            ws.set_column(i, i, 14, formatos["pct"])
+        elif c.startswith("SLA_M"):
+            ws.set_column(i, i, 12, formatos["decimal"])
+        else:
+            ws.set_column(i, i, 16)
+
+
+def _serie(rollup: pd.DataFrame, por: str = None) -> pd.DataFrame:
+    return serie_mensal(rollup, por=por)[["MES_ANO"] + ([por] if por else []) + COLUNAS_SERIE]
+
+
+def escrever_excel(df_tratada: pd.DataFrame, destino, cubo: pd.DataFrame = None, rollup: pd.DataFrame = None):
+    """
+    Grava o Excel multi-abas em `destino` (caminho ou file-like).
+    `cubo` e `rollup` podem vir pré-calculados (ex.: cache do app); sem eles, são gerados aqui.
+    """
+    import xlsxwriter
+
+    if cubo is None:
+        cubo = gerar_cubo_kpis(df_tratada)
+    if rollup is None:
+        rollup = gerar_rollup_mensal(df_tratada)
+
+    wb = xlsxwriter.Workbook(destino, {"constant_memory": True, "strings_to_formulas": False, "strings_to_urls": False})
+    formatos = {
+        "titulo": wb.add_format({"bold": True, "font_color": "#054FE1"}),
+        "cabecalho": wb.add_format({"bold": True, "bg_color": "#E8EEFC"}),
+        "data": wb.add_format({"num_format": "dd/mm/yyyy"}),
+        "pct": wb.add_format({"num_format": "0.0%"}),
+        "decimal": wb.add_format({"num_format": "0.00"}),
+    }
+    try:
+        ws = wb.add_worksheet("Solicitações Tratada")
+        _formatar_colunas(ws, df_tratada, formatos)
+        _escrever_tabela(ws, df_tratada, 0, formatos)
+
+        ws = wb.add_worksheet("Base KPI")
+        _formatar_colunas(ws, cubo, formatos)
+        _escrever_tabela(ws, cubo, 0, formatos)
+
+        ws = wb.add_worksheet("Análises para Dashboard")
+        ws.set_column(0, 5, 16)
+        linha = _escrever_tabela(ws, _serie(rollup), 0, formatos, "Evolução mensal (total)")
+        for por, titulo in [("BU", "Por BU"), ("TIPO", "Por tipo"), ("POSSUI_JIRA", "Com / sem JIRA")]:
+            linha = _escrever_tabela(ws, _serie(rollup, por), linha + 1, formatos, titulo)
+
+        ws = wb.add_worksheet("Acompanhamento SM")
+        ws.set_column(0, 5, 16)
+        linha = _escrever_tabela(ws, _serie(rollup, "RESP_SM"), 0, formatos, "Evolução mensal por responsável SM")
+        por_status = (
+            rollup.groupby(["RESP_SM", "STATUS"], observed=True, dropna=False, sort=True)[["N_LINHAS", "QTDE_QUEST"]]
+            .sum()
+            .reset_index()
+        )
+        _escrever_tabela(ws, por_status, linha + 1, formatos, "Solicitações por responsável SM e status")
+    finally:
+        wb.close()
+
+
+def gerar_excel_em_bytes(df_tratada: pd.DataFrame, cubo: pd.DataFrame = None, rollup: pd.DataFrame = None) -> io.BytesIO:
+    """Excel multi-abas em memória (para o st.download_button)."""
+    output = io.BytesIO()
+    escrever_excel(df_tratada, output, cubo=cubo, rollup=rollup)
+    output.seek(0)
+    return output
+
+
+# ------------------------------------------------------------
+# Formatos alternativos (colunares / CSV em blocos)
+# ------------------------------------------------------------
+def nome_arquivo(formato: str, base: str = "Solicitacoes_Tratada") -> str:
+    if formato == "xlsx":
+        return NOME_ARQUIVO_EXPORTACAO
+    return base + FORMATOS_EXPORTACAO[formato][0]
+
+
+def formato_do_caminho(caminho: str) -> str:
+    """Formato de exportação pela extensão do arquivo de saída."""
+    extensao = "." + caminho.rsplit(".", 1)[-1].lower() if "." in caminho else ""
+    for formato, (ext, _) in FORMATOS_EXPORTACAO.items():
+        if extensao == ext:
+            return formato
+    raise ValueError(f"Extensão não suportada: {caminho!r}. Use uma de {[e for e, _ in FORMATOS_EXPORTACAO.values()]}.")
+
+
+def escrever_parquet(df_tratada: pd.DataFrame, destino):
+    """Parquet (pyarrow): categóricas viram colunas dictionary e voltam como category na leitura."""
+    df_tratada.reset_index(drop=True).to_parquet(destino, engine="pyarrow", index=False)
+
+
+def escrever_feather(df_tratada: pd.DataFrame, destino):
+    """Feather/Arrow IPC: mesmo esquema do cache colunar (categóricas e tipos preservados)."""
+    import pyarrow.feather as feather
+
+    feather.write_feather(df_tratada.reset_index(drop=True), destino)
+
+
+def gerar_csv_em_blocos(df_tratada: pd.DataFrame, tamanho_bloco: int = TAMANHO_BLOCO_CSV, sep: str = ";",
+                        cabecalho: bool = True):
+    """
+    Gerador de bytes do CSV (UTF-8 com BOM, para abrir direto no Excel), bloco a bloco:
+    só um bloco de linhas é formatado em texto por vez. cabecalho=False omite BOM e cabeçalho
+    (para acrescentar linhas a um CSV já iniciado, ex.: kpi_sm build --blocos).
+    """
+    if cabecalho:
+        yield df_tratada.iloc[:0].to_csv(sep=sep, index=False).encode("utf-8-sig")
+    for inicio in range(0, len(df_tratada), tamanho_bloco):
+        bloco = df_tratada.iloc[inicio: inicio + tamanho_bloco]
+        yield bloco.to_csv(sep=sep, index=False, header=False, date_format="%Y-%m-%d").encode("utf-8")
+
+
+def escrever_csv(df_tratada: pd.DataFrame, destino, cabecalho: bool = True):
+    """Grava o CSV em blocos em `destino` (caminho ou file-like binário; ver gerar_csv_em_blocos)."""
+    if isinstance(destino, str):
+        with open(destino, "wb") as f:
+            escrever_csv(df_tratada, f, cabecalho)
+        return
+    for parte in gerar_csv_em_blocos(df_tratada, cabecalho=cabecalho):
+        destino.write(parte)
+
+
+@medir()
+def exportar(df_tratada: pd.DataFrame, formato: str, destino, rollup: pd.DataFrame = None):
+    """Grava `df_tratada` no `formato` pedido ('xlsx', 'parquet', 'feather' ou 'csv')."""
+    if formato == "xlsx":
+        escrever_excel(df_tratada, destino, rollup=rollup)
+    elif formato == "parquet":
+        escrever_parquet(df_tratada, destino)
+    elif formato == "feather":
+        escrever_feather(df_tratada, destino)
+    elif formato == "csv":
+        escrever_csv(df_tratada, destino)
+    else:
+        raise ValueError(f"Formato desconhecido: {formato!r}. Use um de {list(FORMATOS_EXPORTACAO)}.")
+
+
+def exportar_em_arquivo(df_tratada: pd.DataFrame, formato: str, rollup: pd.DataFrame = None,
+                        diretorio: str = None) -> str:
+    """
+    Grava a exportação num arquivo temporário (em blocos, como no kpi_sm) e devolve o caminho.
+    Quem chama é dono do arquivo e deve removê-lo quando não precisar mais dele.
+    """
+    fd, caminho = tempfile.mkstemp(suffix=FORMATOS_EXPORTACAO[formato][0], prefix="kpi_sm_", dir=diretorio)
+    os.close(fd)
+    try:
+        exportar(df_tratada, formato, caminho, rollup=rollup)
+    except BaseException:
+        os.remove(caminho)
+        raise
+    return caminho
+
+
+def exportar_em_bytes(df_tratada: pd.DataFrame, formato: str, rollup: pd.DataFrame = None) -> bytes:
+    """Conteúdo do arquivo exportado, inteiro em memória (o CSV em blocos é juntado num só bytes)."""
+    output = io.BytesIO()
+    exportar(df_tratada, formato, output, rollup=rollup)
+    return output.getvalue()
@@ -0,0 +1,107 @@
+"""
+indice_filtros.py
+Índice de filtros pré-computado sobre o DataFrame tratado (construído uma vez por dataset).
+- Um bitmap (array booleano NumPy) por valor de cada dimensão (BU, RESP_SM, STATUS, TIPO)
+- Listas de opções já ordenadas para os selectbox
+- Datas de solicitação ordenadas para recortes por intervalo (busca binária, sem varrer o frame)
+Combinar seleções vira um punhado de operações OR/AND entre bitmaps.
+"""
+
+import numpy as np
+import pandas as pd
+
+DIMENSOES_FILTRO = ["BU", "RESP_SM", "STATUS", "TIPO"]
+COLUNA_DATA_FILTRO = "DATA_SOLICITACAO"
+TODOS = "Todos"
+
+
+class IndiceFiltros:
+    """
+    Uso:
+        indice = IndiceFiltros(df_tratada)
+        indice.opcoes("BU")                                   -> ['BU 1 - ...', ...]
+        indice.mascara({"BU": "BU 1 - EDUARDO", "STATUS": ["concluído", "on hold"]},
+                       intervalo_datas=("2025-07-01", None))  -> pd.Series booleana alinhada ao df
+    Seleções aceitam um valor, uma lista (multi-seleção, OR entre valores) ou "Todos"/None/[] (sem filtro).
+    """
+
+    def __init__(self, df: pd.DataFrame, dimensoes=DIMENSOES_FILTRO, coluna_data: str = COLUNA_DATA_FILTRO):
+        self.index = df.index
+        self.n_linhas = len(df)
+        self._bitmaps = {}
+        self._opcoes = {}
+
+        for dim in dimensoes:
+            if dim not in df.columns:
+                continue
+            serie = df[dim]
+            if not isinstance(serie.dtype, pd.CategoricalDtype):
+                serie = serie.astype("category")
+            codigos = serie.cat.codes.to_numpy()
+            bitmaps = {}
+            for i, valor in enumerate(serie.cat.categories):
+                bitmap = codigos == i
+                if bitmap.any():
+                    bitmaps[valor] = bitmap
+            self._bitmaps[dim] = bitmaps
+            self._opcoes[dim] = sorted(bitmaps, key=str)
+
+        # datas ordenadas (NaT no fim) para recorte por intervalo via searchsorted
+        self._ordem_datas = None
+        if coluna_data in df.columns:
+            datas = pd.to_datetime(df[coluna_data], errors="coerce").to_numpy(dtype="datetime64[ns]")
+            self._ordem_datas = np.argsort(datas, kind="stable")
+            self._datas_ordenadas = datas[self._ordem_datas]
+            self._n_datas_validas = int((~np.isnat(datas)).sum())
+
+    # ------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------
+    def dimensoes(self) -> list:
+        return list(self._bitmaps)
+
+    def opcoes(self, dim: str) -> list:
+        """Valores presentes na dimensão, ordenados (sem 'Todos')."""
+        return list(self._opcoes.get(dim, []))
+
+    def mascara_dimensao(self, dim: str, valores) -> np.ndarray:
+        """OR dos bitmaps dos valores escolhidos; None se a seleção não restringe nada."""
+        if valores is None or (isinstance(valores, str) and valores == TODOS):
+            return None
+        if isinstance(valores, str) or not hasattr(valores, "__iter__"):
+            valores = [valores]
+        valores = [v for v in valores if v != TODOS]
+        if not valores:
+            return None
+
+        bitmaps = self._bitmaps.get(dim)
+        if bitmaps is None:
+            raise KeyError(f"Dimensão não indexada: {dim!r}")
+        mascara = np.zeros(self.n_linhas, dtype=bool)
+        for v in valores:
+            bitmap = bitmaps.get(v)
+            if bitmap is not None:
+                mascara |= bitmap
+        return mascara
+
+    def mascara_intervalo(self, inicio=None, fim=None) -> np.ndarray:
+        """Linhas com data em [inicio, fim] (limites opcionais, inclusivos); datas vazias ficam de fora."""
+        if self._ordem_datas is None:
+            raise KeyError("Índice construído sem coluna de data.")
+        validas = self._datas_ordenadas[: self._n_datas_validas]
+        ini_pos = 0 if inicio is None else np.searchsorted(validas, np.datetime64(pd.Timestamp(inicio), "ns"), side="left")
+        fim_pos = len(validas) if fim is None else np.searchsorted(validas, np.datetime64(pd.Timestamp(fim), "ns"), side="right")
+        mascara = np.zeros(self.n_linhas, dtype=bool)
+        mascara[self._ordem_datas[ini_pos:fim_pos]] = True
+        return mascara
+
+    def mascara(self, selecoes: dict = None, intervalo_datas=None) -> pd.Series:
+        """AND das dimensões selecionadas (e do intervalo de datas, se houver), alinhado ao índice do df."""
+        mascara = np.ones(self.n_linhas, dtype=bool)
+        for dim, valores in (selecoes or {}).items():
+            m = self.mascara_dimensao(dim, valores)
+            if m is not None:
+                mascara &= m
+        if intervalo_datas is not None and any(d is not None for d in intervalo_datas):
+            mascara &= self.mascara_intervalo(*intervalo_datas)
+        return pd.Series(mascara, index=self.index)
@@ -0,0 +1,189 @@
+"""
+ingestao_incremental.py
+Ingestão incremental da aba SOLICITAÇÕES.
+- Compara o novo upload com o resultado tratado anterior por chave de linha
+  (JIRA + DATA_SOLICITACAO + CLIENTE) e hash do conteúdo. Dentro de um grupo de chaves repetidas
+  (ex.: JIRA vazio), linhas de conteúdo idêntico casam primeiro; só as que sobram casam por
+  ordinal (= atualizadas). Inserir uma linha num grupo não desloca as demais.
+- Reprocessa (SLA, flags, categorias) apenas as linhas inseridas ou alteradas
+- Reaproveita as linhas tratadas inalteradas e remonta o DataFrame na ordem do novo arquivo
+- Informa quantas linhas foram inseridas, atualizadas e removidas
+- ingerir_conteudo: mesmo fluxo a partir dos bytes do arquivo, usando o cache colunar (DataFrame
+  tratado + assinaturas); num acerto do cache o diff é refeito só pelas assinaturas
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import cache_colunar
+from processar_solicitacoes import (
+    COLUNAS_CATEGORICAS,
+    COLUNAS_ESPERADAS,
+    _normalize_columns,
+    processar_solicitacoes,
+)
+from normalizacao_jira import ids_de_chave
+
+COLUNAS_CHAVE = ["JIRA", "DATA_SOLICITACAO", "CLIENTE"]
+SUFIXO_ASSINATURAS = "-assinaturas"
+
+
+class ResultadoIncremental:
+    """
+    Resultado de uma ingestão (completa ou incremental).
+    - df_tratada: DataFrame tratado (mesma saída de processar_solicitacoes)
+    - assinaturas: DataFrame com CHAVE/HASH por linha, alinhado posicionalmente a df_tratada
+    - inseridas / atualizadas / removidas / reaproveitadas: contagens do diff
+    """
+
+    def __init__(self, df_tratada, assinaturas, inseridas=0, atualizadas=0, removidas=0, reaproveitadas=0):
+        self.df_tratada = df_tratada
+        self.assinaturas = assinaturas
+        self.inseridas = inseridas
+        self.atualizadas = atualizadas
+        self.removidas = removidas
+        self.reaproveitadas = reaproveitadas
+
+    def resumo(self) -> dict:
+        return {
+            "inseridas": self.inseridas,
+            "atualizadas": self.atualizadas,
+            "removidas": self.removidas,
+            "reaproveitadas": self.reaproveitadas,
+        }
+
+
+def assinaturas_linhas(df_raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    CHAVE e HASH (uint64) de cada linha bruta.
+    CHAVE = hash(JIRA, DATA_SOLICITACAO, CLIENTE) — pode repetir; HASH = hash das colunas canônicas.
+    """
+    df = _normalize_columns(df_raw)
+    df = df.loc[:, ~df.columns.duplicated()]
+    texto = pd.DataFrame(
+        {c: (df[c].astype(str) if c in df.columns else "") for c in COLUNAS_ESPERADAS},
+        index=df.index,
+    )
+
+    chave = pd.util.hash_pandas_object(texto[COLUNAS_CHAVE], index=False)
+    conteudo = pd.util.hash_pandas_object(texto, index=False)
+    return pd.DataFrame({"CHAVE": chave.to_numpy(), "HASH": conteudo.to_numpy()})
+
+
+def _chave_ocorrencia(colunas: dict) -> np.ndarray:
+    """hash(colunas..., nº da ocorrência da combinação): único por linha, estável na ordem do arquivo."""
+    df = pd.DataFrame(colunas)
+    ocorrencia = df.groupby(list(colunas), sort=False).cumcount().to_numpy()
+    return pd.util.hash_pandas_object(df.assign(_ocorrencia=ocorrencia), index=False).to_numpy()
+
+
+def casar_assinaturas(antigas: pd.DataFrame, novas: pd.DataFrame):
+    """
+    Casa as linhas novas com as antigas. Devolve (pos_antiga, igual, atualizada, removidas):
+    - 1º passo: mesma CHAVE e mesmo HASH (n-ésima cópia idêntica com a n-ésima) -> igual
+    - 2º passo: entre as que sobraram, mesma CHAVE por ordinal -> atualizada
+    - o resto das novas é inserido; o resto das antigas, removido
+    pos_antiga[i] é a linha antiga casada com a nova i (-1 se inserida).
+    """
+    chave_antiga, hash_antigo = antigas["CHAVE"].to_numpy(), antigas["HASH"].to_numpy()
+    chave_nova, hash_novo = novas["CHAVE"].to_numpy(), novas["HASH"].to_numpy()
+
+    pos_antiga = pd.Index(_chave_ocorrencia({"c": chave_antiga, "h": hash_antigo})).get_indexer(
+        _chave_ocorrencia({"c": chave_nova, "h": hash_novo})
+    )
+    igual = pos_antiga >= 0
+
+    sobra_nova = np.flatnonzero(~igual)
+    sobra_antiga = np.setdiff1d(np.arange(len(antigas)), pos_antiga[igual])
+    pos_sobra = pd.Index(_chave_ocorrencia({"c": chave_antiga[sobra_antiga]})).get_indexer(
+        _chave_ocorrencia({"c": chave_nova[sobra_nova]})
+    )
+    casou = pos_sobra >= 0
+    pos_antiga[sobra_nova[casou]] = sobra_antiga[pos_sobra[casou]]
+
+    atualizada = np.zeros(len(novas), dtype=bool)
+    atualizada[sobra_nova[casou]] = True
+    removidas = len(sobra_antiga) - int(casou.sum())
+    return pos_antiga, igual, atualizada, removidas
+
+
+def concatenar_tratados(partes) -> pd.DataFrame:
+    """
+    Concatena pedaços tratados preservando as colunas categóricas (categorias unidas e ordenadas).
+    JIRA_ID é recalculado a partir da chave JIRA unida (os códigos de cada pedaço não são comparáveis).
+    """
+    partes = [p for p in partes if len(p)] or partes[:1]
+    df = pd.concat(partes, ignore_index=True)
+    for col in COLUNAS_CATEGORICAS + ["JIRA"]:
+        if col not in df.columns:
+            continue
+        cats = [p[col].astype("category").array for p in partes]
+        unidas = union_categoricals(cats, ignore_order=True)
+        unidas = unidas.remove_unused_categories()
+        df[col] = unidas.reorder_categories(sorted(unidas.categories, key=str))
+    if "JIRA_ID" in df.columns:
+        df["JIRA_ID"] = ids_de_chave(df["JIRA"])
+    return df
+
+
+def processar_incremental(df_raw: pd.DataFrame, anterior: ResultadoIncremental = None) -> ResultadoIncremental:
+    """
+    Trata `df_raw` aproveitando o `anterior` (ResultadoIncremental do upload anterior).
+    Sem `anterior`, faz o processamento completo. O custo de SLA/flags/categorias é proporcional ao delta.
+    """
+    assinaturas = assinaturas_linhas(df_raw)
+
+    if anterior is None:
+        df = processar_solicitacoes(df_raw).reset_index(drop=True)
+        return ResultadoIncremental(df, assinaturas, inseridas=len(df))
+
+    pos_antiga, igual, atualizada, removidas = casar_assinaturas(anterior.assinaturas, assinaturas)
+    inserida = pos_antiga < 0
+    delta = inserida | atualizada
+
+    reaproveitadas = anterior.df_tratada.iloc[pos_antiga[igual]]
+    novas = processar_solicitacoes(df_raw.iloc[np.flatnonzero(delta)])
+
+    # remontar na ordem do novo arquivo
+    ordem = np.concatenate([np.flatnonzero(igual), np.flatnonzero(delta)])
+    df = concatenar_tratados([reaproveitadas, novas])
+    df = df.iloc[np.argsort(ordem, kind="stable")].reset_index(drop=True)
+
+    return ResultadoIncremental(
+        df,
+        assinaturas,
+        inseridas=int(inserida.sum()),
+        atualizadas=int(atualizada.sum()),
+        removidas=removidas,
+        reaproveitadas=int(igual.sum()),
+    )
+
+
+def ingerir_conteudo(conteudo: bytes, ler, anterior: ResultadoIncremental = None) -> ResultadoIncremental:
+    """
+    Trata o arquivo `conteudo` (bytes; `ler(conteudo)` devolve o DataFrame bruto) contra `anterior`.
+    DataFrame tratado e assinaturas vão para o cache colunar; num acerto, nada é relido nem
+    reprocessado e o diff com `anterior` é refeito só pelas assinaturas.
+    """
+    chave = cache_colunar.chave_cache(conteudo)
+    df = cache_colunar.ler_cache(chave)
+    assinaturas = cache_colunar.ler_cache(chave + SUFIXO_ASSINATURAS) if df is not None else None
+
+    if df is None or assinaturas is None or len(df) != len(assinaturas):
+        resultado = processar_incremental(ler(conteudo), anterior)
+        cache_colunar.gravar_cache(chave, resultado.df_tratada)
+        cache_colunar.gravar_cache(chave + SUFIXO_ASSINATURAS, resultado.assinaturas)
+        return resultado
+
+    if anterior is None:
+        return ResultadoIncremental(df, assinaturas, inseridas=len(df))
+    pos_antiga, igual, atualizada, removidas = casar_assinaturas(anterior.assinaturas, assinaturas)
+    return ResultadoIncremental(
+        df,
+        assinaturas,
+        inseridas=int((pos_antiga < 0).sum()),
+        atualizadas=int(atualizada.sum()),
+        removidas=removidas,
+        reaproveitadas=int(igual.sum()),
+    )
@@ -0,0 +1,107 @@
+"""
+ingestao_lote.py
+Ingestão em lote: todas as planilhas .xlsx de um diretório (ex.: uma por BU) num único dataset tratado.
+- Cada arquivo é lido e tratado num processo separado (ProcessPoolExecutor): o tempo total
+  acompanha o número de núcleos, não o número de arquivos
+- Cada arquivo usa/grava o próprio cache colunar (só os arquivos alterados são reprocessados); os
+  processos não aplicam a política LRU (evitaria remoções concorrentes): o principal a aplica uma vez
+  no fim, com limite de arquivos que comporte o lote inteiro
+- Os resultados são concatenados com a coluna FONTE_ARQUIVO e o dataset consolidado também
+  vai para o cache colunar (chave = nomes + SHA-256 de todos os arquivos)
+
+Uso (CLI):
+    python ingestao_lote.py "Bases brutas" [--processos 4] [--sem-cache]
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import cache_colunar
+from ingestao_incremental import concatenar_tratados
+from leitura_excel import ler_solicitacoes_esquema
+from processar_solicitacoes import processar_solicitacoes
+
+COLUNA_FONTE = "FONTE_ARQUIVO"
+EXTENSOES = (".xlsx", ".xlsm")
+
+
+def listar_planilhas(diretorio: str) -> list:
+    """Planilhas do diretório, em ordem alfabética (ignora arquivos de lock do Excel '~$...')."""
+    return sorted(
+        os.path.join(diretorio, nome)
+        for nome in os.listdir(diretorio)
+        if nome.lower().endswith(EXTENSOES) and not nome.startswith("~$")
+    )
+
+
+def _ler_e_tratar(conteudo: bytes) -> pd.DataFrame:
+    return processar_solicitacoes(ler_solicitacoes_esquema(io.BytesIO(conteudo)))
+
+
+def tratar_arquivo(caminho: str, usar_cache: bool = True) -> pd.DataFrame:
+    """Lê e trata uma planilha (executado nos processos do pool)."""
+    with open(caminho, "rb") as f:
+        conteudo = f.read()
+    if usar_cache:
+        return cache_colunar.carregar_ou_processar(conteudo, _ler_e_tratar, lru=False)
+    return _ler_e_tratar(conteudo)
+
+
+def _conteudo_lote(caminhos) -> bytes:
+    """Identidade do lote para o cache: nome + SHA-256 de cada arquivo, na ordem."""
+    partes = []
+    for caminho in caminhos:
+        with open(caminho, "rb") as f:
+            partes.append(f"{os.path.basename(caminho)}:{hashlib.sha256(f.read()).hexdigest()}")
+    return "\n".join(partes).encode()
+
+
+def ingerir_diretorio(diretorio: str, max_processos: int = None, usar_cache: bool = True) -> pd.DataFrame:
+    """
+    Trata todas as planilhas de `diretorio` em paralelo e devolve um único DataFrame tratado
+    (mesmas colunas de processar_solicitacoes + FONTE_ARQUIVO, categórica com o nome do arquivo).
+    """
+    caminhos = listar_planilhas(diretorio)
+    if not caminhos:
+        raise FileNotFoundError(f"Nenhuma planilha {EXTENSOES} em {diretorio!r}")
+
+    def consolidar(_conteudo):
+        processos = min(len(caminhos), max_processos or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            tratados = list(pool.map(tratar_arquivo, caminhos, [usar_cache] * len(caminhos)))
+
+        for caminho, df in zip(caminhos, tratados):
+            df[COLUNA_FONTE] = os.path.basename(caminho)
+        df = concatenar_tratados(tratados)
+        df[COLUNA_FONTE] = df[COLUNA_FONTE].astype(pd.CategoricalDtype([os.path.basename(c) for c in caminhos]))
+        return df
+
+    if not usar_cache:
+        return consolidar(None)
+    df = cache_colunar.carregar_ou_processar(_conteudo_lote(caminhos), consolidar, lru=False)
+    # uma entrada por arquivo + o consolidado: todas são do lote atual e precisam sobreviver à política
+    cache_colunar.aplicar_lru(max_arquivos=max(cache_colunar.MAX_ARQUIVOS, len(caminhos) + 1))
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("diretorio")
+    parser.add_argument("--processos", type=int, default=None, help="máximo de processos (padrão: núcleos)")
+    parser.add_argument("--sem-cache", action="store_true", help="não lê nem grava o cache colunar")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    df = ingerir_diretorio(args.diretorio, args.processos, usar_cache=not args.sem_cache)
+    print(f"{df[COLUNA_FONTE].nunique()} arquivo(s), {len(df)} linhas tratadas em {time.perf_counter() - t0:.1f}s")
+    print(df[COLUNA_FONTE].value_counts(sort=False).to_string())
+
+
+if __name__ == "__main__":
+    main()
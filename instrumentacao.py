@@ -0,0 +1,204 @@
+"""
+instrumentacao.py
+Instrumentação leve por etapa: tempo de parede, linhas de entrada/saída e pico de memória (tracemalloc).
+Cobre as etapas de processar_solicitacoes, a leitura do Excel, as funções de KPI (kpi_calculos) e as
+funções de renderização do dashboard_view.
+
+Ligada pela variável de ambiente KPI_SM_PERF (lida no import; ativar()/desativar() mudam em execução):
+- não definida, "" ou "0": desligada — o decorador e etapa() só testam um booleano
+- "1" ou "memoria": tempo + linhas + pico de memória (tracemalloc deixa o código bem mais lento)
+- "tempo": só tempo e linhas
+
+Os registros ficam em memória (últimos MAX_REGISTROS) e saem por dois caminhos:
+- app.py: painel recolhível "Performance" (tabela_registros). Cada rerun abre o seu coletor com coletar()
+  (contextvar: vale só para a thread/contexto do rerun), então sessões simultâneas não misturam nem
+  apagam os registros umas das outras
+- modo headless (kpi_sm --perf-json ou KPI_SM_PERF_JSON): sem coletor aberto, os registros vão para
+  REGISTROS, do processo; saem em JSON Lines, um registro por linha (gravar_json)
+Etapas aninhadas (ex.: gerar_resumo_kpis chamando kpi_sla_medio) são registradas todas, com `nivel`;
+o pico de memória de uma etapa inclui o das etapas internas.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+VARIAVEL_AMBIENTE = "KPI_SM_PERF"
+VARIAVEL_JSON = "KPI_SM_PERF_JSON"
+MAX_REGISTROS = 5_000
+
+REGISTROS = deque(maxlen=MAX_REGISTROS)  # destino quando nenhum coletor foi aberto (CLI, scripts)
+_coletor = contextvars.ContextVar("instrumentacao_coletor", default=None)
+
+_ativo = False
+_memoria = False
+_local = threading.local()  # pilha de etapas abertas (por thread): [bytes no início, maior pico interno]
+
+
+def ativar(memoria: bool = True):
+    """Liga a instrumentação (e o tracemalloc, se `memoria`)."""
+    global _ativo, _memoria
+    _ativo, _memoria = True, memoria
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def desativar():
+    global _ativo, _memoria
+    if _memoria and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _ativo = _memoria = False
+
+
+def ativo() -> bool:
+    return _ativo
+
+
+def _configurar_pelo_ambiente():
+    valor = os.environ.get(VARIAVEL_AMBIENTE, "").strip().lower()
+    if valor in ("1", "memoria", "true", "sim"):
+        ativar(memoria=True)
+    elif valor == "tempo":
+        ativar(memoria=False)
+
+
+def _linhas(obj):
+    """Nº de linhas de DataFrame/Series/array (ou do recorte filtrado de um ContextoRender); None se não se aplica."""
+    if hasattr(obj, "df_filtrado"):
+        obj = obj.df_filtrado
+    forma = getattr(obj, "shape", None)
+    return forma[0] if forma else None
+
+
+def _pilha() -> list:
+    if not hasattr(_local, "pilha"):
+        _local.pilha = []
+    return _local.pilha
+
+
+def _abrir_memoria(pilha):
+    atual, pico = tracemalloc.get_traced_memory()
+    if pilha:
+        pilha[-1][1] = max(pilha[-1][1], pico)  # guarda o pico da etapa externa antes de zerar
+    tracemalloc.reset_peak()
+    pilha.append([atual, atual])
+
+
+def _fechar_memoria(pilha) -> float:
+    _, pico = tracemalloc.get_traced_memory()
+    inicio, pico_interno = pilha.pop()
+    pico = max(pico, pico_interno)
+    if pilha:
+        pilha[-1][1] = max(pilha[-1][1], pico)
+    return (pico - inicio) / 1e6
+
+
+@contextmanager
+def _medir_etapa(nome: str, linhas_entrada=None, linhas_saida=None):
+    pilha = _pilha()
+    memoria = _memoria and tracemalloc.is_tracing()
+    registro = {"etapa": nome, "nivel": len(pilha), "linhas_entrada": linhas_entrada, "linhas_saida": linhas_saida}
+    if memoria:
+        _abrir_memoria(pilha)
+    else:
+        pilha.append(None)
+    t0 = time.perf_counter()
+    try:
+        yield registro
+    finally:
+        registro["segundos"] = time.perf_counter() - t0
+        if memoria:
+            registro["pico_memoria_mb"] = _fechar_memoria(pilha)
+        else:
+            pilha.pop()
+            registro["pico_memoria_mb"] = None
+        registro["instante"] = time.time()
+        _destino().append(registro)
+
+
+def etapa(nome: str, linhas_entrada=None, linhas_saida=None):
+    """
+    Context manager para um trecho de código: `with etapa("processar.sla", len(df)) as r: ...`.
+    O registro (dict) pode ser completado dentro do bloco (ex.: r["linhas_saida"] = len(saida)).
+    Desligada, devolve um contexto nulo com um dict novo (descartado; nunca compartilhado entre chamadas).
+    """
+    if not _ativo:
+        return nullcontext({})
+    return _medir_etapa(nome, linhas_entrada, linhas_saida)
+
+
+def medir(nome: str = None):
+    """
+    Decorador: mede cada chamada da função. Linhas de entrada = 1º argumento; de saída = retorno
+    (DataFrame/Series/array). Desligada, o custo é um teste de booleano por chamada.
+    """
+
+    def decorador(funcao):
+        rotulo = nome or f"{funcao.__module__}.{funcao.__name__}"
+
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            if not _ativo:
+                return funcao(*args, **kwargs)
+            with _medir_etapa(rotulo, _linhas(args[0]) if args else None) as registro:
+                resultado = funcao(*args, **kwargs)
+                registro["linhas_saida"] = _linhas(resultado)
+            return resultado
+
+        return medida
+
+    return decorador
+
+
+def _destino() -> deque:
+    coletor = _coletor.get()
+    return REGISTROS if coletor is None else coletor
+
+
+def coletar() -> deque:
+    """
+    Abre um coletor novo para o contexto atual (ex.: um rerun do app) e o devolve: daqui em diante as
+    etapas medidas neste contexto vão para ele, e não para REGISTROS nem para o de outra sessão.
+    """
+    coletor = deque(maxlen=MAX_REGISTROS)
+    _coletor.set(coletor)
+    return coletor
+
+
+def registros() -> list:
+    """Registros do coletor do contexto atual (ou de REGISTROS, se nenhum foi aberto)."""
+    return list(_destino())
+
+
+def limpar():
+    """Esvazia só o coletor do contexto atual (ou REGISTROS, se nenhum foi aberto)."""
+    _destino().clear()
+
+
+def tabela_registros(dados=None):
+    """Registros (`dados` ou os do contexto atual) como DataFrame, na ordem em que as etapas terminaram."""
+    import pandas as pd
+
+    colunas = ["etapa", "nivel", "segundos", "linhas_entrada", "linhas_saida", "pico_memoria_mb"]
+    return pd.DataFrame(registros() if dados is None else list(dados), columns=colunas)
+
+
+def gravar_json(destino: str, contexto: dict = None) -> int:
+    """
+    Acrescenta os registros em `destino` (JSON Lines; `contexto` é copiado em cada linha, ex.: o arquivo
+    de entrada). Devolve quantos registros foram gravados.
+    """
+    dados = registros()
+    with open(destino, "a", encoding="utf-8") as f:
+        for registro in dados:
+            f.write(json.dumps({**(contexto or {}), **registro}, ensure_ascii=False, default=str) + "\n")
+    return len(dados)
+
+
+_configurar_pelo_ambiente()
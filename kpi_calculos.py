@@ -6,6 +6,10 @@ Cada função é comentada e retorna valores prontos para exibir nos cards.
 import pandas as pd
 import numpy as np
 
+from instrumentacao import medir
+from normalizacao_jira import ids_jira
+
+@medir()
 def kpi_sla_medio(df: pd.DataFrame, mask=None):
     if mask is None:
         mask = pd.Series(True, index=df.index)
@@ -22,30 +26,29 @@ def kpi_sla_medio(df: pd.DataFrame, mask=None):
     return round(series.mean(), 2)
 
 
+@medir()
 def kpi_taxa_resolucao_1_dev(df: pd.DataFrame, mask=None):
     """
     Taxa de resolução na 1ª devolutiva:
     (# JIRAs únicos que possuem ao menos 1 registro com STATUS 'Concluído')
     dividido pelo (# JIRAs únicos que chegaram)
     """
-    if mask is None:
-        mask = pd.Series([True]*len(df), index=df.index)
-    sub = df.loc[mask].copy()
+    m = _mascara_numpy(df, mask)
 
-    # limpar JIRA vazio
-    jiras = sub["JIRA"].replace("", pd.NA).dropna()
-    num_jiras = jiras.nunique()
+    # JIRA_ID da ingestão (-1 = sem JIRA)
+    jiras = ids_jira(df)[m]
+    num_jiras = _n_distintos(jiras)
     if num_jiras == 0:
         return np.nan
 
     # JIRAs que possuem ao menos um registro concluído
-    concl_mask = sub["STATUS"].str.lower().str.startswith("concl")
-    jiras_concluidos = sub.loc[concl_mask, "JIRA"].replace("", pd.NA).dropna().unique()
-    num_jiras_concluidos = len(jiras_concluidos)
+    concl_mask = df["FLAG_RESOLUCAO_1_DEV"].to_numpy()[m].astype(bool)
+    num_jiras_concluidos = _n_distintos(jiras[concl_mask])
 
     return round(num_jiras_concluidos / num_jiras, 4)  # retorna razão (ex.: 0.75)
 
 
+@medir()
 def kpi_pct_reprocesso_questionamento(df: pd.DataFrame, mask=None):
     """
     % de Questionamentos que viram reprocesso:
@@ -61,18 +64,155 @@ def kpi_pct_reprocesso_questionamento(df: pd.DataFrame, mask=None):
     reproc = quests["FLAG_REPROCESSO"].sum()
     return round(reproc / total_q, 4)
 
+@medir()
 def kpi_total_solicitacoes(df: pd.DataFrame, mask=None):
     if mask is None:
         return len(df)
     return int(mask.sum())
 
+# ------------------------------------------------------------
+# Motor fundido: todos os KPIs numa única passada
+# ------------------------------------------------------------
+def _mascara_numpy(df: pd.DataFrame, mask) -> np.ndarray:
+    if mask is None:
+        return np.ones(len(df), dtype=bool)
+    return np.asarray(mask, dtype=bool)
+
+
+def mascara_questionamento(tipo: pd.Series) -> np.ndarray:
+    """TIPO == 'questionamento' (sem caixa); em coluna categórica o teste roda só nas categorias."""
+    if isinstance(tipo.dtype, pd.CategoricalDtype):
+        por_categoria = np.asarray(tipo.cat.categories.astype(str).str.lower() == "questionamento", dtype=bool)
+        codigos = tipo.cat.codes.to_numpy()
+        if not len(por_categoria):
+            return np.zeros(len(codigos), dtype=bool)
+        return np.where(codigos >= 0, por_categoria[codigos], False)
+    return (tipo.astype(str).str.lower() == "questionamento").to_numpy(dtype=bool)
+
+
+def _n_distintos(codigos: np.ndarray) -> int:
+    """Número de códigos distintos (>= 0) via bincount, sem ordenação."""
+    codigos = codigos[codigos >= 0]
+    if not len(codigos):
+        return 0
+    return int(np.count_nonzero(np.bincount(codigos)))
+
+
+@medir()
 def gerar_resumo_kpis(df: pd.DataFrame, mask=None):
     """
     Gera um dicionário com todos os KPIs calculados.
+    Motor fundido: uma única passada sobre as colunas numéricas/flags pré-computadas
+    (SLA_DIAS_UTEIS, FLAG_RESOLUCAO_1_DEV, FLAG_REPROCESSO), sem fatiar/copiar o DataFrame
+    nem reprocessar strings de STATUS/TIPO linha a linha.
+    Mesmas chaves e mesmos valores das funções kpi_* individuais.
     """
+    m = _mascara_numpy(df, mask)
+
+    # SLA médio
+    if "SLA_DIAS_UTEIS" in df.columns:
+        sla = df["SLA_DIAS_UTEIS"].to_numpy(dtype="float64")[m]
+    else:
+        # fallback (dias corridos), igual ao kpi_sla_medio
+        ini = pd.to_datetime(df["DATA_SOLICITACAO"], errors="coerce")
+        fim = pd.to_datetime(df["DATA_CONCLUSAO"], errors="coerce")
+        sla = (fim - ini).dt.days.to_numpy(dtype="float64")[m]
+    sla = sla[~np.isnan(sla)]
+    sla_medio = round(np.float64(sla.mean()), 2) if len(sla) else np.nan
+
+    # Taxa de resolução na 1ª devolutiva (JIRAs únicos concluídos / JIRAs únicos)
+    jiras = ids_jira(df)[m]
+    num_jiras = _n_distintos(jiras)
+    if num_jiras == 0:
+        taxa = np.nan
+    else:
+        concluidos = df["FLAG_RESOLUCAO_1_DEV"].to_numpy()[m].astype(bool)
+        taxa = round(_n_distintos(jiras[concluidos]) / num_jiras, 4)
+
+    # % de questionamentos que viram reprocesso
+    quests = mascara_questionamento(df["TIPO"])[m]
+    total_q = int(quests.sum())
+    if total_q == 0:
+        pct_reproc = np.nan
+    else:
+        reproc = df["FLAG_REPROCESSO"].to_numpy()[m][quests].sum()
+        pct_reproc = round(reproc / total_q, 4)
+
     return {
-        "SLA_MÉDIO_DIAS_UTEIS": kpi_sla_medio(df, mask),
-        "TAXA_RESOLUCAO_1_DEV": kpi_taxa_resolucao_1_dev(df, mask),
-        "PCT_REPROCESSO_QUESTIONAMENTO": kpi_pct_reprocesso_questionamento(df, mask),
-        "TOTAL_SOLICITACOES": kpi_total_solicitacoes(df, mask)
+        "SLA_MÉDIO_DIAS_UTEIS": sla_medio,
+        "TAXA_RESOLUCAO_1_DEV": taxa,
+        "PCT_REPROCESSO_QUESTIONAMENTO": pct_reproc,
+        "TOTAL_SOLICITACOES": len(df) if mask is None else int(m.sum()),
     }
+
+
+# ------------------------------------------------------------
+# Cubo de KPIs: todos os KPIs por combinação de dimensões, num único groupby
+# ------------------------------------------------------------
+DIMENSOES_CUBO_PADRAO = ["BU", "RESP_SM", "ANO_MES"]
+
+
+def coluna_ano_mes(df: pd.DataFrame) -> pd.Series:
+    """ANO_MES ('AAAA-MM') a partir de DATA_SOLICITACAO, como Categorical (formata só os meses distintos)."""
+    if "ANO_MES" in df.columns:
+        return df["ANO_MES"]
+    periodos = pd.to_datetime(df["DATA_SOLICITACAO"], errors="coerce").dt.to_period("M")
+    cat = periodos.astype("category")
+    return cat.cat.rename_categories([str(p) for p in cat.cat.categories]).rename("ANO_MES")
+
+
+@medir()
+def gerar_cubo_kpis(df: pd.DataFrame, por=None, mask=None) -> pd.DataFrame:
+    """
+    Calcula todos os KPIs de gerar_resumo_kpis para cada combinação de `por`
+    (padrão: BU x RESP_SM x ANO_MES) num único groupby/agg vetorizado.
+    Retorna um DataFrame "tidy": uma linha por grupo com as colunas de dimensão, as chaves de KPI
+    (SLA_MÉDIO_DIAS_UTEIS, TAXA_RESOLUCAO_1_DEV, PCT_REPROCESSO_QUESTIONAMENTO, TOTAL_SOLICITACOES)
+    e os contadores de base (somas/contagens), prontos para o dashboard e para o Excel.
+    """
+    por = list(por or DIMENSOES_CUBO_PADRAO)
+    m = _mascara_numpy(df, mask)
+
+    concluidos = df["FLAG_RESOLUCAO_1_DEV"].to_numpy().astype(bool)
+    quests = mascara_questionamento(df["TIPO"])
+    jiras = ids_jira(df).astype("float64")
+    jiras[jiras < 0] = np.nan
+
+    dimensoes = {dim: (coluna_ano_mes(df) if dim == "ANO_MES" else df[dim]) for dim in por}
+    base = pd.DataFrame(
+        {
+            # .array mantém as dimensões categóricas (groupby por códigos, observed=True)
+            **{dim: serie.array for dim, serie in dimensoes.items()},
+            "_SLA": df["SLA_DIAS_UTEIS"].to_numpy(dtype="float64"),
+            "_QUEST": quests.astype("int64"),
+            "_REPROC_QUEST": (df["FLAG_REPROCESSO"].to_numpy().astype(bool) & quests).astype("int64"),
+            "_JIRA": jiras,
+            "_JIRA_CONCLUIDO": np.where(concluidos, jiras, np.nan),
+        }
+    )
+    base = base[m]
+
+    cubo = (
+        base.groupby(por, observed=True, dropna=False, sort=True)
+        .agg(
+            TOTAL_SOLICITACOES=("_SLA", "size"),
+            SLA_SOMA=("_SLA", "sum"),
+            SLA_N=("_SLA", "count"),
+            N_QUESTIONAMENTOS=("_QUEST", "sum"),
+            N_REPROCESSOS=("_REPROC_QUEST", "sum"),
+            N_JIRAS=("_JIRA", "nunique"),
+            N_JIRAS_CONCLUIDOS=("_JIRA_CONCLUIDO", "nunique"),
+        )
+        .reset_index()
+    )
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cubo["SLA_MÉDIO_DIAS_UTEIS"] = (cubo["SLA_SOMA"] / cubo["SLA_N"].where(cubo["SLA_N"] > 0)).round(2)
+        cubo["TAXA_RESOLUCAO_1_DEV"] = (cubo["N_JIRAS_CONCLUIDOS"] / cubo["N_JIRAS"].where(cubo["N_JIRAS"] > 0)).round(4)
+        cubo["PCT_REPROCESSO_QUESTIONAMENTO"] = (
+            cubo["N_REPROCESSOS"] / cubo["N_QUESTIONAMENTOS"].where(cubo["N_QUESTIONAMENTOS"] > 0)
+        ).round(4)
+
+    kpis = ["SLA_MÉDIO_DIAS_UTEIS", "TAXA_RESOLUCAO_1_DEV", "PCT_REPROCESSO_QUESTIONAMENTO", "TOTAL_SOLICITACOES"]
+    contadores = ["SLA_SOMA", "SLA_N", "N_QUESTIONAMENTOS", "N_REPROCESSOS", "N_JIRAS", "N_JIRAS_CONCLUIDOS"]
+    return cubo[por + kpis + contadores]
@@ -0,0 +1,144 @@
+"""
+kpi_sm.py
+Modo headless (sem navegador): ingestão + tratamento + KPIs + exportação (Excel multi-abas, Parquet, Feather, CSV).
+Não importa streamlit nem plotly — inicialização rápida, próprio para cron/servidor.
+
+Uso:
+    python -m kpi_sm build entrada.xlsx -o saida.xlsx
+    python -m kpi_sm build "Bases brutas" -o saida.xlsx      (diretório: ingestão em lote)
+    python -m kpi_sm build entrada.xlsx -o base.parquet -o base.csv
+O formato de cada saída vem da extensão (.xlsx, .parquet, .feather, .csv); -o pode ser repetido.
+Com --blocos N a planilha é tratada em blocos de N linhas (processamento_streaming): só um bloco fica
+em memória, os KPIs vêm do acumulador e só saídas .csv são aceitas (escritas bloco a bloco, sem a
+coluna JIRA_ID, cujos códigos não são comparáveis entre blocos; a chave JIRA continua lá).
+    python -m kpi_sm build base_grande.xlsx -o base.csv --blocos 50000
+Os KPIs (gerar_resumo_kpis) são impressos em JSON na saída padrão.
+Com --perf-json ARQ (ou a variável KPI_SM_PERF_JSON) o tempo/linhas/pico de memória de cada etapa
+é acrescentado em ARQ como JSON Lines (ver instrumentacao.py).
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import sys
+import time
+
+import cache_colunar
+import instrumentacao
+import kpi_calculos
+from exportacao import NOME_ARQUIVO_EXPORTACAO, escrever_csv, exportar, formato_do_caminho
+from leitura_excel import ler_solicitacoes_esquema
+from processar_solicitacoes import processar_solicitacoes
+
+
+def carregar_tratada(entrada: str, engine: str = "auto", usar_cache: bool = True):
+    """DataFrame tratado de uma planilha ou de um diretório de planilhas (ingestão em lote)."""
+    if os.path.isdir(entrada):
+        from ingestao_lote import ingerir_diretorio
+
+        return ingerir_diretorio(entrada, usar_cache=usar_cache)
+
+    def _ler_e_tratar(conteudo):
+        return processar_solicitacoes(ler_solicitacoes_esquema(io.BytesIO(conteudo), engine=engine))
+
+    with open(entrada, "rb") as f:
+        conteudo = f.read()
+    if usar_cache:
+        return cache_colunar.carregar_ou_processar(conteudo, _ler_e_tratar)
+    return _ler_e_tratar(conteudo)
+
+
+def _valor_json(v):
+    """np.float64/np.int64 -> float/int; NaN -> None."""
+    if v is None:
+        return None
+    v = v.item() if hasattr(v, "item") else v
+    if isinstance(v, float) and math.isnan(v):
+        return None
+    return v
+
+
+def build(entrada: str, saidas=(NOME_ARQUIVO_EXPORTACAO,), engine: str = "auto", usar_cache: bool = True) -> dict:
+    """Trata `entrada`, grava cada arquivo de `saidas` (formato pela extensão) e devolve os KPIs."""
+    if isinstance(saidas, str):
+        saidas = [saidas]
+    formatos = [formato_do_caminho(s) for s in saidas]  # valida antes de processar
+    df_tratada = carregar_tratada(entrada, engine=engine, usar_cache=usar_cache)
+    kpis = kpi_calculos.gerar_resumo_kpis(df_tratada)
+    for saida, formato in zip(saidas, formatos):
+        exportar(df_tratada, formato, saida)
+    return {k: _valor_json(v) for k, v in kpis.items()}
+
+
+def build_em_blocos(entrada: str, saidas, tamanho_bloco: int) -> dict:
+    """
+    Como build, mas tratando `entrada` em blocos de `tamanho_bloco` linhas (memória de um bloco).
+    Só aceita saídas .csv, escritas à medida que cada bloco fica pronto.
+    """
+    from processamento_streaming import processar_em_blocos
+
+    if isinstance(saidas, str):
+        saidas = [saidas]
+    if os.path.isdir(entrada):
+        raise ValueError("--blocos trata uma planilha; para um diretório use a ingestão em lote (sem --blocos).")
+    if any(formato_do_caminho(s) != "csv" for s in saidas):
+        raise ValueError("--blocos só grava saídas .csv (os demais formatos precisam da base inteira).")
+
+    arquivos = [open(s, "wb") for s in saidas]
+    try:
+        primeiro = True
+
+        def gravar(bloco):
+            nonlocal primeiro
+            bloco = bloco.drop(columns="JIRA_ID", errors="ignore")
+            for f in arquivos:
+                escrever_csv(bloco, f, cabecalho=primeiro)
+            primeiro = False
+
+        acumulador = processar_em_blocos(entrada, tamanho_bloco, ao_processar_bloco=gravar)
+    finally:
+        for f in arquivos:
+            f.close()
+    return {k: _valor_json(v) for k, v in acumulador.resumo_kpis().items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="kpi_sm", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    p_build = comandos.add_parser("build", help="trata a planilha (ou diretório) e gera o Excel com abas")
+    p_build.add_argument("entrada", help="planilha .xlsx ou diretório com planilhas")
+    p_build.add_argument("-o", "--saida", action="append", help=f"arquivo de saída (padrão: {NOME_ARQUIVO_EXPORTACAO}); pode repetir")
+    p_build.add_argument("--engine", default="auto", help="engine de leitura (ver leitura_excel.ENGINES)")
+    p_build.add_argument("--sem-cache", action="store_true", help="não lê nem grava o cache colunar")
+    p_build.add_argument("--blocos", type=int, metavar="N",
+                         help="trata a planilha em blocos de N linhas (memória limitada; só saídas .csv, sem cache)")
+    p_build.add_argument("--perf-json", default=os.environ.get(instrumentacao.VARIAVEL_JSON),
+                         help="grava a instrumentação por etapa (JSON Lines) neste arquivo")
+
+    args = parser.parse_args(argv)
+    if args.comando == "build":
+        if args.perf_json and not instrumentacao.ativo():
+            instrumentacao.ativar()
+        t0 = time.perf_counter()
+        saidas = args.saida or [NOME_ARQUIVO_EXPORTACAO]
+        if args.blocos:
+            try:
+                kpis = build_em_blocos(args.entrada, saidas, args.blocos)
+            except ValueError as erro:
+                parser.error(str(erro))
+        else:
+            kpis = build(args.entrada, saidas, engine=args.engine, usar_cache=not args.sem_cache)
+        if args.perf_json:
+            n = instrumentacao.gravar_json(args.perf_json, {"comando": "build", "entrada": args.entrada})
+            print(f"{n} registro(s) de performance em {args.perf_json}", file=sys.stderr)
+        json.dump(kpis, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        print(f"{', '.join(saidas)} gravado(s) em {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
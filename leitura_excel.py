@@ -0,0 +1,260 @@
+"""
+leitura_excel.py
+Camada de leitura da aba SOLICITAÇÕES com engine plugável.
+- "calamine": python-calamine (Rust), bem mais rápido que openpyxl
+- "openpyxl_streaming": openpyxl em modo read-only, materializa só a aba pedida (e só as colunas pedidas)
+- "openpyxl": leitura padrão do pandas (referência / fallback)
+- "auto": escolhe a mais rápida disponível
+Qualquer falha de uma engine alternativa cai de volta no openpyxl padrão.
+
+Modo por esquema (ler_solicitacoes_esquema): lê só o cabeçalho, resolve as variantes de nome
+para os nomes canônicos e então lê apenas as colunas usadas pelo pipeline, já com tipos declarados.
+
+Modo em blocos (ler_solicitacoes_em_blocos): mesmo esquema, mas entregue em pedaços de N linhas
+(openpyxl read-only), para bases que não cabem inteiras em memória. O formato das datas em texto é
+decidido uma vez (primeiro valor texto da coluna, como na leitura inteira) e reusado em todos os blocos.
+"""
+
+import io
+import importlib.util
+
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+from instrumentacao import medir
+from processar_solicitacoes import COLUNAS_ESPERADAS, ESQUEMA_TIPOS
+from resolucao_cabecalho import resolver_cabecalho
+
+ABA_SOLICITACOES = "SOLICITAÇÕES"
+LINHA_CABECALHO = 1  # cabeçalho na 2ª linha da planilha
+
+ENGINES = ("calamine", "openpyxl_streaming", "openpyxl")
+
+TAMANHO_BLOCO = 50_000
+
+
+def engines_disponiveis() -> list:
+    """Engines utilizáveis neste ambiente, da mais rápida para a mais lenta."""
+    disponiveis = []
+    if importlib.util.find_spec("python_calamine") is not None:
+        disponiveis.append("calamine")
+    if importlib.util.find_spec("openpyxl") is not None:
+        disponiveis += ["openpyxl_streaming", "openpyxl"]
+    return disponiveis
+
+
+def escolher_engine() -> str:
+    disponiveis = engines_disponiveis()
+    return disponiveis[0] if disponiveis else "openpyxl"
+
+
+def _rebobinar(arquivo):
+    if hasattr(arquivo, "seek"):
+        arquivo.seek(0)
+
+
+def _nomes_colunas(cabecalho) -> list:
+    """Replica a nomeação do pandas: vazios viram 'Unnamed: i' e repetidos ganham sufixo '.1', '.2'..."""
+    nomes, vistos = [], {}
+    for i, c in enumerate(cabecalho):
+        nome = f"Unnamed: {i}" if c is None or (isinstance(c, str) and not c.strip()) else c
+        if nome in vistos:
+            vistos[nome] += 1
+            nome = f"{nome}.{vistos[nome]}"
+        else:
+            vistos[nome] = 0
+        nomes.append(nome)
+    return nomes
+
+
+def _ler_openpyxl_streaming(arquivo, sheet_name, header, usecols=None) -> pd.DataFrame:
+    """Lê a aba com openpyxl read-only (iter_rows), sem carregar as demais abas nem os estilos."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        linhas = wb[sheet_name].iter_rows(values_only=True)
+        for _ in range(header):
+            next(linhas, None)
+        cabecalho = _nomes_colunas(next(linhas, ()))
+
+        if usecols is None:
+            indices = list(range(len(cabecalho)))
+        else:
+            pedidas = set(usecols)
+            indices = [i for i, c in enumerate(cabecalho) if c in pedidas]
+        largura = len(cabecalho)
+
+        dados = []
+        for linha in linhas:
+            if len(linha) < largura:
+                linha = tuple(linha) + (None,) * (largura - len(linha))
+            dados.append([linha[i] for i in indices])
+    finally:
+        wb.close()
+
+    # descartar linhas vazias no fim da aba (igual ao read_excel)
+    while dados and all(v is None for v in dados[-1]):
+        dados.pop()
+
+    return pd.DataFrame(dados, columns=[cabecalho[i] for i in indices])
+
+
+@medir()
+def ler_solicitacoes(arquivo, engine: str = "auto", sheet_name: str = ABA_SOLICITACOES,
+                     header: int = LINHA_CABECALHO, usecols=None) -> pd.DataFrame:
+    """
+    Lê a aba SOLICITAÇÕES de `arquivo` (caminho, bytes ou file-like) com a engine escolhida.
+    `usecols` (lista de nomes de cabeçalho) limita as colunas materializadas.
+    """
+    if isinstance(arquivo, (bytes, bytearray)):
+        arquivo = io.BytesIO(arquivo)
+    if engine == "auto":
+        engine = escolher_engine()
+    if engine not in ENGINES:
+        raise ValueError(f"Engine desconhecida: {engine!r}. Use 'auto' ou uma de {ENGINES}.")
+
+    if engine != "openpyxl":
+        try:
+            _rebobinar(arquivo)
+            if engine == "calamine":
+                return pd.read_excel(arquivo, sheet_name=sheet_name, header=header, usecols=usecols, engine="calamine")
+            return _ler_openpyxl_streaming(arquivo, sheet_name, header, usecols)
+        except Exception:
+            pass  # fallback para o openpyxl padrão abaixo
+
+    _rebobinar(arquivo)
+    return pd.read_excel(arquivo, sheet_name=sheet_name, header=header, usecols=usecols, engine="openpyxl")
+
+
+def ler_cabecalho(arquivo, sheet_name: str = ABA_SOLICITACOES, header: int = LINHA_CABECALHO) -> list:
+    """Lê apenas a linha de cabeçalho da aba (sem materializar os dados)."""
+    if isinstance(arquivo, (bytes, bytearray)):
+        arquivo = io.BytesIO(arquivo)
+    _rebobinar(arquivo)
+    if "calamine" in engines_disponiveis():
+        try:
+            cols = pd.read_excel(arquivo, sheet_name=sheet_name, header=header, nrows=0, engine="calamine").columns
+            return list(cols)
+        except Exception:
+            _rebobinar(arquivo)
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        linhas = wb[sheet_name].iter_rows(min_row=header + 1, max_row=header + 1, values_only=True)
+        return _nomes_colunas(next(linhas, ()))
+    finally:
+        wb.close()
+
+
+def resolver_colunas(cabecalho) -> dict:
+    """
+    Mapeia cabeçalho bruto -> nome canônico, só para as colunas usadas pelo pipeline.
+    Se duas variantes resolverem para o mesmo nome canônico, vale a primeira.
+    """
+    usadas = {}
+    for bruto, canonico in zip(cabecalho, resolver_cabecalho(cabecalho)):
+        if canonico in COLUNAS_ESPERADAS and canonico not in usadas.values():
+            usadas[bruto] = canonico
+    return usadas
+
+
+def formato_datas(serie: pd.Series):
+    """
+    Formato (strftime) das datas em texto de `serie`, deduzido do primeiro valor texto, como o
+    pd.to_datetime faz (mês primeiro; dia primeiro se não couber). "mixed" se o texto não tiver formato
+    reconhecível (cada valor é interpretado sozinho); None se a coluna não tiver datas em texto.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return None
+    for valor in serie:
+        if isinstance(valor, str) and valor.strip():
+            valor = valor.strip()
+            return guess_datetime_format(valor) or guess_datetime_format(valor, dayfirst=True) or "mixed"
+    return None
+
+
+def aplicar_tipos_esquema(df: pd.DataFrame, formatos: dict = None) -> pd.DataFrame:
+    """
+    Converte as colunas canônicas presentes para os tipos de ESQUEMA_TIPOS (in place).
+    `formatos` ({coluna de data: formato}) é lido e completado aqui: na leitura em blocos, o mesmo dict
+    passa por todos os blocos, então o formato decidido no primeiro vale para os seguintes.
+    """
+    formatos = {} if formatos is None else formatos
+    for col, tipo in ESQUEMA_TIPOS.items():
+        if col not in df.columns:
+            continue
+        if tipo == "category":
+            df[col] = df[col].astype("category")
+        elif tipo == "datetime":
+            if formatos.get(col) is None:
+                formatos[col] = formato_datas(df[col])
+            df[col] = pd.to_datetime(df[col], errors="coerce", format=formatos[col])
+        elif tipo == "numeric":
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+@medir()
+def ler_solicitacoes_esquema(arquivo, engine: str = "auto", sheet_name: str = ABA_SOLICITACOES,
+                             header: int = LINHA_CABECALHO) -> pd.DataFrame:
+    """
+    Leitura orientada pelo esquema do pipeline:
+    1) lê só o cabeçalho e resolve as variantes (resolucao_cabecalho) antes da leitura completa
+    2) lê apenas as colunas canônicas (usecols), já renomeadas
+    3) declara os tipos: category (BU/TIPO/STATUS/RESP_SM), datetime (datas), numérico (QTDE_*)
+    Memória e tempo passam a depender das colunas usadas, não da largura da aba.
+    """
+    if isinstance(arquivo, (bytes, bytearray)):
+        arquivo = io.BytesIO(arquivo)
+    usadas = resolver_colunas(ler_cabecalho(arquivo, sheet_name, header))
+    df = ler_solicitacoes(arquivo, engine=engine, sheet_name=sheet_name, header=header, usecols=list(usadas))
+    df = df.rename(columns=usadas)
+    return aplicar_tipos_esquema(df)
+
+
+def ler_solicitacoes_em_blocos(arquivo, tamanho_bloco: int = TAMANHO_BLOCO, sheet_name: str = ABA_SOLICITACOES,
+                               header: int = LINHA_CABECALHO):
+    """
+    Gerador de DataFrames de até `tamanho_bloco` linhas, com as colunas canônicas já renomeadas e tipadas
+    (mesmo resultado de ler_solicitacoes_esquema, fatiado). Só um bloco fica em memória por vez.
+    Linhas vazias no meio da aba são mantidas; as do fim são descartadas (igual ao read_excel).
+    """
+    from openpyxl import load_workbook
+
+    if isinstance(arquivo, (bytes, bytearray)):
+        arquivo = io.BytesIO(arquivo)
+    _rebobinar(arquivo)
+
+    wb = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        linhas = wb[sheet_name].iter_rows(values_only=True)
+        for _ in range(header):
+            next(linhas, None)
+        cabecalho = _nomes_colunas(next(linhas, ()))
+        usadas = resolver_colunas(cabecalho)
+        indices = [i for i, c in enumerate(cabecalho) if c in usadas]
+        nomes = [usadas[cabecalho[i]] for i in indices]
+        largura = len(cabecalho)
+
+        bloco, vazias = [], 0
+        formatos = {}  # formato das datas em texto, decidido no 1º bloco que as tiver
+        for linha in linhas:
+            if all(v is None for v in linha):
+                vazias += 1  # só entra no bloco se aparecer uma linha preenchida depois
+                continue
+            if vazias:
+                bloco.extend([None] * len(indices) for _ in range(vazias))
+                vazias = 0
+            if len(linha) < largura:
+                linha = tuple(linha) + (None,) * (largura - len(linha))
+            bloco.append([linha[i] for i in indices])
+            if len(bloco) >= tamanho_bloco:
+                yield aplicar_tipos_esquema(pd.DataFrame(bloco, columns=nomes), formatos)
+                bloco = []
+        if bloco:
+            yield aplicar_tipos_esquema(pd.DataFrame(bloco, columns=nomes), formatos)
+    finally:
+        wb.close()
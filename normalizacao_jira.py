@@ -0,0 +1,66 @@
+"""
+normalizacao_jira.py
+Normalização única da coluna JIRA, feita na ingestão (processar_solicitacoes).
+- JIRA: chave canônica categórica (strip, maiúsculas, '301.0' -> '301'); sem JIRA vira NaN
+- POSSUI_JIRA: booleano (chave preenchida com algo diferente dos TOKENS_SEM_JIRA)
+- JIRA_ID: inteiro denso por chave (código da categoria; -1 = sem JIRA)
+As regras de texto rodam só sobre os valores distintos; as linhas recebem códigos inteiros.
+KPIs, rollup e cards leem estas colunas em vez de refazer operações de string a cada rerun.
+"""
+
+import numpy as np
+import pandas as pd
+
+# representações textuais que contam como "sem JIRA"
+TOKENS_SEM_JIRA = ["", "nan", "none", "na", "n/a", "null", "-", "."]
+
+
+def _chaves_canonicas(valores: pd.Index) -> list:
+    """Chave canônica de cada valor distinto (None = sem JIRA)."""
+    texto = pd.Index(valores).astype(str).str.strip()
+    # números vindos do Excel como float ("301.0") viram "301"
+    texto = texto.str.replace(r"^(\d+)\.0+$", r"\1", regex=True)
+    sem_jira = texto.str.lower().isin(TOKENS_SEM_JIRA)
+    return [None if vazio else chave.upper() for chave, vazio in zip(texto, sem_jira)]
+
+
+def normalizar_jira(jira: pd.Series) -> pd.DataFrame:
+    """Retorna JIRA (categórico canônico), POSSUI_JIRA e JIRA_ID (int32), alinhados ao índice de `jira`."""
+    cat = jira.astype("category")
+    chaves = _chaves_canonicas(cat.cat.categories)
+
+    categorias = sorted({c for c in chaves if c is not None})
+    posicao = {c: i for i, c in enumerate(categorias)}
+    recodifica = np.array([posicao.get(c, -1) for c in chaves], dtype="int32")
+
+    codigos = cat.cat.codes.to_numpy()
+    ids = np.where(codigos >= 0, recodifica[codigos] if len(recodifica) else -1, -1).astype("int32")
+    return pd.DataFrame(
+        {
+            "JIRA": pd.Categorical.from_codes(ids, categories=categorias),
+            "POSSUI_JIRA": ids >= 0,
+            "JIRA_ID": ids,
+        },
+        index=jira.index,
+    )
+
+
+def ids_de_chave(jira: pd.Series) -> np.ndarray:
+    """JIRA_ID a partir de uma coluna JIRA já canônica (ex.: após unir categorias de pedaços tratados)."""
+    return jira.cat.codes.to_numpy().astype("int32")
+
+
+def possui_jira(df: pd.DataFrame) -> np.ndarray:
+    """Máscara POSSUI_JIRA do df (coluna da ingestão; normaliza na hora se o df não a tiver)."""
+    if "POSSUI_JIRA" in df.columns:
+        return df["POSSUI_JIRA"].to_numpy(dtype=bool)
+    if "JIRA" not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    return normalizar_jira(df["JIRA"])["POSSUI_JIRA"].to_numpy()
+
+
+def ids_jira(df: pd.DataFrame) -> np.ndarray:
+    """JIRA_ID do df (coluna da ingestão; normaliza na hora se o df não a tiver)."""
+    if "JIRA_ID" in df.columns:
+        return df["JIRA_ID"].to_numpy().astype("int64")
+    return normalizar_jira(df["JIRA"])["JIRA_ID"].to_numpy().astype("int64")
@@ -0,0 +1,75 @@
+"""
+primeira_ocorrencia.py
+Índice de primeira ocorrência por CLIENTE (fabricante) e por CATEGORIA, construído uma vez por dataset.
+- Uma linha por (entidade, BU, RESP_SM, STATUS, TIPO) com a menor e a maior DATA_SOLICITACAO
+  (groupby-min/max, sem ordenar o frame)
+- "Novos no mês X" e "únicos desde D" viram consultas sobre esta tabela pequena, já respeitando
+  os filtros do header (a tabela é recortada pelas seleções e reagregada por entidade)
+- Qualquer mês de referência é suportado (não só o mês atual)
+"""
+
+import numpy as np
+import pandas as pd
+
+from contexto_render import codigo_do_mes, codigo_mes
+from indice_filtros import COLUNA_DATA_FILTRO, DIMENSOES_FILTRO
+from rollup_mensal import filtrar_rollup
+
+ENTIDADES_PRIMEIRA_OCORRENCIA = ["CLIENTE", "CATEGORIA"]
+
+
+class IndicePrimeiraOcorrencia:
+    """
+    Uso:
+        indice = IndicePrimeiraOcorrencia(df_tratada)
+        indice.novos_no_mes("CLIENTE", "2025-09", {"BU": "BU 1 - EDUARDO"})  -> 3
+        indice.unicos_desde("CATEGORIA", "2025-07-01")                      -> 42
+        indice.primeiras("CLIENTE")                                        -> Series cliente -> 1ª data
+    Seleções seguem o formato do header_com_filtros ({dimensão: valor, lista ou 'Todos'}).
+    """
+
+    def __init__(self, df: pd.DataFrame, entidades=ENTIDADES_PRIMEIRA_OCORRENCIA,
+                 dimensoes=DIMENSOES_FILTRO, coluna_data: str = COLUNA_DATA_FILTRO):
+        datas = pd.to_datetime(df[coluna_data], errors="coerce").to_numpy(dtype="datetime64[ns]")
+        dimensoes = [d for d in dimensoes if d in df.columns]
+        self._tabelas = {}
+
+        for entidade in entidades:
+            if entidade not in df.columns:
+                continue
+            base = pd.DataFrame(
+                {
+                    entidade: df[entidade].array,
+                    **{dim: df[dim].array for dim in dimensoes},
+                    "DATA": datas,
+                }
+            )
+            tabela = (
+                base.groupby([entidade] + dimensoes, observed=True, dropna=False, sort=False)["DATA"]
+                .agg(PRIMEIRA="min", ULTIMA="max")
+                .reset_index()
+            )
+            self._tabelas[entidade] = tabela[tabela[entidade].notna()].reset_index(drop=True)
+
+    def entidades(self) -> list:
+        return list(self._tabelas)
+
+    def _recorte(self, entidade: str, selecoes: dict = None) -> pd.DataFrame:
+        tabela = self._tabelas.get(entidade)
+        if tabela is None:
+            raise KeyError(f"Entidade não indexada: {entidade!r}")
+        return filtrar_rollup(tabela, selecoes)
+
+    def primeiras(self, entidade: str, selecoes: dict = None) -> pd.Series:
+        """Primeira DATA_SOLICITACAO de cada valor da entidade dentro das seleções (NaT se nunca datado)."""
+        return self._recorte(entidade, selecoes).groupby(entidade, observed=True, sort=False)["PRIMEIRA"].min()
+
+    def novos_no_mes(self, entidade: str, referencia, selecoes: dict = None) -> int:
+        """Quantos valores da entidade têm a 1ª ocorrência no mês de `referencia`."""
+        primeiras = self.primeiras(entidade, selecoes).to_numpy(dtype="datetime64[ns]")
+        return int(np.count_nonzero(codigo_mes(primeiras) == codigo_do_mes(referencia)))
+
+    def unicos_desde(self, entidade: str, inicio, selecoes: dict = None) -> int:
+        """Quantos valores distintos da entidade aparecem com DATA_SOLICITACAO >= inicio."""
+        recorte = self._recorte(entidade, selecoes)
+        return int(recorte.loc[recorte["ULTIMA"] >= pd.Timestamp(inicio), entidade].nunique())
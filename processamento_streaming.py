@@ -0,0 +1,121 @@
+"""
+processamento_streaming.py
+Processamento em blocos para bases que não cabem inteiras em memória (vários anos / várias BUs).
+- Lê a aba SOLICITAÇÕES em blocos de linhas (leitura_excel.ler_solicitacoes_em_blocos)
+- Roda o pipeline completo (normalização, SLA, JIRA, flags) em cada bloco
+- Alimenta um AcumuladorKPI: contadores dos KPIs + rollup mensal parcial, combináveis entre si
+Exposto na linha de comando por `kpi_sm build planilha.xlsx -o base.csv --blocos N`.
+Memória limitada a um bloco + estado do acumulador (proporcional a JIRAs distintos, grupos do rollup e
+pares (grupo, JIRA), não ao número de linhas).
+"""
+
+import numpy as np
+
+from kpi_calculos import mascara_questionamento
+from leitura_excel import TAMANHO_BLOCO, ler_solicitacoes_em_blocos
+from normalizacao_jira import possui_jira
+from processar_solicitacoes import processar_solicitacoes
+from rollup_mensal import combinar_pares, combinar_rollups, gerar_pares_jira, gerar_rollup_mensal
+
+# quantos rollups parciais guardar antes de compactá-los num só
+MAX_ROLLUPS_PENDENTES = 16
+
+
+class AcumuladorKPI:
+    """
+    Estado combinável dos KPIs de gerar_resumo_kpis e do rollup mensal.
+    Uso:
+        acc = AcumuladorKPI()
+        for bloco_tratado in ...:
+            acc.adicionar(bloco_tratado)
+        acc.resumo_kpis()   -> mesmo dict de gerar_resumo_kpis(df_inteiro)
+        acc.rollup()        -> mesmo rollup de gerar_rollup_mensal(df_inteiro)
+    Acumuladores de blocos/arquivos diferentes se juntam com combinar().
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.sla_soma = 0.0
+        self.sla_n = 0
+        self.questionamentos = 0
+        self.reprocessos = 0
+        # chaves canônicas (os JIRA_ID de cada bloco não são comparáveis entre blocos)
+        self.jiras = set()
+        self.jiras_concluidos = set()
+        self._rollups = []
+        self._pares = []  # pares (grupo, JIRA) de cada rollup parcial, para recontar N_JIRAS
+
+    def adicionar(self, df_tratado):
+        """Incorpora um bloco já tratado por processar_solicitacoes."""
+        self.total += len(df_tratado)
+
+        sla = df_tratado["SLA_DIAS_UTEIS"].to_numpy(dtype="float64")
+        sla = sla[~np.isnan(sla)]
+        self.sla_soma += float(sla.sum())
+        self.sla_n += len(sla)
+
+        quests = mascara_questionamento(df_tratado["TIPO"])
+        self.questionamentos += int(quests.sum())
+        self.reprocessos += int(df_tratado["FLAG_REPROCESSO"].to_numpy()[quests].sum())
+
+        tem_jira = possui_jira(df_tratado)
+        chaves = df_tratado["JIRA"].to_numpy(dtype=object)
+        concluidos = df_tratado["FLAG_RESOLUCAO_1_DEV"].to_numpy().astype(bool)
+        self.jiras.update(chaves[tem_jira])
+        self.jiras_concluidos.update(chaves[tem_jira & concluidos])
+
+        self._rollups.append(gerar_rollup_mensal(df_tratado))
+        self._pares.append(gerar_pares_jira(df_tratado))
+        self._compactar()
+        return self
+
+    def combinar(self, outro: "AcumuladorKPI"):
+        """Soma o estado de outro acumulador a este (ex.: um por arquivo ou por processo)."""
+        self.total += outro.total
+        self.sla_soma += outro.sla_soma
+        self.sla_n += outro.sla_n
+        self.questionamentos += outro.questionamentos
+        self.reprocessos += outro.reprocessos
+        self.jiras |= outro.jiras
+        self.jiras_concluidos |= outro.jiras_concluidos
+        self._rollups.extend(outro._rollups)
+        self._pares.extend(outro._pares)
+        self._compactar()
+        return self
+
+    def _compactar(self):
+        if len(self._rollups) > MAX_ROLLUPS_PENDENTES:
+            self._pares = [combinar_pares(self._pares)]
+            self._rollups = [combinar_rollups(self._rollups, self._pares)]
+
+    def resumo_kpis(self) -> dict:
+        """Mesmas chaves (e valores) de kpi_calculos.gerar_resumo_kpis sobre todos os blocos."""
+        sla_medio = round(np.float64(self.sla_soma / self.sla_n), 2) if self.sla_n else np.nan
+        taxa = round(len(self.jiras_concluidos) / len(self.jiras), 4) if self.jiras else np.nan
+        pct_reproc = round(self.reprocessos / self.questionamentos, 4) if self.questionamentos else np.nan
+        return {
+            "SLA_MÉDIO_DIAS_UTEIS": sla_medio,
+            "TAXA_RESOLUCAO_1_DEV": taxa,
+            "PCT_REPROCESSO_QUESTIONAMENTO": pct_reproc,
+            "TOTAL_SOLICITACOES": self.total,
+        }
+
+    def rollup(self):
+        """Rollup mensal de todos os blocos (ver rollup_mensal.gerar_rollup_mensal)."""
+        self._pares = [combinar_pares(self._pares)]
+        self._rollups = [combinar_rollups(self._rollups, self._pares)]
+        return self._rollups[0]
+
+
+def processar_em_blocos(arquivo, tamanho_bloco: int = TAMANHO_BLOCO, ao_processar_bloco=None) -> AcumuladorKPI:
+    """
+    Pipeline em streaming: lê `arquivo` em blocos, trata cada bloco e acumula KPIs e rollup.
+    `ao_processar_bloco(df_tratado)` (opcional) recebe cada bloco tratado, ex.: para gravá-lo em disco.
+    """
+    acumulador = AcumuladorKPI()
+    for bloco in ler_solicitacoes_em_blocos(arquivo, tamanho_bloco):
+        tratado = processar_solicitacoes(bloco)
+        acumulador.adicionar(tratado)
+        if ao_processar_bloco is not None:
+            ao_processar_bloco(tratado)
+    return acumulador
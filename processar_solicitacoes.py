@@ -1,157 +1,170 @@
 """
 processar_solicitacoes.py
 Módulo responsável por:
-- Padronizar colunas (tratar espaços, pontos, maiúsculas)
+- Padronizar colunas (tratar espaços, pontos, maiúsculas — ver resolucao_cabecalho)
 - Converter datas
-- Calcular SLA (dias úteis)
+- Calcular SLA (dias úteis, descontando feriados do calendario_feriados)
 - Criar flags usadas pelos KPIs (resolução 1ª, reprocesso)
+- Normalizar JIRA (chave canônica, POSSUI_JIRA, JIRA_ID — ver normalizacao_jira)
 Recebe um DataFrame (lido pelo app) e retorna o DataFrame tratado.
 """
 
 import pandas as pd
 import numpy as np
-import unicodedata
-
-def calcular_dias_uteis(start, end):
-    try:
-        if pd.isna(start) or pd.isna(end):
-            return np.nan
-        s = pd.to_datetime(start).date()
-        e = pd.to_datetime(end).date()
-        # np.busday_count conta dias úteis ENTRE start e end (exclui o end),
-        # se quiser incluir o dia final, some 1 quando ambos forem dias úteis.
-        n = np.busday_count(s, e)
-        # incluir dia de conclusão se for dia útil (opcional) — manter sem incluir para consistência
-        return int(n) if not pd.isna(n) else np.nan
-    except Exception:
-        return np.nan
+
+from calculo_sla import calcular_slas, dias_uteis_por_bu, status_concluido
+from instrumentacao import etapa, medir
+from normalizacao_jira import normalizar_jira
+from resolucao_cabecalho import ALIASES, resolver_cabecalho
+from resolucao_cabecalho import nome_canonico, normalizar_nome_coluna  # noqa: F401 (reexportados)
+
+# Versão do tratamento: incrementar sempre que a saída de processar_solicitacoes mudar
+# (colunas, tipos ou regras), para invalidar caches persistidos (cache_colunar).
+VERSAO_PIPELINE = 8
+
+def calcular_dias_uteis(start, end, bu=None):
+    """
+    Versão escalar do SLA em dias úteis. Usa o mesmo motor colunar do pipeline
+    (calculo_sla.dias_uteis_por_bu), então o resultado é idêntico ao da coluna SLA_DIAS_UTEIS.
+    Feriados nacionais são sempre descontados; `bu` adiciona os feriados regionais da BU.
+    """
+    # np.busday_count conta dias úteis ENTRE start e end (exclui o end) — manter sem incluir para consistência
+    n = dias_uteis_por_bu([start], [end], None if bu is None else [bu])[0]
+    return np.nan if np.isnan(n) else int(n)
+
+# mapa de variantes de cabeçalho (já normalizadas) -> nome canônico: registro de aliases de resolucao_cabecalho
+RENAME_MAP = ALIASES
+
+# colunas esperadas (canônicas) - se faltarem criamos com NaN
+COLUNAS_ESPERADAS = [
+    "BU", "RESP_BU", "DATA_SOLICITACAO", "CLIENTE", "CATEGORIA",
+    "DETALHE_QUESTIONAMENTO", "TIPO", "RESP_SM",
+    "QTDE_QUEST", "JIRA", "QTDE_QUEST_JIRA",
+    "DATA_ABERTURA", "DATA_CONCLUSAO",
+    "OBSERVACOES", "STATUS", "CONCLUSAO_QUALITATIVA"
+]
+
+# colunas de texto entregues como pandas Categorical (categorias em ordem alfabética estável)
+COLUNAS_CATEGORICAS = ["BU", "TIPO", "STATUS", "RESP_SM", "CLIENTE", "CATEGORIA"]
+# das quais só estas têm os valores aparados (strip), como sempre foi; STATUS também vai para minúsculas.
+# CLIENTE, CATEGORIA e RESP_SM mantêm o valor bruto ("Sabão " e "Sabão" continuam distintos)
+COLUNAS_APARADAS = ["BU", "TIPO", "STATUS"]
+
+# tipos declarados para a leitura por esquema (leitura_excel.ler_solicitacoes_esquema)
+ESQUEMA_TIPOS = {
+    "BU": "category",
+    "TIPO": "category",
+    "STATUS": "category",
+    "RESP_SM": "category",
+    "DATA_SOLICITACAO": "datetime",
+    "DATA_ABERTURA": "datetime",
+    "DATA_CONCLUSAO": "datetime",
+    "QTDE_QUEST": "numeric",
+    "QTDE_QUEST_JIRA": "numeric",
+}
+
+
+def _categoria_normalizada(serie: pd.Series, aparar: bool = True, minusculas: bool = False) -> pd.Series:
+    """
+    Converte a coluna para Categorical com categorias ordenadas.
+    strip (`aparar`) e lower são aplicados só às categorias distintas (não linha a linha);
+    variantes que colidem após a normalização viram a mesma categoria. Vazios continuam NaN.
+    Com aparar=False e minusculas=False o texto fica como veio (categorias só passam a str, para que
+    pedaços diferentes tenham categorias do mesmo tipo ao serem concatenados).
+    """
+    cat = serie.astype("category")
+    valores = cat.cat.categories.astype(str)
+    if aparar:
+        valores = valores.str.strip()
+    if minusculas:
+        valores = valores.str.lower()
+    valores = np.asarray(valores, dtype=object)
+
+    categorias = sorted(set(valores))
+    posicao = {v: i for i, v in enumerate(categorias)}
+    recodifica = np.array([posicao[v] for v in valores], dtype="int32")
+
+    codigos = cat.cat.codes.to_numpy()
+    novos = np.where(codigos >= 0, recodifica[codigos] if len(recodifica) else -1, -1)
+    return pd.Series(pd.Categorical.from_codes(novos, categories=categorias), index=serie.index, name=serie.name)
+
 
 def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Normaliza os nomes das colunas:
-    - remove acentos
-    - substitui pontos e espaços por underscore
-    - converte para MAIÚSCULAS
-    - aplica mapa de variantes para nomes canônicos
+    Normaliza os nomes das colunas e aplica o mapa de variantes para nomes canônicos
+    (resolucao_cabecalho: resolução memoizada pelo layout do cabeçalho).
     """
-    df = df.copy()
-
-    def _remove_acentos(texto):
-        if not isinstance(texto, str):
-            return texto
-        texto_norm = unicodedata.normalize('NFKD', texto)
-        texto_ascii = texto_norm.encode('ascii', 'ignore').decode('utf-8')
-        return texto_ascii
-
-    newcols = []
-    for c in df.columns:
-        c_clean = _remove_acentos(str(c)).strip()
-        c_clean = c_clean.replace(".", "_").replace(" ", "_")
-        # remover underscores duplicados
-        while "__" in c_clean:
-            c_clean = c_clean.replace("__", "_")
-        c_clean = c_clean.upper()
-        newcols.append(c_clean)
-
-    df.columns = newcols
-
-    rename_map = {
-        # responsáveis
-        "RESP_BU": "RESP_BU",
-        "RESP_SM": "RESP_SM",
-        "RESP__SM": "RESP_SM",  # novo caso corrigido
-        "RESP__BU": "RESP_BU",  # idem, caso venha com duplo underscore
-
-        # datas
-        "DATA_SOLICITACAO": "DATA_SOLICITACAO",
-        "DATA_ABERTURA": "DATA_ABERTURA",
-        "DATA_CONCLUSAO": "DATA_CONCLUSAO",
-
-        # detalhe / texto
-        "DETALHE": "DETALHE_QUESTIONAMENTO",
-        "DETALHE_QUESTIONAMENTO": "DETALHE_QUESTIONAMENTO",
-
-        # quantidades
-        "QTIA_QUEST": "QTDE_QUEST",
-        "QTDE_QUEST": "QTDE_QUEST",
-        "QTIA_QUEST_JIRA": "QTDE_QUEST_JIRA",
-        "QTDE_QUEST_JIRA": "QTDE_QUEST_JIRA",
-
-        # outros
-        "OBSERVACOES": "OBSERVACOES",
-        "STATUS": "STATUS",
-        "TIPO": "TIPO",
-        "CLIENTE": "CLIENTE",
-        "CATEGORIA": "CATEGORIA",
-        "JIRA": "JIRA",
-        "CONCLUSAO_QUALITATIVA": "CONCLUSAO_QUALITATIVA",
-    }
-
-    df.rename(columns={c: rename_map.get(c, c) for c in df.columns}, inplace=True)
+    # cópia rasa: só os rótulos mudam, os dados não são duplicados
+    df = df.copy(deep=False)
+    df.columns = resolver_cabecalho(df.columns)
     return df
 
 
+@medir("processar_solicitacoes")
 def processar_solicitacoes(df_raw: pd.DataFrame) -> pd.DataFrame:
     """
     Pipeline principal:
     - Normaliza colunas
     - Garante existência das colunas essenciais (cria vazias se não houver)
     - Converte datas
-    - Calcula SLA_DIAS_UTEIS (apenas para STATUS = 'Concluído')
+    - Calcula SLA_DIAS_UTEIS (apenas para STATUS = 'Concluído') e
+      SLA_DIAS_UTEIS_TODOS (todas as linhas com as duas datas)
+    - Normaliza JIRA (chave categórica canônica, POSSUI_JIRA, JIRA_ID)
     - Cria flags:
         FLAG_RESOLUCAO_1_DEV (1 se STATUS == 'Concluído' else 0)
         FLAG_REPROCESSO (1 se texto 'reprocesso' aparecer em conclusão qualitativa)
     Retorna df_tratado.
     """
-    df = _normalize_columns(df_raw)
-
-    # colunas esperadas (canônicas) - se faltarem criamos com NaN
-    expected = [
-        "BU", "RESP_BU", "DATA_SOLICITACAO", "CLIENTE", "CATEGORIA",
-        "DETALHE_QUESTIONAMENTO", "TIPO", "RESP_SM",
-        "QTDE_QUEST", "JIRA", "QTDE_QUEST_JIRA",
-        "DATA_ABERTURA", "DATA_CONCLUSAO",
-        "OBSERVACOES", "STATUS", "CONCLUSAO_QUALITATIVA"
-    ]
-    for col in expected:
-        if col not in df.columns:
-            df[col] = np.nan  # cria coluna vazia quando não existir
+    n = len(df_raw)
+    with etapa("processar.normalizar_colunas", n, n):
+        df = _normalize_columns(df_raw)
+
+        for col in COLUNAS_ESPERADAS:
+            if col not in df.columns:
+                df[col] = np.nan  # cria coluna vazia quando não existir
 
     # Algumas pessoas usam "DATA_SOLICITAÇÃO" com acento; já normalizamos mas garantimos ambas:
     # Converter datas (try multiple col names if present)
-    for date_col in ["DATA_SOLICITACAO", "DATA_ABERTURA", "DATA_CONCLUSAO"]:
-        df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
-
-    # NORMALIZAR STATUS (ex.: espaços/maiúsculas)
-    df["STATUS"] = df["STATUS"].astype(str).str.strip().str.lower()
-    # padronizar TIPO e BU também por segurança
-    df["TIPO"] = df["TIPO"].astype(str).str.strip()
-    df["BU"] = df["BU"].astype(str).str.strip()
-
-    # SLA em dias úteis: usar DATA_SOLICITACAO -> DATA_CONCLUSAO quando STATUS == Concluído
-    df["SLA_DIAS_UTEIS"] = df.apply(
-        lambda r: calcular_dias_uteis(r.get("DATA_SOLICITACAO"), r.get("DATA_CONCLUSAO"))
-        if isinstance(r.get("STATUS"), str) and r.get("STATUS").startswith("concl") else np.nan,
-        axis=1
-    )
-    # Garantir tipo numérico
-    df["SLA_DIAS_UTEIS"] = pd.to_numeric(df["SLA_DIAS_UTEIS"], errors="coerce")
+    with etapa("processar.datas", n, n):
+        for date_col in ["DATA_SOLICITACAO", "DATA_ABERTURA", "DATA_CONCLUSAO"]:
+            df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+
+    # NORMALIZAR STATUS (ex.: espaços/maiúsculas) e demais dimensões de texto como Categorical
+    # (filtros e groupbys passam a comparar códigos inteiros em vez de strings)
+    with etapa("processar.categoricas", n, n):
+        df["STATUS"] = _categoria_normalizada(df["STATUS"], minusculas=True)
+        for col in COLUNAS_CATEGORICAS:
+            if col != "STATUS":
+                df[col] = _categoria_normalizada(df[col], aparar=col in COLUNAS_APARADAS)
+
+    # SLA em dias úteis: DATA_SOLICITACAO -> DATA_CONCLUSAO, nas duas variantes
+    # (SLA_DIAS_UTEIS só quando STATUS == Concluído; SLA_DIAS_UTEIS_TODOS para qualquer STATUS)
+    # (cálculo colunar: um np.busday_count por região de feriados, nunca por linha)
+    with etapa("processar.sla", n, n):
+        for coluna, valores in calcular_slas(df["DATA_SOLICITACAO"], df["DATA_CONCLUSAO"], df["STATUS"], df["BU"]).items():
+            df[coluna] = valores
 
     # Flags
-    df["FLAG_RESOLUCAO_1_DEV"] = np.where(df["STATUS"].str.lower().str.startswith("concl"), 1, 0)
+    with etapa("processar.flags", n, n):
+        df["FLAG_RESOLUCAO_1_DEV"] = np.where(status_concluido(df["STATUS"]), 1, 0)
 
-    # Busca por 'reprocesso' (insensível a caixa)
-    df["FLAG_REPROCESSO"] = df["CONCLUSAO_QUALITATIVA"].astype(str).str.contains("reprocesso", case=False, na=False).astype(int)
+        # Busca por 'reprocesso' (insensível a caixa)
+        df["FLAG_REPROCESSO"] = df["CONCLUSAO_QUALITATIVA"].astype(str).str.contains("reprocesso", case=False, na=False).astype(int)
 
     # Ajustes finais: garantir tipos razoáveis
-    # JIRA para string
-    df["JIRA"] = df["JIRA"].astype(str).replace("nan", "")
+    # JIRA: chave canônica categórica + POSSUI_JIRA + JIRA_ID (única normalização de JIRA do projeto)
+    with etapa("processar.jira", n, n):
+        for coluna, valores in normalizar_jira(df["JIRA"]).items():
+            df[coluna] = valores
     # QTDE colunas para numérico quando possível
-    for q in ["QTDE_QUEST", "QTDE_QUEST_JIRA"]:
-        df[q] = pd.to_numeric(df[q], errors='coerce')
+    with etapa("processar.quantidades", n, n):
+        for q in ["QTDE_QUEST", "QTDE_QUEST_JIRA"]:
+            df[q] = pd.to_numeric(df[q], errors='coerce')
 
     # Reordenar colunas numa ordem clara (opcional)
-    cols_order = expected + ["SLA_DIAS_UTEIS", "FLAG_RESOLUCAO_1_DEV", "FLAG_REPROCESSO"]
+    cols_order = COLUNAS_ESPERADAS + [
+        "SLA_DIAS_UTEIS", "SLA_DIAS_UTEIS_TODOS", "POSSUI_JIRA", "JIRA_ID", "FLAG_RESOLUCAO_1_DEV", "FLAG_REPROCESSO"
+    ]
     cols_final = [c for c in cols_order if c in df.columns]
     df = df[cols_final]
 
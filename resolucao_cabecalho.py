@@ -0,0 +1,108 @@
+"""
+resolucao_cabecalho.py
+Resolução única de cabeçalhos: nome bruto da planilha -> nome canônico do pipeline.
+Usada por processar_solicitacoes (_normalize_columns), leitura_excel (resolver_colunas) e
+dashboard_view (coluna de quantidade e RESP_SM), no lugar de três normalizações divergentes.
+- normalizar_nome_coluna: sem acentos, '.', espaços e '-' viram '_', '_' repetidos colapsados,
+  MAIÚSCULAS (expressões regulares compiladas uma vez)
+- ALIASES: registro extensível variante normalizada -> nome canônico (registrar_alias)
+- nome_canonico / resolver_cabecalho memoizados: um upload com o mesmo layout de cabeçalho
+  resolve todas as colunas com um único lookup
+"""
+
+import functools
+import re
+import unicodedata
+
+_NAO_ASCII = re.compile(r"[^\x00-\x7f]")  # após NFKD: acentos (marcas combinantes) e demais não-ASCII
+_SEPARADORES = re.compile(r"[.\s\-]+")
+_UNDERSCORES = re.compile(r"_{2,}")
+
+# variante (já normalizada) -> nome canônico
+ALIASES = {
+    # responsáveis
+    "RESP_BU": "RESP_BU",
+    "RESP_SM": "RESP_SM",
+    "RESPSM": "RESP_SM",
+    "RESPONSAVEL_SM": "RESP_SM",
+
+    # datas
+    "DATA_SOLICITACAO": "DATA_SOLICITACAO",
+    "DATA_ABERTURA": "DATA_ABERTURA",
+    "DATA_CONCLUSAO": "DATA_CONCLUSAO",
+
+    # detalhe / texto
+    "DETALHE": "DETALHE_QUESTIONAMENTO",
+    "DETALHE_QUESTIONAMENTO": "DETALHE_QUESTIONAMENTO",
+
+    # quantidades
+    "QTIA_QUEST": "QTDE_QUEST",
+    "QTDE_QUEST": "QTDE_QUEST",
+    "QTIAQUEST": "QTDE_QUEST",
+    "QTDEQUEST": "QTDE_QUEST",
+    "QTIA_QUEST_JIRA": "QTDE_QUEST_JIRA",
+    "QTDE_QUEST_JIRA": "QTDE_QUEST_JIRA",
+
+    # outros
+    "OBSERVACOES": "OBSERVACOES",
+    "STATUS": "STATUS",
+    "TIPO": "TIPO",
+    "CLIENTE": "CLIENTE",
+    "CATEGORIA": "CATEGORIA",
+    "JIRA": "JIRA",
+    "CONCLUSAO_QUALITATIVA": "CONCLUSAO_QUALITATIVA",
+}
+
+
+def normalizar_nome_coluna(c) -> str:
+    """
+    Normaliza um nome de coluna:
+    - remove acentos
+    - substitui pontos, espaços e hífens (em sequência) por um underscore
+    - converte para MAIÚSCULAS
+    """
+    texto = _NAO_ASCII.sub("", unicodedata.normalize("NFKD", str(c))).strip()
+    return _UNDERSCORES.sub("_", _SEPARADORES.sub("_", texto)).upper()
+
+
+@functools.lru_cache(maxsize=4096)
+def _canonico(bruto: str) -> str:
+    normalizado = normalizar_nome_coluna(bruto)
+    return ALIASES.get(normalizado, normalizado)
+
+
+def nome_canonico(c) -> str:
+    """Normaliza o nome e aplica o registro de aliases (memoizado por nome bruto)."""
+    return _canonico(str(c))
+
+
+@functools.lru_cache(maxsize=256)
+def _resolver(cabecalho: tuple) -> tuple:
+    return tuple(_canonico(c) for c in cabecalho)
+
+
+def resolver_cabecalho(colunas) -> list:
+    """Nomes canônicos de um cabeçalho inteiro (memoizado pelo layout: mesma tupla de nomes brutos)."""
+    return list(_resolver(tuple(str(c) for c in colunas)))
+
+
+def encontrar_coluna(colunas, *canonicos):
+    """
+    Coluna original de `colunas` cujo nome canônico é o primeiro de `canonicos` presente
+    (ordem = prioridade). None se nenhuma resolver.
+    """
+    colunas = list(colunas)
+    por_canonico = {}
+    for original, canonico in zip(colunas, resolver_cabecalho(colunas)):
+        por_canonico.setdefault(canonico, original)
+    for canonico in canonicos:
+        if canonico in por_canonico:
+            return por_canonico[canonico]
+    return None
+
+
+def registrar_alias(variante: str, canonico: str):
+    """Registra uma nova variante de cabeçalho (normalizada aqui) e invalida os caches de resolução."""
+    ALIASES[normalizar_nome_coluna(variante)] = canonico
+    _canonico.cache_clear()
+    _resolver.cache_clear()
@@ -0,0 +1,188 @@
+"""
+rollup_mensal.py
+Tabela mensal pré-agregada, compartilhada por todos os gráficos de série temporal e pelo card 5.
+- Uma linha por (MES, BU, TIPO, STATUS, RESP_SM, POSSUI_JIRA)
+- Somas de QTDE_QUEST, contagem de linhas, soma/contagem de SLA e nº de JIRAs distintos do grupo
+- Pares (grupo, JIRA) distintos numa tabela à parte (gerar_pares_jira): JIRAs distintos não se somam
+  entre grupos, então qualquer reagregação (combinar_rollups, contar_jiras) reconta a partir dos pares
+Construída uma vez por dataset tratado; os gráficos só filtram e reagregam esta tabela,
+então o custo de renderização não cresce com o tamanho do histórico.
+"""
+
+import numpy as np
+import pandas as pd
+
+from calculo_sla import COLUNA_SLA_TODOS, sla_todas_linhas
+from normalizacao_jira import possui_jira
+
+DIMENSOES_ROLLUP = ["MES", "BU", "TIPO", "STATUS", "RESP_SM", "POSSUI_JIRA"]
+
+
+def _mes(datas: pd.Series) -> np.ndarray:
+    """Primeiro dia do mês (datetime64[ns]) de cada data; NaT continua NaT."""
+    dias = pd.to_datetime(datas, errors="coerce").to_numpy(dtype="datetime64[ns]")
+    return dias.astype("datetime64[M]").astype("datetime64[ns]")
+
+
+def _base(df: pd.DataFrame, com_sla: bool = True) -> pd.DataFrame:
+    """Uma linha por solicitação com data: dimensões do rollup, quantidades, SLA e JIRA (None sem JIRA)."""
+    tem_jira = possui_jira(df)
+    colunas = {
+        "MES": _mes(df["DATA_SOLICITACAO"]),
+        **{dim: df[dim].array for dim in ["BU", "TIPO", "STATUS", "RESP_SM"]},
+        "POSSUI_JIRA": tem_jira,
+        "JIRA": df["JIRA"].astype(object).where(tem_jira, None).to_numpy(),
+    }
+    if com_sla:
+        if COLUNA_SLA_TODOS in df.columns:
+            sla = df[COLUNA_SLA_TODOS].to_numpy(dtype="float64")
+        else:
+            sla = sla_todas_linhas(df["DATA_SOLICITACAO"], df["DATA_CONCLUSAO"], df["BU"])
+        colunas["QTDE_QUEST"] = pd.to_numeric(df["QTDE_QUEST"], errors="coerce").to_numpy(dtype="float64")
+        colunas["SLA"] = sla
+    base = pd.DataFrame(colunas)
+    return base[base["MES"].notna()]
+
+
+def _jira_distinto(base: pd.DataFrame) -> np.ndarray:
+    """True na primeira linha de cada par (grupo, JIRA); False nas repetições e nas linhas sem JIRA."""
+    return (base["JIRA"].notna() & ~base.duplicated(DIMENSOES_ROLLUP + ["JIRA"])).to_numpy()
+
+
+def gerar_rollup_mensal(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrega o DataFrame tratado por mês de solicitação e dimensões de filtro.
+    Linhas sem DATA_SOLICITACAO ficam de fora (não entram em nenhuma série mensal).
+    Colunas: DIMENSOES_ROLLUP + QTDE_QUEST, N_LINHAS, SLA_SOMA, SLA_N, N_JIRAS (JIRAs distintos do grupo).
+    SLA aqui é o de todas as linhas com as duas datas (critério do gráfico de SLA mensal): lido da
+    coluna SLA_DIAS_UTEIS_TODOS gravada na ingestão; só é recalculado se o df não a tiver.
+    """
+    base = _base(df)
+    base["JIRA_DISTINTO"] = _jira_distinto(base)
+
+    rollup = (
+        base.groupby(DIMENSOES_ROLLUP, observed=True, dropna=False, sort=True)
+        .agg(
+            QTDE_QUEST=("QTDE_QUEST", "sum"),
+            N_LINHAS=("QTDE_QUEST", "size"),
+            SLA_SOMA=("SLA", "sum"),
+            SLA_N=("SLA", "count"),
+            N_JIRAS=("JIRA_DISTINTO", "sum"),
+        )
+        .reset_index()
+    )
+    return rollup
+
+
+def gerar_pares_jira(df: pd.DataFrame) -> pd.DataFrame:
+    """Pares (DIMENSOES_ROLLUP, JIRA) distintos do DataFrame tratado; base para recontar JIRAs distintos."""
+    base = _base(df, com_sla=False)
+    return base.loc[_jira_distinto(base), DIMENSOES_ROLLUP + ["JIRA"]].reset_index(drop=True)
+
+
+def _dimensoes_comuns(partes: list) -> pd.DataFrame:
+    """Concatena tabelas com DIMENSOES_ROLLUP e unifica as categorias de cada dimensão (chaves comparáveis)."""
+    base = pd.concat(partes, ignore_index=True)
+    for dim in ["BU", "TIPO", "STATUS", "RESP_SM"]:
+        base[dim] = base[dim].astype(object)
+        base[dim] = base[dim].astype(pd.CategoricalDtype(sorted(base[dim].dropna().unique(), key=str)))
+    return base
+
+
+def combinar_pares(pares) -> pd.DataFrame:
+    """Junta tabelas de pares (grupo, JIRA) de partes diferentes, sem repetir pares."""
+    pares = [p for p in pares if len(p)]
+    if not pares:
+        return pd.DataFrame(columns=DIMENSOES_ROLLUP + ["JIRA"])
+    base = _dimensoes_comuns(pares)
+    return base[~base.duplicated(DIMENSOES_ROLLUP + ["JIRA"])].reset_index(drop=True)
+
+
+def combinar_rollups(rollups, pares=None) -> pd.DataFrame:
+    """
+    Junta rollups parciais (ex.: de blocos ou arquivos diferentes) num só, somando os contadores.
+    N_JIRAS é recontado a partir de `pares` (gerar_pares_jira de cada parte, ou já combinados): somá-lo
+    contaria duas vezes o JIRA presente em mais de uma parte. Sem `pares`, N_JIRAS fica de fora.
+    Com os pares, o resultado é igual ao rollup do frame inteiro.
+    """
+    rollups = [r for r in rollups if len(r)]
+    if not rollups:
+        colunas = ["QTDE_QUEST", "N_LINHAS", "SLA_SOMA", "SLA_N"] + (["N_JIRAS"] if pares is not None else [])
+        return pd.DataFrame(columns=DIMENSOES_ROLLUP + colunas)
+    base = _dimensoes_comuns([r.drop(columns="N_JIRAS", errors="ignore") for r in rollups])
+
+    rollup = (
+        base.groupby(DIMENSOES_ROLLUP, observed=True, dropna=False, sort=True)
+        .agg(
+            QTDE_QUEST=("QTDE_QUEST", "sum"),
+            N_LINHAS=("N_LINHAS", "sum"),
+            SLA_SOMA=("SLA_SOMA", "sum"),
+            SLA_N=("SLA_N", "sum"),
+        )
+        .reset_index()
+    )
+    if pares is None:
+        return rollup
+
+    pares = combinar_pares([pares] if isinstance(pares, pd.DataFrame) else pares)
+    n_jiras = contar_jiras(pares, DIMENSOES_ROLLUP)
+    for dim in ["BU", "TIPO", "STATUS", "RESP_SM"]:
+        n_jiras[dim] = n_jiras[dim].astype(object).astype(rollup[dim].dtype)
+    rollup = rollup.merge(n_jiras, on=DIMENSOES_ROLLUP, how="left", sort=False)
+    rollup["N_JIRAS"] = rollup["N_JIRAS"].fillna(0).astype("int64")
+    return rollup
+
+
+def contar_jiras(pares: pd.DataFrame, chaves=("MES",)) -> pd.DataFrame:
+    """
+    JIRAs distintos por `chaves` (ex.: ["MES"], ["MES", "BU"]) a partir dos pares (grupo, JIRA),
+    já filtrados com filtrar_rollup se for o caso. Colunas: chaves + N_JIRAS.
+    """
+    chaves = list(chaves)
+    distintos = pares[~pares.duplicated(chaves + ["JIRA"])]
+    return (
+        distintos.groupby(chaves, observed=True, dropna=False, sort=True)
+        .size()
+        .rename("N_JIRAS")
+        .reset_index()
+    )
+
+
+def filtrar_rollup(rollup: pd.DataFrame, selecoes: dict = None) -> pd.DataFrame:
+    """Aplica as seleções de filtro (valor, lista de valores ou 'Todos'/None) às dimensões do rollup."""
+    mascara = np.ones(len(rollup), dtype=bool)
+    for dim, valores in (selecoes or {}).items():
+        if dim not in rollup.columns or valores is None or (isinstance(valores, str) and valores == "Todos"):
+            continue
+        if isinstance(valores, str) or not hasattr(valores, "__iter__"):
+            valores = [valores]
+        valores = [v for v in valores if v != "Todos"]
+        if valores:
+            mascara &= rollup[dim].isin(valores).to_numpy()
+    return rollup[mascara]
+
+
+def rotulo_mes(meses: pd.Series) -> pd.Series:
+    """'AAAA-MM' para o eixo x (formatando só os meses distintos)."""
+    meses = pd.Series(meses)
+    distintos = pd.unique(meses.to_numpy())
+    rotulos = {m: pd.Timestamp(m).strftime("%Y-%m") for m in distintos}
+    return meses.map(rotulos)
+
+
+def serie_mensal(rollup: pd.DataFrame, por: str = None, desde=None) -> pd.DataFrame:
+    """
+    Reagrega o rollup por mês (e opcionalmente por uma dimensão).
+    Retorna MES, MES_ANO ('AAAA-MM'), [por], QTDE_QUEST, N_LINHAS, SLA_SOMA, SLA_N, SLA_MEDIO — ordenado por mês.
+    """
+    if desde is not None:
+        rollup = rollup[rollup["MES"] >= pd.Timestamp(desde)]
+    chaves = ["MES"] + ([por] if por else [])
+    serie = (
+        rollup.groupby(chaves, observed=True, dropna=False, sort=True)[["QTDE_QUEST", "N_LINHAS", "SLA_SOMA", "SLA_N"]]
+        .sum()
+        .reset_index()
+    )
+    serie["SLA_MEDIO"] = serie["SLA_SOMA"] / serie["SLA_N"].where(serie["SLA_N"] > 0)
+    serie.insert(1, "MES_ANO", rotulo_mes(serie["MES"]).to_numpy())
+    return serie
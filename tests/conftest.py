@@ -0,0 +1,29 @@
+"""Os módulos do projeto ficam na raiz do repositório (sem pacote): torná-los importáveis nos testes."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import pytest  # noqa: E402
+
+from benchmarks.streamlit_falso import StreamlitFalso  # noqa: E402
+
+
+@pytest.fixture
+def st_falso(monkeypatch):
+    import dashboard_view
+
+    falso = StreamlitFalso()
+    monkeypatch.setattr(dashboard_view, "st", falso)
+    return falso
+
+
+@pytest.fixture(scope="session")
+def df_tratada():
+    """Base sintética tratada (benchmarks/sintetico.py), 3 mil linhas."""
+    from benchmarks.sintetico import gerar_solicitacoes
+    from processar_solicitacoes import processar_solicitacoes
+
+    return processar_solicitacoes(gerar_solicitacoes(3_000, semente=7))
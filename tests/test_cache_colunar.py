@@ -0,0 +1,57 @@
+import os
+
+import calendario_feriados
+import cache_colunar
+
+
+def test_chave_muda_com_o_mapa_de_regioes(monkeypatch):
+    antes = cache_colunar.chave_cache(b"planilha")
+    monkeypatch.setitem(calendario_feriados.REGIAO_POR_BU, "BU NOVA", "RJ")
+    assert cache_colunar.chave_cache(b"planilha") != antes
+
+
+def test_chave_muda_com_o_arquivo_de_feriados(tmp_path, monkeypatch):
+    antes = cache_colunar.chave_cache(b"planilha")
+    outro = tmp_path / "feriados.csv"
+    outro.write_text("DATA;REGIAO;DESCRICAO\n2025-03-04;BR;Carnaval\n", encoding="utf-8")
+    monkeypatch.setattr(calendario_feriados, "ARQUIVO_FERIADOS", str(outro))
+    assert cache_colunar.chave_cache(b"planilha") != antes
+
+
+def test_diretorio_do_cache_independe_do_diretorio_de_trabalho():
+    if "KPI_SM_CACHE_DIR" not in os.environ:
+        assert os.path.isabs(cache_colunar.DIRETORIO_CACHE)
+        assert os.path.dirname(cache_colunar.DIRETORIO_CACHE) == os.path.dirname(os.path.abspath(cache_colunar.__file__))
+
+
+def test_lru_ignora_arquivo_removido_durante_a_varredura(tmp_path, monkeypatch):
+    for i in range(3):
+        (tmp_path / f"k{i}.feather").write_bytes(b"x")
+    stat_original = os.stat
+
+    def stat_concorrente(caminho, *args, **kwargs):
+        # outro processo removeu k1 entre o listdir e o stat
+        if str(caminho).endswith("k1.feather"):
+            os.remove(caminho)
+        return stat_original(caminho, *args, **kwargs)
+
+    monkeypatch.setattr(cache_colunar.os, "stat", stat_concorrente)
+    cache_colunar.aplicar_lru(str(tmp_path), max_arquivos=1)
+    assert len(list(tmp_path.glob("*.feather"))) == 1
+
+
+def test_lote_mantem_as_entradas_de_todos_os_arquivos(tmp_path, monkeypatch):
+    import ingestao_lote
+    from benchmarks.sintetico import gerar_planilha
+
+    entrada = tmp_path / "bases"
+    entrada.mkdir()
+    for i in range(3):
+        gerar_planilha(str(entrada / f"bu{i}.xlsx"), 200, semente=i)
+    monkeypatch.setattr(cache_colunar, "DIRETORIO_CACHE", str(tmp_path / "cache"))
+    monkeypatch.setattr(cache_colunar, "MAX_ARQUIVOS", 2)
+
+    df = ingestao_lote.ingerir_diretorio(str(entrada), max_processos=2)
+    assert len(df) == 600
+    # 3 arquivos + o consolidado, apesar de MAX_ARQUIVOS = 2
+    assert len(list((tmp_path / "cache").glob("*.feather"))) == 4
@@ -0,0 +1,61 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import calendario_feriados
+from calculo_sla import dias_uteis_por_bu
+from processar_solicitacoes import calcular_dias_uteis, processar_solicitacoes
+
+# 2025-07-09 (quarta) é feriado só em SP (Revolução Constitucionalista); seg 07/07 -> sex 11/07
+INICIO, FIM = "2025-07-07", "2025-07-11"
+
+
+def test_mapa_de_regioes_carregado_do_arquivo(tmp_path, monkeypatch):
+    arquivo = tmp_path / "regioes_bu.csv"
+    arquivo.write_text("BU;REGIAO\n# BU 2 - PEDRO;RJ\nBU 1 - EDUARDO;sp\n", encoding="utf-8")
+    monkeypatch.setattr(calendario_feriados, "REGIAO_POR_BU", calendario_feriados.carregar_regioes_bu(str(arquivo)))
+
+    assert calendario_feriados.regiao_da_bu("BU 1 - EDUARDO") == "SP"
+    assert calendario_feriados.regiao_da_bu("  bu 1 -  eduardo ") == "SP"
+    assert calendario_feriados.regiao_da_bu("BU 2 - PEDRO") == calendario_feriados.REGIAO_NACIONAL  # comentário
+    assert calendario_feriados.regiao_da_bu("BU INEXISTENTE") == calendario_feriados.REGIAO_NACIONAL
+
+
+def test_arquivo_padrao_nao_mapeia_nenhuma_bu():
+    # região de BU é decisão do negócio: por padrão, todas ficam no calendário nacional
+    assert calendario_feriados.carregar_regioes_bu() == {}
+
+
+def test_avisa_datas_fora_dos_anos_do_arquivo_de_feriados():
+    primeiro, ultimo = calendario_feriados.anos_cobertos()
+    with pytest.warns(calendario_feriados.FeriadosForaDaCobertura, match=str(ultimo + 1)):
+        dias_uteis_por_bu([f"{ultimo}-12-20"], [f"{ultimo + 1}-01-10"])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", calendario_feriados.FeriadosForaDaCobertura)
+        dias_uteis_por_bu([f"{primeiro}-02-01", None], [f"{ultimo}-02-01", f"{ultimo + 5}-01-01"])
+
+
+def test_feriado_regional_muda_sla_so_da_bu_da_regiao(monkeypatch):
+    monkeypatch.setitem(calendario_feriados.REGIAO_POR_BU, "BU SP", "SP")
+    sla = dias_uteis_por_bu([INICIO] * 3, [FIM] * 3, ["BU SP", "BU NACIONAL", None])
+    np.testing.assert_array_equal(sla, [3.0, 4.0, 4.0])
+    assert calcular_dias_uteis(INICIO, FIM, "BU SP") == 3
+    assert calcular_dias_uteis(INICIO, FIM) == 4
+
+
+def test_pipeline_aplica_calendario_da_bu(monkeypatch):
+    monkeypatch.setitem(calendario_feriados.REGIAO_POR_BU, "BU SP", "SP")
+    df = processar_solicitacoes(
+        pd.DataFrame(
+            {
+                "BU": ["BU SP", "BU NACIONAL"],
+                "DATA_SOLICITACAO": [INICIO, INICIO],
+                "DATA_CONCLUSAO": [FIM, FIM],
+                "STATUS": ["Concluído", "Concluído"],
+            }
+        )
+    )
+    assert df["SLA_DIAS_UTEIS"].tolist() == [3.0, 4.0]
+    assert df["SLA_DIAS_UTEIS_TODOS"].tolist() == [3.0, 4.0]
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import dashboard_view as dv
+import kpi_calculos
+from contexto_render import ContextoRender
+from indice_filtros import IndiceFiltros
+from primeira_ocorrencia import IndicePrimeiraOcorrencia
+from rollup_mensal import filtrar_rollup, gerar_rollup_mensal
+
+FUNCOES_RENDER = [
+    dv.grafico_linhas_por_bu,
+    dv.grafico_linhas_por_tipo,
+    dv.grafico_pizza_status,
+    dv.grafico_sla_mensal,
+    dv.tabela_detalhada,
+]
+
+
+@pytest.fixture
+def copias_de_frame(monkeypatch):
+    """
+    Conta cópias de frame inteiro (DataFrame.copy e indexação booleana) feitas a partir dos
+    frames registrados em `copias_de_frame.frames` (o df completo e o recorte do contexto).
+    """
+    contador = type("Contador", (), {"frames": [], "n": 0})()
+    copy_original = pd.DataFrame.copy
+    getitem_original = pd.DataFrame.__getitem__
+
+    def _registrado(df):
+        return any(df is f for f in contador.frames)
+
+    def copy(self, *args, **kwargs):
+        if _registrado(self):
+            contador.n += 1
+        return copy_original(self, *args, **kwargs)
+
+    def getitem(self, chave):
+        if _registrado(self) and getattr(chave, "dtype", None) == bool:
+            contador.n += 1
+        return getitem_original(self, chave)
+
+    monkeypatch.setattr(pd.DataFrame, "copy", copy)
+    monkeypatch.setattr(pd.DataFrame, "__getitem__", getitem)
+    return contador
+
+
+@pytest.mark.parametrize("selecoes", [{}, {"BU": "primeira"}])
+def test_render_completo_faz_no_maximo_uma_copia_de_frame(st_falso, df_tratada, copias_de_frame, selecoes):
+    indice = IndiceFiltros(df_tratada)
+    if selecoes.get("BU") == "primeira":
+        selecoes = {"BU": indice.opcoes("BU")[0]}
+    mask = indice.mascara(selecoes)
+    rollup = filtrar_rollup(gerar_rollup_mensal(df_tratada), selecoes)
+    kpis = kpi_calculos.gerar_resumo_kpis(df_tratada, mask)
+
+    copias_de_frame.frames.append(df_tratada)
+    ctx = ContextoRender(
+        df_tratada, mask, rollup, selecoes=selecoes, primeira_ocorrencia=IndicePrimeiraOcorrencia(df_tratada)
+    )
+    copias_de_frame.frames.append(ctx.df_filtrado)
+
+    dv.mostrar_kpi_cards(kpis, ctx)
+    for funcao in FUNCOES_RENDER:
+        funcao(ctx)
+
+    esperado = 0 if not selecoes else 1
+    assert ctx.copias == esperado
+    assert ctx.copias <= 1
+    assert copias_de_frame.n == esperado  # só o df[mask] do próprio contexto
+    assert ctx.rollup is rollup  # os widgets reaproveitam o rollup do contexto em vez de recalcular
+
+
+def test_contexto_sem_filtro_nao_copia(df_tratada):
+    ctx = ContextoRender(df_tratada, np.ones(len(df_tratada), dtype=bool))
+    assert ctx.copias == 0
+    assert ctx.df_filtrado is df_tratada
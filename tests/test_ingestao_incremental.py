@@ -0,0 +1,83 @@
+import pandas as pd
+
+from ingestao_incremental import processar_incremental
+
+
+def _base(linhas):
+    """DataFrame bruto mínimo: (JIRA, DATA_SOLICITACAO, CLIENTE, QTDE_QUEST) por linha."""
+    return pd.DataFrame(
+        {
+            "BU": "BU 1 - EDUARDO",
+            "JIRA": [j for j, _, _, _ in linhas],
+            "DATA_SOLICITACAO": pd.to_datetime([d for _, d, _, _ in linhas]),
+            "DATA_CONCLUSAO": pd.to_datetime([d for _, d, _, _ in linhas]) + pd.Timedelta(days=3),
+            "CLIENTE": [c for _, _, c, _ in linhas],
+            "QTDE_QUEST": [q for _, _, _, q in linhas],
+            "STATUS": "Concluído",
+            "TIPO": "Questionamento",
+        }
+    )
+
+
+def test_linha_inserida_em_grupo_de_chaves_repetidas_nao_desloca_as_demais():
+    repetidas = [("", "2025-07-01", "Cliente A", q) for q in (1, 2, 3, 4)]
+    anterior = processar_incremental(_base(repetidas))
+
+    # nova linha com a mesma chave (JIRA vazio) no início do grupo
+    novo = _base([("", "2025-07-01", "Cliente A", 9)] + repetidas)
+    resultado = processar_incremental(novo, anterior)
+
+    assert resultado.resumo() == {"inseridas": 1, "atualizadas": 0, "removidas": 0, "reaproveitadas": 4}
+    assert resultado.df_tratada["QTDE_QUEST"].tolist() == [9, 1, 2, 3, 4]
+
+
+def test_copias_identicas_e_alteracao_dentro_do_grupo():
+    repetidas = [("", "2025-07-01", "Cliente A", 1)] * 4
+    anterior = processar_incremental(_base(repetidas))
+
+    resultado = processar_incremental(_base(repetidas + [("", "2025-07-01", "Cliente A", 1)]), anterior)
+    assert resultado.resumo() == {"inseridas": 1, "atualizadas": 0, "removidas": 0, "reaproveitadas": 4}
+
+    alterada = [("", "2025-07-01", "Cliente A", 1)] * 3 + [("", "2025-07-01", "Cliente A", 7)]
+    resultado = processar_incremental(_base(alterada), anterior)
+    assert resultado.resumo() == {"inseridas": 0, "atualizadas": 1, "removidas": 0, "reaproveitadas": 3}
+    assert resultado.df_tratada["QTDE_QUEST"].tolist() == [1, 1, 1, 7]
+
+
+def test_resultado_incremental_igual_ao_processamento_completo():
+    anterior_linhas = [("301", "2025-07-01", "A", 1), ("", "2025-07-02", "B", 2), ("", "2025-07-02", "B", 3)]
+    novas_linhas = [("", "2025-07-02", "B", 3), ("302", "2025-08-01", "C", 5), ("301", "2025-07-01", "A", 2)]
+    anterior = processar_incremental(_base(anterior_linhas))
+    incremental = processar_incremental(_base(novas_linhas), anterior)
+    completo = processar_incremental(_base(novas_linhas))
+
+    assert incremental.resumo() == {"inseridas": 1, "atualizadas": 1, "removidas": 1, "reaproveitadas": 1}
+    pd.testing.assert_frame_equal(incremental.df_tratada, completo.df_tratada)
+
+
+def test_acerto_do_cache_colunar_atualiza_base_e_refaz_diff(tmp_path, monkeypatch):
+    import pickle
+
+    import cache_colunar
+    from ingestao_incremental import ingerir_conteudo
+
+    monkeypatch.setattr(cache_colunar, "DIRETORIO_CACHE", str(tmp_path))
+    leituras = []
+
+    def ler(conteudo):
+        leituras.append(conteudo)
+        return pickle.loads(conteudo)
+
+    v1 = pickle.dumps(_base([("301", "2025-07-01", "A", 1), ("", "2025-07-02", "B", 2)]))
+    v2 = pickle.dumps(_base([("301", "2025-07-01", "A", 1), ("", "2025-07-02", "B", 2), ("302", "2025-08-01", "C", 3)]))
+
+    r1 = ingerir_conteudo(v1, ler)
+    r2 = ingerir_conteudo(v2, ler, r1)
+    assert len(leituras) == 2
+
+    # outra sessão: v1 e v2 vêm do disco, sem reler, e o diff v1 -> v2 é refeito pelas assinaturas
+    base = ingerir_conteudo(v1, ler)
+    r2_cache = ingerir_conteudo(v2, ler, base)
+    assert len(leituras) == 2
+    assert r2_cache.resumo() == r2.resumo() == {"inseridas": 1, "atualizadas": 0, "removidas": 0, "reaproveitadas": 2}
+    pd.testing.assert_frame_equal(r2_cache.df_tratada, r2.df_tratada, check_categorical=False)
@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+import instrumentacao
+
+
+@pytest.fixture
+def instrumentacao_ligada():
+    estava_ativa = instrumentacao.ativo()
+    instrumentacao.ativar(memoria=False)
+    yield
+    if not estava_ativa:
+        instrumentacao.desativar()
+
+
+def test_coletores_de_sessoes_simultaneas_nao_se_misturam(instrumentacao_ligada):
+    # duas "sessões" (threads de rerun) medindo ao mesmo tempo; uma limpa no meio da outra
+    pronto = threading.Barrier(2)
+    resultados = {}
+
+    def rerun(nome):
+        coletor = instrumentacao.coletar()
+        with instrumentacao.etapa(f"{nome}.antes"):
+            pass
+        pronto.wait()
+        if nome == "a":
+            instrumentacao.limpar()
+        pronto.wait()
+        with instrumentacao.etapa(f"{nome}.depois"):
+            pass
+        resultados[nome] = [r["etapa"] for r in coletor]
+
+    threads = [threading.Thread(target=rerun, args=(nome,)) for nome in ("a", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert resultados == {"a": ["a.depois"], "b": ["b.antes", "b.depois"]}
+
+
+def test_sem_coletor_registros_vao_para_o_processo(instrumentacao_ligada):
+    # modo headless (kpi_sm --perf-json): nenhum coletor aberto nesta thread
+    def sem_coletor():
+        instrumentacao.limpar()
+        with instrumentacao.etapa("cli.build"):
+            pass
+
+    t = threading.Thread(target=sem_coletor)
+    t.start()
+    t.join()
+    assert [r["etapa"] for r in instrumentacao.REGISTROS] == ["cli.build"]
+    instrumentacao.REGISTROS.clear()
+
+
+def test_desligada_cada_etapa_tem_o_proprio_registro(monkeypatch):
+    monkeypatch.setattr(instrumentacao, "_ativo", False)
+    with instrumentacao.etapa("a") as r1:
+        r1["linhas_saida"] = 10
+    with instrumentacao.etapa("b") as r2:
+        assert r2 == {}
+    assert r1 is not r2
@@ -0,0 +1,21 @@
+import pandas as pd
+import pytest
+
+import dashboard_view
+import kpi_calculos
+
+
+@pytest.mark.parametrize("mes_referencia", ["2025-09", "2025-11-15"])
+def test_card_5_usa_o_mes_de_referencia(st_falso, df_tratada, mes_referencia):
+    html = []
+    st_falso.markdown = lambda texto, *args, **kwargs: html.append(texto)
+
+    dashboard_view.mostrar_kpi_cards(
+        kpi_calculos.gerar_resumo_kpis(df_tratada), df_tratada, mes_referencia=mes_referencia
+    )
+
+    mes = pd.Timestamp(mes_referencia).to_period("M")
+    no_mes = df_tratada["DATA_SOLICITACAO"].dt.to_period("M") == mes
+    esperado = int(df_tratada.loc[no_mes, "QTDE_QUEST"].sum())
+    assert esperado > 0
+    assert any(f"Mês atual: {esperado}" in trecho for trecho in html)
@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+import kpi_sm
+from benchmarks.sintetico import gerar_planilha
+
+
+@pytest.fixture(scope="module")
+def planilha(tmp_path_factory):
+    caminho = str(tmp_path_factory.mktemp("kpi_sm") / "base.xlsx")
+    gerar_planilha(caminho, 2_500, semente=5)
+    return caminho
+
+
+def test_build_em_blocos_igual_ao_build_inteiro(planilha, tmp_path):
+    inteiro = kpi_sm.build(planilha, [str(tmp_path / "inteiro.csv")], usar_cache=False)
+    em_blocos = kpi_sm.build_em_blocos(planilha, [str(tmp_path / "blocos.csv")], tamanho_bloco=700)
+
+    assert em_blocos == inteiro
+    esperado = pd.read_csv(tmp_path / "inteiro.csv", sep=";", encoding="utf-8-sig").drop(columns="JIRA_ID")
+    obtido = pd.read_csv(tmp_path / "blocos.csv", sep=";", encoding="utf-8-sig")
+    pd.testing.assert_frame_equal(obtido, esperado)
+
+
+def test_blocos_recusa_saidas_que_precisam_da_base_inteira(planilha, tmp_path):
+    with pytest.raises(ValueError, match="csv"):
+        kpi_sm.build_em_blocos(planilha, [str(tmp_path / "saida.xlsx")], tamanho_bloco=700)
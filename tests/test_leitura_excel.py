@@ -0,0 +1,26 @@
+import warnings
+
+import pandas as pd
+
+from benchmarks.sintetico import gerar_solicitacoes, gravar_planilha
+from leitura_excel import ler_solicitacoes_em_blocos, ler_solicitacoes_esquema
+
+
+def test_blocos_interpretam_datas_em_texto_como_a_leitura_inteira(tmp_path):
+    df = gerar_solicitacoes(30, semente=1)
+    # datas em texto: o 1º bloco começa com uma data ambígua (mês primeiro), o 2º com uma que só
+    # cabe com dia primeiro; por bloco, cada um deduziria um formato diferente
+    textos = ["07/08/2025"] * 10 + ["13/08/2025"] + ["05/09/2025"] * 19
+    df[df.columns[2]] = pd.Series(textos, dtype=object)
+    caminho = str(tmp_path / "datas_texto.xlsx")
+    gravar_planilha(df, caminho)
+
+    inteiro = ler_solicitacoes_esquema(caminho, engine="openpyxl")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", UserWarning)
+        blocos = list(ler_solicitacoes_em_blocos(caminho, tamanho_bloco=10))
+
+    assert len(blocos) == 3
+    em_blocos = pd.concat(blocos, ignore_index=True)
+    pd.testing.assert_series_equal(em_blocos["DATA_SOLICITACAO"], inteiro["DATA_SOLICITACAO"], check_dtype=False)
+    assert inteiro["DATA_SOLICITACAO"].iloc[0] == pd.Timestamp("2025-07-08")
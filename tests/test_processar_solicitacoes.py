@@ -0,0 +1,24 @@
+import pandas as pd
+
+from processar_solicitacoes import processar_solicitacoes
+
+
+def test_strip_so_nas_dimensoes_que_sempre_foram_aparadas():
+    df = processar_solicitacoes(pd.DataFrame({
+        "BU": ["BU 1 ", "BU 1", "BU 2"],
+        "TIPO": [" Dúvida", "Dúvida", "Dúvida"],
+        "STATUS": ["Concluído ", "CONCLUÍDO", "pendente"],
+        "CLIENTE": ["Química Amparo ", "Química Amparo", "Kenue  "],
+        "CATEGORIA": ["Sabão ", "Sabão", "Sabão"],
+        "RESP_SM": ["Ana", "Ana ", "Ana"],
+        "DATA_SOLICITACAO": ["2025-07-01"] * 3,
+    }))
+
+    assert df["BU"].tolist() == ["BU 1", "BU 1", "BU 2"]
+    assert df["TIPO"].nunique() == 1
+    assert df["STATUS"].tolist() == ["concluído", "concluído", "pendente"]
+    # CLIENTE, CATEGORIA e RESP_SM: só a codificação categórica, valores brutos
+    assert df["CLIENTE"].tolist() == ["Química Amparo ", "Química Amparo", "Kenue  "]
+    assert df["CATEGORIA"].nunique() == 2
+    assert df["RESP_SM"].nunique() == 2
+    assert isinstance(df["CLIENTE"].dtype, pd.CategoricalDtype)
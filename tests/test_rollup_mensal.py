@@ -0,0 +1,57 @@
+import pandas as pd
+
+from processamento_streaming import AcumuladorKPI
+from rollup_mensal import DIMENSOES_ROLLUP, combinar_rollups, contar_jiras, gerar_pares_jira, gerar_rollup_mensal
+
+DIMENSOES_CATEGORICAS = ["BU", "TIPO", "STATUS", "RESP_SM"]
+
+
+def _comparavel(rollup):
+    return rollup.astype({dim: object for dim in DIMENSOES_CATEGORICAS}).reset_index(drop=True)
+
+
+def test_n_jiras_conta_distintos_por_grupo(df_tratada):
+    rollup = gerar_rollup_mensal(df_tratada)
+
+    base = df_tratada[df_tratada["DATA_SOLICITACAO"].notna()]
+    mes = base["DATA_SOLICITACAO"].dt.to_period("M").dt.to_timestamp()
+    esperado = {}
+    for chave, jira in zip(zip(mes, *(base[d] for d in DIMENSOES_ROLLUP[1:])), base["JIRA"]):
+        esperado.setdefault(chave, set())
+        if chave[-1] and pd.notna(jira):
+            esperado[chave].add(jira)
+
+    obtido = dict(zip(zip(*(rollup[d] for d in DIMENSOES_ROLLUP)), rollup["N_JIRAS"]))
+    assert obtido == {chave: len(jiras) for chave, jiras in esperado.items()}
+
+
+def test_combinar_com_pares_igual_ao_frame_inteiro(df_tratada):
+    partes = [df_tratada.iloc[i: i + 700] for i in range(0, len(df_tratada), 700)]
+    combinado = combinar_rollups([gerar_rollup_mensal(p) for p in partes], [gerar_pares_jira(p) for p in partes])
+    inteiro = gerar_rollup_mensal(df_tratada)
+
+    pd.testing.assert_frame_equal(_comparavel(combinado[inteiro.columns]), _comparavel(inteiro), check_dtype=False)
+
+    acumulador = AcumuladorKPI()
+    for parte in partes:
+        acumulador.adicionar(parte)
+    pd.testing.assert_frame_equal(
+        _comparavel(acumulador.rollup()[inteiro.columns]), _comparavel(inteiro), check_dtype=False
+    )
+
+
+def test_contar_jiras_por_mes(df_tratada):
+    por_mes = contar_jiras(gerar_pares_jira(df_tratada)).set_index("MES")["N_JIRAS"]
+
+    base = df_tratada[df_tratada["DATA_SOLICITACAO"].notna() & df_tratada["POSSUI_JIRA"]]
+    esperado = base.groupby(base["DATA_SOLICITACAO"].dt.to_period("M").dt.to_timestamp())["JIRA"].nunique()
+    assert por_mes.to_dict() == esperado.to_dict()
+
+
+def test_header_com_filtros_devolve_selecoes(st_falso, df_tratada):
+    import dashboard_view
+
+    mask, selecoes = dashboard_view.header_com_filtros(df_tratada)
+    assert selecoes == {"BU": "Todos", "RESP_SM": "Todos", "STATUS": "Todos", "TIPO": "Todos"}
+    assert mask.all()
+    assert "filtros_selecionados" not in st_falso.session_state